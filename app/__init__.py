@@ -1,16 +1,23 @@
 """Voice-to-Text Application Package."""
 
-__version__ = "1.1.0"
+import importlib
+from typing import Any
 
-# Main application
-# CLI interface
-from app.cli import main as cli_main
+__version__ = "1.1.0"
 
-# Core transcription functionality
-from app.core.config import settings
-from app.main import app
-from app.services.pipeline import transcribe
-from app.utils import get_unique_filename, save_transcript
+# Exports are imported on first access so light entry points (the CLI talking
+# to a running daemon, `vtt list`) do not pay for torch and FastAPI imports.
+_EXPORTS = {
+    # Main application
+    "app": ("app.main", "app"),
+    # CLI interface
+    "cli_main": ("app.cli", "main"),
+    # Core transcription functionality
+    "settings": ("app.core.config", "settings"),
+    "transcribe": ("app.services.pipeline", "transcribe"),
+    "get_unique_filename": ("app.utils", "get_unique_filename"),
+    "save_transcript": ("app.utils", "save_transcript"),
+}
 
 __all__ = [
     "__version__",
@@ -21,3 +28,12 @@ __all__ = [
     "settings",
     "transcribe",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = _EXPORTS[name]
+    value = getattr(importlib.import_module(module_name), attr)
+    globals()[name] = value
+    return value
@@ -1,15 +1,17 @@
 """FastAPI routes for voice-to-text API."""
 
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
-from fastapi import APIRouter, File, Request, Response, UploadFile, status
+from fastapi import APIRouter, File, Header, Request, Response, UploadFile, status
 from fastapi.responses import FileResponse, JSONResponse
 
 from app.core.config import settings
 from app.core.errors import AudioFileError, TranscriptionError
 from app.core.logger import logger
+from app.core.metrics import latest_metrics
 from app.core.response import ResponseBuilder
+from app.core.timing import server_timing
 from app.services.transcriber import transcription_service
 
 router = APIRouter()
@@ -142,6 +144,37 @@ def health_check() -> dict[str, Any]:
     return transcription_service.health_check()
 
 
+@router.get(
+    "/metrics",
+    summary="Prometheus Metrics",
+    description="Request, stage and real-time-factor histograms, queue depth, model load times and memory, cache lookups and upload bytes in Prometheus text format.",
+    responses={
+        200: {"description": "Metrics", "content": {"text/plain": {}}},
+        404: {"description": "Metrics are disabled (ENABLE_METRICS=false)"},
+    },
+)
+async def metrics() -> Response:
+    """
+    Prometheus Metrics Endpoint
+
+    Serialization only reads in-memory counters, so the endpoint is cheap
+    enough to scrape every second; it runs on the event loop and never waits
+    for an inference slot.
+
+    **Example Request:**
+    ```bash
+    curl http://localhost:8000/metrics
+    ```
+    """
+    if not settings.enable_metrics:
+        return JSONResponse(
+            content={"status": "error", "message": "Metrics are disabled"},
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+    body, content_type = latest_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @router.post(
     "/transcribe",
     summary="Transcribe Audio File",
@@ -161,13 +194,28 @@ def health_check() -> dict[str, Any]:
                             "model": "base",
                             "backend": "openai",
                             "device": "cpu",
+                            "preset": "balanced",
                             "translated": False,
                             "diarized": True,
                             "audio_file": "media/audio/sample.wav",
+                            "timings": {
+                                "whisper": {
+                                    "wall_ms": 4210.5,
+                                    "cpu_ms": 16630.2,
+                                    "peak_rss_mb": 1480.0,
+                                    "rss_delta_mb": 868.0,
+                                },
+                            },
                         },
                     }
                 }
             },
+            "headers": {
+                "Server-Timing": {
+                    "description": "Wall time per stage (CPU time, peak RSS and growth in desc)",
+                    "schema": {"type": "string"},
+                }
+            },
         },
         400: {"description": "Invalid audio file or parameters"},
         422: {"description": "Validation error"},
@@ -185,6 +233,10 @@ async def transcribe_endpoint(
     diarize_threshold: float = 0.35,
     max_speakers: int | None = None,
     use_silhouette: bool = False,
+    preset: Literal["fast", "balanced", "accurate"] | None = None,
+    x_profile: bool = Header(
+        default=False, description="Profile this request (DEBUG mode only)"
+    ),
 ) -> JSONResponse:
     """
     Audio Transcription Endpoint
@@ -197,6 +249,9 @@ async def transcribe_endpoint(
       -F "file=@audio.mp3" \\
       -F "translate=true" \\
       -F "diarize=true"
+
+    # Faster decoding (greedy, no temperature fallback)
+    curl -X POST "http://localhost:8000/transcribe?preset=fast" -F "file=@audio.mp3"
     ```
 
     **Example Response:**
@@ -211,13 +266,25 @@ async def transcribe_endpoint(
         "model": "base",
         "backend": "openai",
         "device": "cpu",
+        "preset": "balanced",
         "translated": false,
         "diarized": true,
-        "audio_file": "media/audio/sample.wav"
+        "audio_file": "media/audio/sample.wav",
+        "timings": {
+          "decode": {"wall_ms": 310.2, "cpu_ms": 295.7, "peak_rss_mb": 612.0, "rss_delta_mb": 8.0},
+          "whisper": {"wall_ms": 4210.5, "cpu_ms": 16630.2, "peak_rss_mb": 1480.0, "rss_delta_mb": 868.0}
+        }
       }
     }
     ```
 
+    `metadata.timings` has the wall time, CPU time and peak memory of each
+    stage (upload, queue, decode, whisper, translate, diarize.*,
+    save_transcript); the wall times are also sent in a `Server-Timing` header.
+
+    With DEBUG enabled, an `X-Profile: true` header profiles the inference
+    (PROFILE_MODE) and `metadata.profile` names the file written to PROFILE_DIR.
+
     **Use Cases:**
     - Meeting transcription
     - Podcast transcription
@@ -232,11 +299,14 @@ async def transcribe_endpoint(
     - `diarize_threshold`: Clustering distance (0.0-1.0, lower = more speakers)
     - `max_speakers`: Fixed number of speakers (overrides diarize_threshold)
     - `use_silhouette`: Estimate speakers from embeddings
+    - `preset`: Decode preset: `fast` (greedy, no fallback), `balanced` (default),
+      `accurate` (beam search); default from settings
     """
     try:
         logger.info(
             f"Transcription request: file={file.filename}, "
-            f"translate={translate}, diarize={diarize}"
+            f"translate={translate}, diarize={diarize}, "
+            f"preset={preset or settings.decode_preset}"
         )
 
         # Validate parameters
@@ -256,6 +326,9 @@ async def transcribe_endpoint(
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
 
+        if x_profile and not settings.debug:
+            logger.warning("Ignoring X-Profile: profiling needs DEBUG=true")
+
         # Get base URL from request
         base_url = str(request.base_url)
 
@@ -268,6 +341,8 @@ async def transcribe_endpoint(
             max_speakers=max_speakers,
             use_silhouette=use_silhouette,
             base_url=base_url,
+            preset=preset,
+            profile=x_profile and settings.debug,
         )
 
         logger.info(f"Transcription completed successfully for {file.filename}")
@@ -284,6 +359,7 @@ async def transcribe_endpoint(
         return JSONResponse(
             content=response,
             status_code=status.HTTP_200_OK,
+            headers={"Server-Timing": server_timing(result["metadata"]["timings"])},
         )
 
     except AudioFileError as e:
@@ -7,6 +7,7 @@ from app.core.logger import logger
 from app.services.transcriber import (
     transcription_service,
 )
+from app.whisper import available_backends
 
 
 class TranscriptionAPIService:
@@ -89,6 +90,7 @@ class TranscriptionAPIService:
         diarize_threshold: float,
         max_speakers: int | None,
         use_silhouette: bool,
+        preset: str | None = None,
     ) -> dict[str, Any]:
         """
         Process transcription request with validation and error handling.
@@ -100,6 +102,7 @@ class TranscriptionAPIService:
             diarize_threshold: Clustering threshold
             max_speakers: Maximum number of speakers
             use_silhouette: Whether to use silhouette analysis
+            preset: Decode preset (fast, balanced, accurate)
 
         Returns:
             Transcription result dict
@@ -126,6 +129,7 @@ class TranscriptionAPIService:
             diarize_threshold=diarize_threshold or settings.diarize_threshold,
             max_speakers=max_speakers or settings.max_speakers,
             use_silhouette=use_silhouette or settings.use_silhouette,
+            preset=preset,
         )
 
         return result
@@ -197,7 +201,7 @@ class RootAPIService:
             "features": {
                 "translation": settings.enable_translation,
                 "diarization": settings.enable_diarization,
-                "whisper_backends": ["openai", "transformers"],
+                "whisper_backends": available_backends(),
                 "supported_formats": settings.allowed_formats,
             },
             "documentation": {
@@ -0,0 +1,156 @@
+"""Local inference daemon: keeps models loaded behind a Unix socket for fast CLI calls.
+
+Protocol: one JSON object per line. The client sends a request and reads one
+response line, then the connection closes.
+
+    {"op": "ping"}                      -> {"ok": true, "model": ..., "backend": ...}
+    {"op": "transcribe", "model": ..., "backend": ..., "args": {...}}
+                                        -> {"ok": true, "result": {...}}
+    {"op": "shutdown"}                  -> {"ok": true}
+
+Errors come back as {"ok": false, "error": <exception type>, "message": ...}.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from app.core.config import settings
+from app.core.logger import logger
+
+# Connecting is instant when the daemon is up; do not stall the CLI when it is not.
+CONNECT_TIMEOUT_S = 1.0
+
+
+def default_socket_path() -> Path:
+    """Per-user socket path: DAEMON_SOCKET, else $XDG_RUNTIME_DIR or the temp dir."""
+    if settings.daemon_socket:
+        return Path(settings.daemon_socket)
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return Path(base) / f"vtt-{os.getuid()}.sock"
+
+
+def request_daemon(
+    message: dict[str, Any], socket_path: Path | None = None
+) -> dict[str, Any] | None:
+    """Send one request to the daemon; None when no daemon is listening."""
+    path = socket_path or default_socket_path()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT_S)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    # Transcription can take minutes; only the connect is time-bounded.
+    sock.settimeout(None)
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(json.dumps(message).encode() + b"\n")
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        return None
+    response: dict[str, Any] = json.loads(line)
+    return response
+
+
+async def _dispatch(request: dict[str, Any], stop: asyncio.Event) -> dict[str, Any]:
+    """Run one request against the warm transcription service."""
+    from app.services.transcriber import transcription_service
+
+    op = request.get("op")
+    if op == "ping":
+        return {
+            "ok": True,
+            "pid": os.getpid(),
+            "model": settings.whisper_model,
+            "backend": settings.whisper_backend,
+            "health": transcription_service.health_check(),
+        }
+    if op == "shutdown":
+        stop.set()
+        return {"ok": True}
+    if op != "transcribe":
+        return {"ok": False, "error": "ValueError", "message": f"Unknown op: {op}"}
+
+    wanted = (request.get("model"), request.get("backend"))
+    loaded = (settings.whisper_model, settings.whisper_backend)
+    if wanted != loaded:
+        return {
+            "ok": False,
+            "error": "Incompatible",
+            "message": f"Daemon serves {loaded[0]} ({loaded[1]}), "
+            f"request wants {wanted[0]} ({wanted[1]})",
+        }
+    args = request.get("args", {})
+    result = await transcription_service.transcribe_file(
+        audio_file=Path(args["audio"]),
+        translate=args.get("translate", False),
+        diarize=args.get("diarize", False),
+        diarize_threshold=args.get("diarize_threshold", settings.diarize_threshold),
+        max_speakers=args.get("max_speakers"),
+        use_silhouette=args.get("use_silhouette", False),
+        preset=args.get("preset"),
+        profile=args.get("profile", False),
+    )
+    return {"ok": True, "result": result}
+
+
+async def _serve(path: Path) -> None:
+    stop = asyncio.Event()
+
+    async def handle(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request = json.loads(await reader.readline())
+            response = await _dispatch(request, stop)
+        except Exception as e:
+            logger.exception(f"Daemon request failed: {e}")
+            response = {
+                "ok": False,
+                "error": type(e).__name__,
+                "message": getattr(e, "message", str(e)),
+            }
+        writer.write(json.dumps(response, default=str).encode() + b"\n")
+        await writer.drain()
+        writer.close()
+
+    # Owner-only from the moment the socket file exists.
+    old_umask = os.umask(0o177)
+    try:
+        server = await asyncio.start_unix_server(handle, path=str(path))
+    finally:
+        os.umask(old_umask)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    logger.info(f"Daemon listening on {path} (pid {os.getpid()})")
+    async with server:
+        await stop.wait()
+
+
+def serve(socket_path: Path | None = None, load_classifier: bool = True) -> int:
+    """Load models once and serve requests until SIGINT/SIGTERM or a shutdown op."""
+    from app.services.transcriber import transcription_service
+
+    path = socket_path or default_socket_path()
+    if path.exists():
+        if request_daemon({"op": "ping"}, path) is not None:
+            logger.error(f"A daemon is already listening on {path}")
+            return 1
+        path.unlink()  # stale socket from a crashed daemon
+
+    transcription_service.initialize(load_classifier=load_classifier)
+    try:
+        asyncio.run(_serve(path))
+    finally:
+        path.unlink(missing_ok=True)
+        transcription_service.cleanup()
+    logger.info("Daemon stopped")
+    return 0
@@ -7,7 +7,7 @@ from pathlib import Path
 from app.core.config import settings
 from app.core.errors import AudioFileError, TranscriptionError
 from app.core.logger import logger, setup_logging
-from app.services.transcriber import transcription_service
+from app.whisper import DECODE_PRESETS, available_backends
 
 
 def cmd_list(args: argparse.Namespace) -> int:
@@ -189,12 +189,465 @@ def cmd_dirs(args: argparse.Namespace) -> int:
     return 0
 
 
-def parse_args() -> argparse.Namespace:
+def cmd_convert(args: argparse.Namespace) -> int:
+    """Convert a Whisper model to CTranslate2 format in the model cache.
+
+    Args:
+        args: Parsed arguments
+
+    Returns:
+        Exit code
+    """
+    from app.whisper import convert_ctranslate2_whisper
+
+    model = args.model or settings.whisper_model
+    compute_type = args.compute_type or settings.ctranslate2_compute_type
+    print(f"Converting Whisper '{model}' to CTranslate2 ({compute_type})...")
+    try:
+        output_dir = convert_ctranslate2_whisper(
+            model, settings.model_cache_dir, compute_type=compute_type, force=args.force
+        )
+    except Exception as e:
+        logger.error(f"Conversion failed: {e}")
+        return 1
+
+    print(f"✓ Converted model saved to: {output_dir}")
+    print("Use it offline with: WHISPER_BACKEND=ctranslate2")
+    return 0
+
+
+def cmd_daemon(args: argparse.Namespace) -> int:
+    """Run, query or stop the local inference daemon.
+
+    Args:
+        args: Parsed arguments
+
+    Returns:
+        Exit code
+    """
+    from app.cli.daemon import default_socket_path, request_daemon, serve
+
+    socket_path = args.socket or default_socket_path()
+
+    if args.status or args.stop:
+        response = request_daemon(
+            {"op": "ping" if args.status else "shutdown"}, socket_path
+        )
+        if response is None:
+            print(f"No daemon listening on {socket_path}")
+            return 1
+        if args.stop:
+            print("✓ Daemon stopping")
+        else:
+            print(f"✓ Daemon running (pid {response['pid']}) on {socket_path}")
+            print(f"  Model:   {response['model']} ({response['backend']})")
+            print(f"  Device:  {response['health']['device']}")
+        return 0
+
+    if args.model:
+        settings.whisper_model = args.model
+    if args.backend:
+        settings.whisper_backend = args.backend
+    return serve(socket_path, load_classifier=not args.no_classifier)
+
+
+def cmd_enroll(args: argparse.Namespace) -> int:
+    """Enroll, list or remove known speakers for diarization.
+
+    Args:
+        args: Parsed arguments
+
+    Returns:
+        Exit code
+    """
+    from app.services.speaker_index import SpeakerIndex
+
+    index = SpeakerIndex(args.index)
+
+    if args.list:
+        if not len(index):
+            print(f"No speakers enrolled in {index.path}")
+            return 0
+        print(f"Enrolled speakers ({index.path}):")
+        for name, count in zip(index.names, index.counts, strict=True):
+            print(f"  {name}  ({count} embeddings)")
+        return 0
+
+    if args.remove:
+        if not index.remove(args.remove):
+            print(f"Speaker not enrolled: {args.remove}")
+            return 1
+        print(f"✓ Removed speaker: {args.remove}")
+        return 0
+
+    if not args.name or not args.files:
+        print("Usage: vtt enroll NAME FILE [FILE ...] (or --list, --remove NAME)")
+        return 1
+    missing = [f for f in args.files if not f.exists()]
+    if missing:
+        print(f"File not found: {missing[0]}")
+        return 1
+
+    import numpy as np
+    import torch
+
+    from app.services.diarization import enrollment_embeddings
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    embeddings = [
+        emb
+        for f in args.files
+        if (emb := enrollment_embeddings(str(f), device)) is not None
+    ]
+    if not embeddings:
+        print("No speech found to enroll")
+        return 1
+    try:
+        index.enroll(args.name, np.concatenate(embeddings))
+    except ValueError as e:
+        logger.error(f"Enrollment failed: {e}")
+        return 1
+
+    print(f"✓ Enrolled '{args.name}' in {index.path}")
+    print("Name diarized speakers with: SPEAKER_IDENTIFY=true")
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    """Export the speaker-embedding model for a faster CPU runtime.
+
+    Args:
+        args: Parsed arguments
+
+    Returns:
+        Exit code
+    """
+    from app.services.diarization import load_speaker_classifier
+    from app.services.embedding_runtime import export_embedding_model
+    from app.utils.audio_utils import load_audio
+
+    classifier = load_speaker_classifier("cpu")
+    audio = (
+        load_audio(str(args.audio), sr=settings.DIARIZE_SAMPLE_RATE)
+        if args.audio
+        else None
+    )
+    label = f"{args.runtime}{' int8' if args.int8 else ''}"
+    print(f"Exporting the ECAPA speaker-embedding model to {label}...")
+    if args.int8 and args.runtime == "torchscript":
+        print(
+            "[!] TorchScript int8 only quantizes the Linear layers; ECAPA is mostly "
+            "Conv1d, so expect little change. Use --runtime onnx for int8 convolutions."
+        )
+    try:
+        path, cosine = export_embedding_model(
+            classifier,
+            args.runtime,
+            settings.model_cache_dir,
+            int8=args.int8,
+            force=args.force,
+            audio=audio,
+            min_cosine=settings.DIARIZE_RUNTIME_MIN_COSINE,
+        )
+    except Exception as e:
+        logger.error(f"Export failed: {e}")
+        return 1
+
+    print(f"✓ Exported model saved to: {path}")
+    print(f"  Min cosine similarity to the eager model: {cosine:.5f}")
+    print(
+        f"Use it with: DIARIZE_RUNTIME={args.runtime}"
+        + (" DIARIZE_RUNTIME_INT8=true" if args.int8 else "")
+    )
+    return 0
+
+
+def cmd_diarize(args: argparse.Namespace) -> int:
+    """Diarize a recording as it is written, printing speakers as they are found.
+
+    Args:
+        args: Parsed arguments
+
+    Returns:
+        Exit code
+    """
+    if not args.input.exists():
+        print(f"File not found: {args.input}")
+        return 1
+
+    import numpy as np
+    import torch
+
+    from app.services.diarization import load_speaker_classifier
+    from app.services.online_diarization import OnlineDiarizer
+    from app.utils.audio_utils import follow_pcm, load_audio
+
+    sr = settings.DIARIZE_SAMPLE_RATE
+    if args.follow:
+        chunks = follow_pcm(args.input, sr, idle_timeout_s=args.idle_timeout)
+    else:
+        audio = load_audio(str(args.input), sr=sr)
+        chunks = iter(np.array_split(audio, max(1, len(audio) // sr)))
+    try:
+        # Fails early on a WAV file that is not 16-bit mono at sr
+        first = next(chunks, None)
+    except ValueError as e:
+        print(f"Cannot follow {args.input}: {e}")
+        return 1
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    classifier = load_speaker_classifier(device)
+    if args.follow:
+        print(
+            f"[*] Following {args.input} (Ctrl+C or {args.idle_timeout:g}s idle to stop)"
+        )
+
+    turns: list[dict] = []
+    with OnlineDiarizer(
+        classifier,
+        device,
+        distance_threshold=args.diarize_threshold,
+        max_speakers=args.max_speakers,
+    ) as diarizer:
+        try:
+            chunk = first
+            while chunk is not None:
+                for turn in diarizer.push(chunk):
+                    print(
+                        f"  {turn['start']:8.1f}s - {turn['end']:8.1f}s  {turn['speaker']}"
+                    )
+                # Final turns are kept here, so the diarizer's memory stays bounded
+                turns += diarizer.pop_finalized()
+                chunk = next(chunks, None)
+        except KeyboardInterrupt:
+            print("\n[*] Stopped")
+        turns += diarizer.finish()
+
+    # Earlier labels may have changed since they were printed; merge the final
+    # ones into speaker turns
+    merged: list[dict] = []
+    for turn in turns:
+        if merged and merged[-1]["speaker"] == turn["speaker"]:
+            merged[-1]["end"] = max(merged[-1]["end"], turn["end"])
+        else:
+            merged.append(dict(turn))
+    print(f"\nSpeaker turns ({diarizer.num_speakers} speaker(s)):")
+    for turn in merged:
+        print(f"  {turn['start']:8.1f}s - {turn['end']:8.1f}s  {turn['speaker']}")
+    return 0
+
+
+COMMANDS = (
+    "list",
+    "clean",
+    "info",
+    "dirs",
+    "convert",
+    "daemon",
+    "enroll",
+    "export",
+    "diarize",
+)
+
+
+def parse_command_args(argv: list[str]) -> argparse.Namespace:
+    """Parse arguments for the management subcommands (list, clean, info, ...).
+
+    Args:
+        argv: Command line arguments, starting with the command name
+
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="vtt",
+        description="Voice-to-Text management commands",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="List audio or transcript files")
+    list_parser.add_argument(
+        "type",
+        nargs="?",
+        choices=["audio", "transcripts", "all"],
+        default="all",
+        help="What to list (default: all)",
+    )
+
+    clean_parser = subparsers.add_parser("clean", help="Delete transcript files")
+    clean_parser.add_argument(
+        "pattern", nargs="?", default="", help="Only delete transcripts matching this"
+    )
+    clean_parser.add_argument(
+        "--all", action="store_true", help="Delete all transcripts"
+    )
+    clean_parser.add_argument(
+        "--force", "-f", action="store_true", help="Do not ask for confirmation"
+    )
+
+    subparsers.add_parser("info", help="Show CLI configuration and status")
+
+    dirs_parser = subparsers.add_parser("dirs", help="Ensure all directories exist")
+    dirs_parser.add_argument("--verbose", "-v", action="store_true")
+
+    convert_parser = subparsers.add_parser(
+        "convert",
+        help="Convert a Whisper model for the CTranslate2 backend (stored in the model cache)",
+    )
+    convert_parser.add_argument(
+        "--model",
+        choices=["tiny", "base", "small", "medium", "large"],
+        default=None,
+        help="Whisper model size (default: from settings)",
+    )
+    convert_parser.add_argument(
+        "--compute-type",
+        choices=["int8", "int8_float32", "int8_float16", "float16", "float32"],
+        default=None,
+        help="Weight type of the converted model (default: from settings)",
+    )
+    convert_parser.add_argument(
+        "--force", action="store_true", help="Reconvert even if already converted"
+    )
+
+    daemon_parser = subparsers.add_parser(
+        "daemon",
+        help="Keep models loaded and serve CLI transcriptions over a Unix socket",
+    )
+    daemon_parser.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="Socket path (default: DAEMON_SOCKET or a per-user runtime path)",
+    )
+    daemon_parser.add_argument(
+        "--model",
+        choices=["tiny", "base", "small", "medium", "large"],
+        default=None,
+        help="Whisper model size to keep loaded (default: from settings)",
+    )
+    daemon_parser.add_argument(
+        "--backend",
+        choices=available_backends(),
+        default=None,
+        help="Whisper backend to keep loaded (default: from settings)",
+    )
+    daemon_parser.add_argument(
+        "--no-classifier",
+        action="store_true",
+        help="Do not preload the diarization classifier",
+    )
+    daemon_control = daemon_parser.add_mutually_exclusive_group()
+    daemon_control.add_argument(
+        "--status", action="store_true", help="Show whether a daemon is running"
+    )
+    daemon_control.add_argument(
+        "--stop", action="store_true", help="Stop the running daemon"
+    )
+
+    enroll_parser = subparsers.add_parser(
+        "enroll",
+        help="Enroll a known speaker from recordings of them alone",
+    )
+    enroll_parser.add_argument("name", nargs="?", help="Speaker name")
+    enroll_parser.add_argument(
+        "files", nargs="*", type=Path, help="Audio files with only this speaker"
+    )
+    enroll_parser.add_argument(
+        "--index",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="Speaker index directory (default: SPEAKER_INDEX_DIR or the model cache)",
+    )
+    enroll_control = enroll_parser.add_mutually_exclusive_group()
+    enroll_control.add_argument(
+        "--list", action="store_true", help="List enrolled speakers"
+    )
+    enroll_control.add_argument(
+        "--remove", metavar="NAME", default=None, help="Remove an enrolled speaker"
+    )
+
+    export_parser = subparsers.add_parser(
+        "export",
+        help="Export the speaker-embedding model for a faster CPU runtime",
+    )
+    export_parser.add_argument(
+        "--runtime",
+        choices=["torchscript", "onnx"],
+        default="torchscript",
+        help="Target runtime (onnx needs onnxruntime; default: torchscript)",
+    )
+    export_parser.add_argument(
+        "--int8",
+        action="store_true",
+        help="Quantize weights to int8 (onnx: Conv and MatMul; torchscript: Linear only)",
+    )
+    export_parser.add_argument(
+        "--audio",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Speech to verify the export on (default: synthetic noise)",
+    )
+    export_parser.add_argument(
+        "--force", action="store_true", help="Re-export even if already exported"
+    )
+
+    diarize_parser = subparsers.add_parser(
+        "diarize",
+        help="Diarize a recording, optionally while it is still being written",
+    )
+    diarize_parser.add_argument("input", type=Path, help="Audio file")
+    diarize_parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep reading as the file grows (16-bit mono WAV or raw PCM at 16 kHz)",
+    )
+    diarize_parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=5.0,
+        metavar="S",
+        help="With --follow, stop after the file has not grown for S seconds (default: 5)",
+    )
+    diarize_parser.add_argument(
+        "--diarize-threshold",
+        type=float,
+        default=None,
+        metavar="N",
+        help="Cosine distance for a new speaker (default: from settings)",
+    )
+    diarize_parser.add_argument(
+        "--max-speakers",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Upper bound on the number of speakers",
+    )
+
+    for sub in subparsers.choices.values():
+        sub.add_argument("--debug", action="store_true", help="Enable debug mode")
+
+    return parser.parse_args(argv)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     """Parse command line arguments.
 
+    Args:
+        argv: Command line arguments (default: sys.argv[1:])
+
     Returns:
         Parsed arguments
     """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        return parse_command_args(argv)
+    if argv and argv[0] == "transcribe":
+        argv = argv[1:]
+
     parser = argparse.ArgumentParser(
         description="Voice-to-Text: AI-powered audio transcription using OpenAI Whisper",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -221,6 +674,24 @@ Examples:
   # Use different model
   %(prog)s media/audio/sample.wav --model small
 
+  # Trade accuracy for speed (or --preset accurate for beam search)
+  %(prog)s media/audio/sample.wav --preset fast
+
+  # Write a flame-graph profile to media/profiles/
+  %(prog)s media/audio/sample.wav --profile
+
+  # Run in-process even when a daemon is running
+  %(prog)s media/audio/sample.wav --no-daemon
+
+Commands:
+  %(prog)s list [audio|transcripts|all]   List audio or transcript files
+  %(prog)s clean [PATTERN] [--all]         Delete transcripts
+  %(prog)s info                            Show configuration and status
+  %(prog)s dirs                            Ensure media directories exist
+  %(prog)s convert --model base            Convert a model for the ctranslate2 backend
+  %(prog)s daemon [--status|--stop]        Keep models loaded for fast repeated runs
+  %(prog)s diarize FILE [--follow]         Speaker turns, live for a growing file
+
 Directory Structure:
   The CLI automatically creates media directories if needed:
   - media/audio/      - Default audio files (for CLI usage)
@@ -248,11 +719,19 @@ For more information, see: https://github.com/shahadathhs/voice-to-text
 
     parser.add_argument(
         "--backend",
-        choices=["openai", "transformers"],
+        choices=available_backends(),
         default=None,  # Use settings default
         help="Whisper backend (default: openai from settings)",
     )
 
+    parser.add_argument(
+        "--preset",
+        choices=list(DECODE_PRESETS),
+        default=None,  # Use settings default
+        help="Decode preset: fast (greedy), balanced, accurate (beam search) "
+        "(default: balanced from settings)",
+    )
+
     parser.add_argument(
         "--translate",
         action="store_true",
@@ -318,6 +797,18 @@ For more information, see: https://github.com/shahadathhs/voice-to-text
         help="Disable automatic directory creation",
     )
 
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the transcription into the profiles directory (PROFILE_MODE)",
+    )
+
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Always load models in-process, even if a daemon is running",
+    )
+
     parser.add_argument(
         "--verbose",
         "-v",
@@ -331,7 +822,9 @@ For more information, see: https://github.com/shahadathhs/voice-to-text
         help="Enable debug mode",
     )
 
-    return parser.parse_args()
+    args = parser.parse_args(argv)
+    args.command = "transcribe"
+    return args
 
 
 def validate_args(args: argparse.Namespace) -> None:
@@ -359,6 +852,67 @@ def validate_args(args: argparse.Namespace) -> None:
         raise ValueError("--max-speakers must be at least 1")
 
 
+def print_result(result: dict) -> None:
+    """Print a transcription result.
+
+    Args:
+        result: Result returned by the transcription service
+    """
+    print("\n" + "=" * 80)
+    print("TRANSCRIPTION RESULT")
+    print("=" * 80)
+    print(result["transcript"])
+    print("=" * 80)
+    print(f"\nSaved to: {result['saved_to']}")
+    if "profile" in result["metadata"]:
+        print(f"Profile: {result['metadata']['profile']}")
+    print(f"Metadata: {result['metadata']}")
+    print("=" * 80)
+
+
+def transcribe_via_daemon(args: argparse.Namespace) -> int | None:
+    """Send the transcription to a running daemon.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Exit code, or None when no compatible daemon is running
+    """
+    from app.cli.daemon import request_daemon
+
+    response = request_daemon(
+        {
+            "op": "transcribe",
+            "model": args.model or settings.whisper_model,
+            "backend": args.backend or settings.whisper_backend,
+            "args": {
+                "audio": str(args.input.resolve()),
+                "translate": args.translate or settings.enable_translation,
+                "diarize": args.diarize or settings.enable_diarization,
+                "diarize_threshold": args.diarize_threshold
+                or settings.diarize_threshold,
+                "max_speakers": args.max_speakers or settings.max_speakers,
+                "use_silhouette": args.use_silhouette or settings.use_silhouette,
+                "preset": args.preset,
+                "profile": args.profile,
+            },
+        }
+    )
+    if response is None:
+        return None
+    if not response["ok"]:
+        if response["error"] == "Incompatible":
+            logger.info(f"{response['message']}; running in-process")
+            return None
+        logger.error(f"Daemon error ({response['error']}): {response['message']}")
+        return 1
+
+    logger.info("Transcribed by the running daemon")
+    print_result(response["result"])
+    return 0
+
+
 async def transcribe_async(args: argparse.Namespace) -> int:
     """Transcribe audio file asynchronously.
 
@@ -394,7 +948,21 @@ async def transcribe_async(args: argparse.Namespace) -> int:
 
                 logger.info(f"Using custom media directory: {media_path}")
 
+        # A running daemon already has the models loaded; custom media dirs
+        # only apply to this process, so those runs stay in-process.
+        if not args.no_daemon and not args.media_dir:
+            exit_code = transcribe_via_daemon(args)
+            if exit_code is not None:
+                return exit_code
+
+        if args.model:
+            settings.whisper_model = args.model
+        if args.backend:
+            settings.whisper_backend = args.backend
+
         # Initialize service
+        from app.services.transcriber import transcription_service
+
         logger.info("Initializing transcription service...")
         transcription_service.initialize()
 
@@ -408,17 +976,11 @@ async def transcribe_async(args: argparse.Namespace) -> int:
             diarize_threshold=args.diarize_threshold or settings.diarize_threshold,
             max_speakers=args.max_speakers or settings.max_speakers,
             use_silhouette=args.use_silhouette or settings.use_silhouette,
+            preset=args.preset,
+            profile=args.profile,
         )
 
-        # Print result
-        print("\n" + "=" * 80)
-        print("TRANSCRIPTION RESULT")
-        print("=" * 80)
-        print(result["transcript"])
-        print("=" * 80)
-        print(f"\nSaved to: {result['saved_to']}")
-        print(f"Metadata: {result['metadata']}")
-        print("=" * 80)
+        print_result(result)
 
         return 0
 
@@ -468,6 +1030,16 @@ def main() -> int:
         return cmd_info(args)
     elif args.command == "dirs":
         return cmd_dirs(args)
+    elif args.command == "convert":
+        return cmd_convert(args)
+    elif args.command == "daemon":
+        return cmd_daemon(args)
+    elif args.command == "enroll":
+        return cmd_enroll(args)
+    elif args.command == "export":
+        return cmd_export(args)
+    elif args.command == "diarize":
+        return cmd_diarize(args)
     elif args.command == "transcribe":
         # Print banner
         logger.info(f"{settings.app_name} v{settings.app_version}")
@@ -478,11 +1050,14 @@ def main() -> int:
 
         exit_code = asyncio.run(transcribe_async(args))
 
-        # Cleanup
-        try:
-            transcription_service.cleanup()
-        except Exception as e:
-            logger.warning(f"Cleanup error: {e}")
+        # Cleanup (only if this process loaded the models)
+        if "app.services.transcriber" in sys.modules:
+            from app.services.transcriber import transcription_service
+
+            try:
+                transcription_service.cleanup()
+            except Exception as e:
+                logger.warning(f"Cleanup error: {e}")
 
         return exit_code
     else:
@@ -32,6 +32,29 @@ class Settings(BaseSettings):
     host: str = Field(default="0.0.0.0", description="Server host")  # nosec: B104
     port: int = Field(default=8000, description="Server port")
     workers: int = Field(default=1, description="Number of worker processes")
+    inference_slots: int = Field(
+        default=1, description="Concurrent transcriptions per worker process"
+    )
+
+    daemon_socket: str | None = Field(
+        default=None,
+        description="Unix socket of the CLI inference daemon (None = per-user default)",
+    )
+
+    # CPU layout (threads and affinity per worker, cgroup-quota aware)
+    cpu_auto_tune: bool = Field(
+        default=True,
+        description="Split the CPU budget between workers/slots and set torch threads at startup",
+    )
+    torch_num_threads: int = Field(
+        default=0, description="Intra-op threads per inference slot (0 = auto)"
+    )
+    torch_interop_threads: int = Field(
+        default=0, description="Inter-op threads (0 = auto)"
+    )
+    pin_cpu_affinity: bool = Field(
+        default=True, description="Pin each worker to its own set of CPUs"
+    )
     api_host: str | None = Field(
         default=None,
         description="API base URL (e.g., http://localhost:8000 or https://api.example.com). Auto-detected from request if None.",
@@ -68,23 +91,97 @@ class Settings(BaseSettings):
     whisper_model: Literal["tiny", "base", "small", "medium", "large"] = Field(
         default="base", description="Whisper model size"
     )
-    whisper_backend: Literal["openai", "transformers"] = Field(
+    whisper_backend: Literal["openai", "transformers", "ctranslate2"] = Field(
         default="openai", description="Whisper backend"
     )
     whisper_device: Literal["cpu", "cuda"] = Field(
         default="cpu", description="Whisper device"
     )
+    decode_preset: Literal["fast", "balanced", "accurate"] = Field(
+        default="balanced",
+        description="Default decode preset (fast = greedy, no fallback; accurate = beam search)",
+    )
+    whisper_precision: Literal["fp32", "bf16", "int8"] = Field(
+        default="fp32",
+        description="Inference precision (int8 = dynamic quantization of Linear layers, CPU only)",
+    )
+
+    # OpenAI Whisper decode engine
+    openai_decode_engine: Literal["sequential", "batched"] = Field(
+        default="sequential",
+        description="sequential = model.transcribe; batched = batched window decoding",
+    )
+    openai_batch_size: int = Field(
+        default=8, description="Windows per batch for the batched decode engine"
+    )
+    openai_beam_size: int | None = Field(
+        default=None,
+        description="Beam size for the batched decode engine (None = greedy)",
+    )
+
+    # CTranslate2 backend
+    ctranslate2_compute_type: Literal[
+        "int8", "int8_float32", "int8_float16", "float16", "float32"
+    ] = Field(
+        default="int8",
+        description="CTranslate2 weight/compute type (converted weights are stored per type)",
+    )
+
+    # Transformers chunked long-form mode
+    transformers_chunk_length_s: float = Field(
+        default=0.0,
+        description="Chunk length in seconds for batched long-form decoding (0 = sequential)",
+    )
+    transformers_stride_length_s: float | None = Field(
+        default=None,
+        description="Overlap in seconds on each side of a chunk (None = chunk/6)",
+    )
+    transformers_batch_size: int = Field(
+        default=0, description="Chunks decoded per batch (0 = auto from free memory)"
+    )
+    transformers_assistant_model: str | None = Field(
+        default=None,
+        description="Draft model (size or HF id) for speculative decoding (None = off)",
+    )
 
     # Whisper Constants
     WHISPER_BACKEND_DEFAULT: str = Field(
         default="openai", description="Default Whisper backend"
     )
 
+    # Sharding (parallel long-audio transcription)
+    enable_sharding: bool = Field(
+        default=False,
+        description="Split long audio at silences and transcribe shards in parallel processes",
+    )
+    shard_count: int = Field(
+        default=0, description="Number of shards/processes (0 = auto from CPU cores)"
+    )
+    shard_min_duration_s: float = Field(
+        default=600.0, description="Minimum audio length in seconds to enable sharding"
+    )
+
+    # Sharding Constants
+    SHARD_MIN_LENGTH_S: float = Field(
+        default=30.0, description="Minimum shard length in seconds"
+    )
+    SHARD_SILENCE_SEARCH_S: float = Field(
+        default=10.0,
+        description="Search radius in seconds around each even split for a pause",
+    )
+    SHARD_SILENCE_DB: float = Field(
+        default=-35.0,
+        description="A cut needs a frame this far below loud speech; otherwise the split is skipped",
+    )
+
     # Features
     enable_translation: bool = Field(default=False, description="Enable translation")
     enable_diarization: bool = Field(
         default=False, description="Enable speaker diarization"
     )
+    enable_metrics: bool = Field(
+        default=True, description="Serve Prometheus metrics at /metrics"
+    )
 
     # Diarization
     diarize_threshold: float = Field(default=0.35, description="Diarization threshold")
@@ -92,11 +189,77 @@ class Settings(BaseSettings):
         default=None, description="Maximum number of speakers"
     )
     use_silhouette: bool = Field(default=False, description="Use silhouette analysis")
+    speaker_count_method: Literal["silhouette", "eigengap"] = Field(
+        default="silhouette",
+        description="Speaker count estimator when use_silhouette is set",
+    )
+    clustering_max_exact: int = Field(
+        default=5000,
+        description="Above this many embeddings, cluster in two stages (k-means, then AHC)",
+    )
+    clustering_centroids: int = Field(
+        default=500, description="k-means centroids for two-stage clustering"
+    )
+    diarize_mode: Literal["segments", "concurrent"] = Field(
+        default="segments",
+        description="segments: embed Whisper segments after transcription; "
+        "concurrent: diarize VAD speech regions in parallel with transcription",
+    )
+    diarize_adaptive: bool = Field(
+        default=False,
+        description="Embed long segments coarsely and refine only near speaker changes",
+    )
+    speaker_identify: bool = Field(
+        default=False,
+        description="Name diarized speakers after enrolled speakers (vtt enroll)",
+    )
+    speaker_index_dir: str | None = Field(
+        default=None,
+        description="Enrolled speaker index directory (None = speakers/ in the model cache)",
+    )
+    speaker_match_threshold: float = Field(
+        default=0.5,
+        description="Minimum cosine similarity to name a cluster after an enrolled speaker",
+    )
+    speaker_roster: str | list[str] = Field(
+        default="",
+        description="Enrolled speakers expected in recordings (comma-separated; empty = all)",
+    )
+    diarize_batch_size: int = Field(
+        default=32, description="Chunks per speaker-embedding forward pass"
+    )
+    diarize_shared_features: bool = Field(
+        default=True,
+        description="Compute fbank features once per segment and slice them per window",
+    )
+    diarize_runtime: Literal["eager", "torchscript", "onnx"] = Field(
+        default="eager",
+        description="Speaker-embedding runtime on CPU (exported with vtt export); "
+        "needs diarize_shared_features",
+    )
+    diarize_runtime_int8: bool = Field(
+        default=False, description="Use the int8-quantized embedding export"
+    )
+    diarize_smoothing: Literal["sandwich", "median", "min_run", "none"] = Field(
+        default="sandwich",
+        description="Speaker label smoothing: sandwich (A-B-A -> A-A-A), median "
+        "(majority in a window), min_run (absorb short runs), none",
+    )
+    diarize_smoothing_window: int = Field(
+        default=5, description="Window size in segments for median smoothing"
+    )
+    diarize_min_run_s: float = Field(
+        default=1.0, description="Minimum speaker run duration for min_run smoothing"
+    )
 
     # Diarization Constants
     DIARIZE_SAMPLE_RATE: int = Field(
         default=16000, description="Sample rate for diarization"
     )
+    DIARIZE_RUNTIME_MIN_COSINE: float = Field(
+        default=0.99,
+        description="Minimum embedding cosine similarity of an export to the eager model",
+    )
     MIN_CHUNK_MS: int = Field(default=500, description="Minimum chunk duration in ms")
     MIN_SEGMENT_MS: int = Field(
         default=1000, description="Minimum segment duration in ms"
@@ -113,6 +276,20 @@ class Settings(BaseSettings):
     SUBSEGMENT_STRIDE_S: float = Field(
         default=0.5, description="Subsegment stride in seconds"
     )
+    ADAPTIVE_COARSE_STRIDE_S: float = Field(
+        default=1.5, description="Coarse window stride for adaptive segmentation"
+    )
+    ADAPTIVE_CHANGE_THRESHOLD: float = Field(
+        default=0.3,
+        description="Cosine distance between coarse windows that triggers dense windows",
+    )
+    VAD_THRESHOLD_DB: float = Field(
+        default=-35.0,
+        description="Speech threshold relative to loud speech (concurrent diarization)",
+    )
+    VAD_MIN_SILENCE_S: float = Field(
+        default=0.3, description="Shorter pauses do not split speech regions"
+    )
 
     # Logging
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = Field(
@@ -120,6 +297,32 @@ class Settings(BaseSettings):
     )
     log_file: str | None = Field(default=None, description="Log file path")
 
+    # Tracing (Chrome trace-event files for Perfetto)
+    trace_dir: str | None = Field(
+        default=None, description="Directory for request traces (unset = off)"
+    )
+    trace_sample_rate: float = Field(
+        default=0.1, ge=0.0, le=1.0, description="Share of requests traced"
+    )
+    trace_max_mb: int = Field(
+        default=50, ge=1, description="Rotate a trace file above this size"
+    )
+    trace_backup_count: int = Field(
+        default=5, ge=0, description="Rotated trace files kept per worker"
+    )
+
+    # Profiling (X-Profile header in debug mode, vtt --profile)
+    profile_dir: str | Path = Field(
+        default="media/profiles", description="Directory for request profiles"
+    )
+    profile_mode: Literal["sampling", "cprofile"] = Field(
+        default="sampling",
+        description="sampling: folded stacks for flame graphs; cprofile: pstats",
+    )
+    profile_interval_ms: float = Field(
+        default=5.0, ge=0.5, description="Stack sampling interval"
+    )
+
     # CORS
     cors_origins: str | list[str] = Field(
         default="http://localhost:3000,http://localhost:8000",
@@ -153,6 +356,14 @@ class Settings(BaseSettings):
         # Comma-separated format
         return [f.strip() for f in v.split(",")]
 
+    @field_validator("speaker_roster", mode="before")
+    @classmethod
+    def parse_speaker_roster(cls, v: str | list[str]) -> list[str]:
+        """Parse the speaker roster from a comma-separated string or list."""
+        if isinstance(v, list):
+            return v
+        return [name.strip() for name in v.split(",") if name.strip()]
+
     @property
     def is_dev(self) -> bool:
         """Check if running in development mode."""
@@ -169,7 +380,12 @@ class Settings(BaseSettings):
         return self.environment.lower() in ("testing", "test")
 
     @field_validator(
-        "audio_dir", "uploads_dir", "transcript_dir", "model_cache_dir", mode="before"
+        "audio_dir",
+        "uploads_dir",
+        "transcript_dir",
+        "model_cache_dir",
+        "profile_dir",
+        mode="before",
     )
     @classmethod
     def resolve_paths(cls, v: str | Path) -> Path:
@@ -178,7 +394,9 @@ class Settings(BaseSettings):
             return Path(v)
         return v
 
-    @field_validator("audio_dir", "uploads_dir", "transcript_dir", "model_cache_dir")
+    @field_validator(
+        "audio_dir", "uploads_dir", "transcript_dir", "model_cache_dir", "profile_dir"
+    )
     @classmethod
     def make_absolute(cls, v: Path, info) -> Path:
         """Make paths absolute relative to base directory."""
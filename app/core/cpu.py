@@ -0,0 +1,172 @@
+"""CPU budget detection and per-worker thread/affinity layout (cgroup-quota aware)."""
+
+import fcntl
+import math
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+
+from app.core.config import settings
+from app.core.logger import logger
+
+# cgroup v2 exposes "quota period" (or "max period"); v1 splits them in two files.
+_CGROUP_V2_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+_CGROUP_V1_DIRS = [Path("/sys/fs/cgroup/cpu,cpuacct"), Path("/sys/fs/cgroup/cpu")]
+
+# Held open for the life of the process: the flock marks the worker slot as taken.
+_worker_lock: IO[str] | None = None
+
+
+@dataclass(frozen=True)
+class CpuLayout:
+    """How one worker process uses its share of the CPU budget."""
+
+    worker_index: int
+    workers: int
+    cpus: tuple[int, ...]
+    inference_slots: int
+    intra_op_threads: int
+    inter_op_threads: int
+
+
+def cgroup_cpu_limit() -> float | None:
+    """CPU quota of this container in cores, or None when unlimited/unknown."""
+    try:
+        quota, period = _CGROUP_V2_CPU_MAX.read_text().split()[:2]
+        if quota == "max":
+            return None
+        return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    for base in _CGROUP_V1_DIRS:
+        try:
+            quota_us = int((base / "cpu.cfs_quota_us").read_text())
+            period_us = int((base / "cpu.cfs_period_us").read_text())
+        except (OSError, ValueError):
+            continue
+        return quota_us / period_us if quota_us > 0 and period_us > 0 else None
+    return None
+
+
+def usable_cpus() -> list[int]:
+    """CPU ids this process may be scheduled on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def effective_cpu_count() -> int:
+    """Cores we can actually use: the affinity mask capped by the cgroup quota."""
+    count = len(usable_cpus())
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        # Round down: a fractional core would just be throttled.
+        count = min(count, max(1, math.floor(limit)))
+    return max(1, count)
+
+
+def plan_cpu_layout(
+    worker_index: int,
+    workers: int,
+    inference_slots: int,
+    cpus: list[int],
+    budget: int,
+    intra_op_threads: int = 0,
+    inter_op_threads: int = 0,
+) -> CpuLayout:
+    """
+    Split budget cores evenly between workers (disjoint cpus where possible) and
+    then between the worker's concurrent inference slots. Explicit thread counts
+    override the computed ones.
+    """
+    workers = max(1, workers)
+    slots = max(1, inference_slots)
+    per_worker = max(1, budget // workers)
+    first = (worker_index * per_worker) % len(cpus)
+    own = tuple(
+        cpus[(first + i) % len(cpus)] for i in range(min(per_worker, len(cpus)))
+    )
+    return CpuLayout(
+        worker_index=worker_index,
+        workers=workers,
+        cpus=own,
+        inference_slots=slots,
+        intra_op_threads=intra_op_threads or max(1, per_worker // slots),
+        # Whisper and ECAPA graphs are sequential; extra inter-op threads only spin.
+        inter_op_threads=inter_op_threads or 1,
+    )
+
+
+def _claim_worker_index(workers: int) -> int:
+    """
+    Take the first free worker slot via a lock file. Uvicorn does not tell a worker
+    its index, so siblings coordinate through flock on per-slot files.
+    """
+    global _worker_lock
+    if workers <= 1:
+        return 0
+    lock_dir = Path(tempfile.gettempdir()) / f"vtt-workers-{settings.port}"
+    lock_dir.mkdir(parents=True, exist_ok=True)
+    for index in range(workers):
+        handle = (lock_dir / f"{index}.lock").open("w")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            continue
+        _worker_lock = handle
+        return index
+    # More processes than configured workers (e.g. a restart overlap).
+    return os.getpid() % workers
+
+
+def apply_cpu_layout(layout: CpuLayout, pin_affinity: bool = True) -> None:
+    """Set torch thread pools, OpenMP threads and CPU affinity for this process."""
+    import torch
+
+    # Libraries that size their own pools (CTranslate2, OpenBLAS) read these.
+    os.environ["OMP_NUM_THREADS"] = str(layout.intra_op_threads)
+    os.environ["MKL_NUM_THREADS"] = str(layout.intra_op_threads)
+    torch.set_num_threads(layout.intra_op_threads)
+    try:
+        torch.set_num_interop_threads(layout.inter_op_threads)
+    except RuntimeError:
+        # Only settable before the first parallel op; keep torch's value then.
+        logger.debug("Inter-op thread count already fixed; leaving it unchanged")
+    if pin_affinity and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, layout.cpus)
+        except OSError as e:
+            logger.warning(f"Could not pin CPU affinity to {list(layout.cpus)}: {e}")
+
+
+def configure_cpu(
+    workers: int | None = None, inference_slots: int | None = None
+) -> CpuLayout:
+    """Detect the CPU budget, plan this worker's layout, apply and log it."""
+    # Uvicorn takes its worker count from WEB_CONCURRENCY when --workers is omitted.
+    workers = workers or int(os.environ.get("WEB_CONCURRENCY") or settings.workers)
+    cpus = usable_cpus()
+    budget = effective_cpu_count()
+    layout = plan_cpu_layout(
+        _claim_worker_index(workers),
+        workers,
+        inference_slots or settings.inference_slots,
+        cpus,
+        budget,
+        intra_op_threads=settings.torch_num_threads,
+        inter_op_threads=settings.torch_interop_threads,
+    )
+    apply_cpu_layout(layout, pin_affinity=settings.pin_cpu_affinity)
+    limit = cgroup_cpu_limit()
+    logger.info(
+        f"CPU layout: {budget} usable core(s) "
+        f"(affinity {len(cpus)}, quota {f'{limit:g}' if limit else 'none'}); "
+        f"worker {layout.worker_index + 1}/{layout.workers} on cpus "
+        f"{list(layout.cpus)}, {layout.inference_slots} slot(s) x "
+        f"{layout.intra_op_threads} intra-op thread(s), "
+        f"{layout.inter_op_threads} inter-op"
+    )
+    return layout
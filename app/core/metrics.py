@@ -0,0 +1,112 @@
+"""Prometheus metrics for the API: latency, real-time factor, queueing and models.
+
+Metrics live in the default prometheus_client registry (which also exports
+process CPU and resident memory). Updates are lock-protected counters, and a
+scrape only serializes them, so scraping every second costs well under a
+millisecond. With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an
+empty directory so /metrics aggregates all of them.
+"""
+
+import os
+from typing import Any
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+# Seconds; transcriptions of long files take minutes
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+# Processing time / audio duration
+RTF_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0)
+
+REQUESTS = Counter(
+    "vtt_http_requests_total", "HTTP requests", ["method", "route", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "vtt_http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_LATENCY = Histogram(
+    "vtt_stage_duration_seconds",
+    "Wall time of pipeline stages (see metadata.timings)",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+REAL_TIME_FACTOR = Histogram(
+    "vtt_real_time_factor",
+    "Transcription wall time per second of audio",
+    ["model", "backend"],
+    buckets=RTF_BUCKETS,
+)
+QUEUE_DEPTH = Gauge(
+    "vtt_queue_depth",
+    "Transcriptions waiting for an inference slot",
+    multiprocess_mode="livesum",
+)
+INFLIGHT = Gauge(
+    "vtt_inflight_jobs",
+    "Transcriptions holding an inference slot",
+    multiprocess_mode="livesum",
+)
+INFERENCE_SLOTS = Gauge(
+    "vtt_inference_slots",
+    "Concurrent transcriptions allowed per worker",
+    multiprocess_mode="liveall",
+)
+MODEL_LOAD_SECONDS = Gauge(
+    "vtt_model_load_seconds",
+    "Time taken to load each model at startup",
+    ["component"],
+    multiprocess_mode="liveall",
+)
+MODEL_MEMORY_BYTES = Gauge(
+    "vtt_model_memory_bytes",
+    "Parameter and buffer memory of each loaded PyTorch model",
+    ["component", "device"],
+    multiprocess_mode="liveall",
+)
+CACHE_LOOKUPS = Counter(
+    "vtt_cache_lookups_total",
+    "Lookups of on-disk model caches (hit ratio = hit / all)",
+    ["cache", "result"],
+)
+UPLOAD_BYTES = Counter("vtt_upload_bytes_total", "Bytes of uploaded audio")
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count one lookup of a cache."""
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_model(
+    component: str, model: Any, device: str, load_s: float | None = None
+) -> None:
+    """Record load time and, for PyTorch models, resident parameter memory."""
+    if load_s is not None:
+        MODEL_LOAD_SECONDS.labels(component).set(load_s)
+    # transformers pipelines hold the module in .model; CTranslate2 models are
+    # not PyTorch (their memory shows in process_resident_memory_bytes)
+    module = model if hasattr(model, "parameters") else getattr(model, "model", None)
+    if module is None or not hasattr(module, "parameters"):
+        return
+    tensors = [*module.parameters(), *module.buffers()]
+    size = sum(t.numel() * t.element_size() for t in tensors)
+    MODEL_MEMORY_BYTES.labels(component, device).set(size)
+
+
+def latest_metrics() -> tuple[bytes, str]:
+    """Exposition body and content type, across workers in multiprocess mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,5 +1,7 @@
 """Middleware for enhanced error handling and request processing."""
 
+import time
+import uuid
 from collections.abc import Callable
 from typing import cast
 
@@ -10,7 +12,9 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from app.core.config import settings
 from app.core.errors import AppError
 from app.core.logger import logger
+from app.core.metrics import REQUEST_LATENCY, REQUESTS
 from app.core.response import ResponseBuilder
+from app.core.tracing import trace_request
 
 
 class ErrorHandlingMiddleware(BaseHTTPMiddleware):
@@ -82,15 +86,15 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         Returns:
             Response
         """
-        logger.info(f"{request.method} {request.url.path}")
+        # Scrapes arrive every few seconds; keep them out of the info log
+        log = logger.debug if request.url.path == "/metrics" else logger.info
+        log(f"{request.method} {request.url.path}")
 
         # Process request
         response = await call_next(request)
 
         # Log response status
-        logger.info(
-            f"{request.method} {request.url.path} - Status: {response.status_code}"
-        )
+        log(f"{request.method} {request.url.path} - Status: {response.status_code}")
 
         return cast(Response, response)
 
@@ -104,7 +108,8 @@ class RequestContextMiddleware(BaseHTTPMiddleware):
         call_next: Callable,
     ) -> Response:
         """
-        Add request context for better error tracking.
+        Add request context for better error tracking. Requests without an
+        X-Request-ID get a generated one; it names the request's trace.
 
         Args:
             request: Incoming request
@@ -113,11 +118,45 @@ class RequestContextMiddleware(BaseHTTPMiddleware):
         Returns:
             Response
         """
-        request_id = request.headers.get("X-Request-ID", "unknown")
+        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
         request.state.request_id = request_id
 
-        response = await call_next(request)
+        with trace_request(request_id, f"{request.method} {request.url.path}"):
+            response = await call_next(request)
 
         response.headers["X-Request-ID"] = request_id
 
         return cast(Response, response)
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """Middleware for request count and latency metrics."""
+
+    async def dispatch(
+        self,
+        request: Request,
+        call_next: Callable,
+    ) -> Response:
+        """
+        Count the request and observe its latency, labeled by route template.
+
+        Args:
+            request: Incoming request
+            call_next: Next middleware or route handler
+
+        Returns:
+            Response
+        """
+        start = time.perf_counter()
+        response = await call_next(request)
+
+        # The matched route's template (/uploads/{filename}) keeps label values
+        # bounded; requests that match no route share one label
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        REQUEST_LATENCY.labels(request.method, path).observe(
+            time.perf_counter() - start
+        )
+        REQUESTS.labels(request.method, path, str(response.status_code)).inc()
+
+        return cast(Response, response)
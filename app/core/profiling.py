@@ -0,0 +1,186 @@
+"""On-demand request profiling: flame-graph stacks or cProfile stats of one request.
+
+A profiled request (X-Profile header in debug mode, vtt --profile) writes one
+file to PROFILE_DIR, and its path is returned in metadata.profile.
+
+sampling (default): a background thread reads the stacks of the request's
+threads every PROFILE_INTERVAL_MS and counts them in the folded format
+("thread;outer;...;inner count" per line), which speedscope and flamegraph.pl
+read directly. A thread belongs to the request while it runs one of its stages
+(see timing.stage), the concurrent diarization thread included. The cost is one
+stack walk per thread and interval, however much Python code runs.
+
+cprofile: exact call counts and times (.prof, for pstats or snakeviz). Since
+Python 3.12 the profiler sees every thread of the process, so the profile also
+holds whatever else the worker runs meanwhile, all Python code runs several
+times slower, and only one such profile runs at a time.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import os
+import sys
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from types import FrameType
+
+from app.core.config import settings
+from app.core.logger import logger
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    """Path relative to site-packages or the repository, to keep frames readable."""
+    _, sep, rest = filename.rpartition("site-packages/")
+    if sep:
+        return rest
+    try:
+        return str(Path(filename).relative_to(settings.base_dir))
+    except ValueError:
+        return filename
+
+
+def _fold(frame: FrameType | None, thread_name: str) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(
+            f"{code.co_qualname} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+        )
+        frame = frame.f_back
+    names.append(thread_name)
+    return ";".join(reversed(names))
+
+
+class _Sampler:
+    """Counts the stacks of registered threads from a background thread."""
+
+    def __init__(self, interval_s: float) -> None:
+        self.interval_s = interval_s
+        self.stacks: Counter[str] = Counter()
+        self._threads: dict[int, int] = {}  # ident -> nested profile_thread() calls
+        self._names: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def enter(self) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+            self._names[ident] = threading.current_thread().name
+
+    def exit(self) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            depth = self._threads.pop(ident) - 1
+            if depth:
+                self._threads[ident] = depth
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            with self._lock:
+                threads = [(ident, self._names[ident]) for ident in self._threads]
+            if not threads:
+                continue
+            frames = sys._current_frames()
+            for ident, name in threads:
+                if ident in frames:
+                    self.stacks[_fold(frames[ident], name)] += 1
+
+
+_active_sampler: ContextVar[_Sampler | None] = ContextVar("profile", default=None)
+_cprofile_lock = threading.Lock()
+
+
+def _profile_path(name: str, suffix: str) -> Path:
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    return Path(settings.profile_dir) / f"{name}_{stamp}_{os.getpid()}{suffix}"
+
+
+@contextmanager
+def profile_request(name: str) -> Iterator[Path | None]:
+    """
+    Profile the enclosed block (PROFILE_MODE) into PROFILE_DIR. Yields the file,
+    written when the block ends, or None when the profile cannot be taken.
+    """
+    if settings.profile_mode == "cprofile":
+        with _cprofile(_profile_path(name, ".prof")) as path:
+            yield path
+        return
+
+    path = _profile_path(name, ".folded")
+    sampler = _Sampler(settings.profile_interval_ms / 1000)
+    token = _active_sampler.set(sampler)
+    sampler.start()
+    try:
+        yield path
+    finally:
+        _active_sampler.reset(token)
+        sampler.stop()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(
+                "".join(f"{s} {n}\n" for s, n in sampler.stacks.most_common())
+            )
+            logger.info(
+                f"Profile ({sum(sampler.stacks.values())} samples) written to {path}"
+            )
+        except OSError as e:
+            logger.warning(f"Could not write profile to {path}: {e}")
+
+
+@contextmanager
+def _cprofile(path: Path) -> Iterator[Path | None]:
+    if not _cprofile_lock.acquire(blocking=False):
+        logger.warning("A cProfile profile is already running; not profiling")
+        yield None
+        return
+    try:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:  # another profiler or debugger is active
+            logger.warning(f"Cannot start cProfile: {e}")
+            yield None
+            return
+        try:
+            yield path
+        finally:
+            profiler.disable()
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                profiler.dump_stats(path)
+                logger.info(f"Profile written to {path}")
+            except OSError as e:
+                logger.warning(f"Could not write profile to {path}: {e}")
+    finally:
+        _cprofile_lock.release()
+
+
+@contextmanager
+def profile_thread() -> Iterator[None]:
+    """Sample the current thread during the block if its request is profiled."""
+    sampler = _active_sampler.get()
+    if sampler is None:
+        yield
+        return
+    sampler.enter()
+    try:
+        yield
+    finally:
+        sampler.exit()
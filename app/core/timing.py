@@ -0,0 +1,228 @@
+"""Per-stage timing: wall time, CPU time and peak memory of request stages."""
+
+from __future__ import annotations
+
+import resource
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from pathlib import Path
+from typing import Any, TypeVar, cast
+
+from app.core.logger import logger
+from app.core.metrics import STAGE_LATENCY
+from app.core.profiling import profile_thread
+from app.core.tracing import span
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    """
+    One finished stage. CPU time and memory are process-wide: cpu_ms includes
+    torch's worker threads (cpu_ms / wall_ms is the parallelism) and any
+    concurrent request. peak_rss_mb is the highest resident memory while the
+    stage ran and rss_delta_mb how far that is above the stage's start, so the
+    stage that allocates shows the growth. Both need Linux (/proc/self); other
+    platforms report the process high-water mark and no delta. cuda_peak_mb is
+    the peak allocated CUDA memory during the stage.
+    """
+
+    name: str
+    wall_ms: float
+    cpu_ms: float
+    peak_rss_mb: float
+    rss_delta_mb: float | None = None
+    cuda_peak_mb: float | None = None
+
+
+# Timings of the request on this thread/task; stage() records into it.
+_active_timings: ContextVar[list[StageTiming] | None] = ContextVar(
+    "stage_timings", default=None
+)
+
+
+class _Peaks:
+    """Memory peaks of one running stage (MB)."""
+
+    def __init__(self, rss: float, cuda: float | None) -> None:
+        self.rss_start = rss
+        self.rss = rss
+        self.cuda = cuda
+
+
+# The kernel (VmHWM) and torch keep one peak per process. Every stage start
+# resets them to see its own peak; the peak reached so far is first folded into
+# every stage still running, so nested and concurrent stages stay correct.
+_running: list[_Peaks] = []
+_peaks_lock = threading.Lock()
+_can_reset_rss = sys.platform.startswith("linux")
+
+
+def _rss_mb() -> tuple[float, float]:
+    """Current and peak (since the last reset) resident memory."""
+    if _can_reset_rss:
+        fields = dict(
+            line.split(":", 1)
+            for line in Path("/proc/self/status").read_text().splitlines()
+            if ":" in line
+        )
+        return (
+            int(fields["VmRSS"].split()[0]) / 1024,
+            int(fields["VmHWM"].split()[0]) / 1024,
+        )
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    peak = maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return peak, peak
+
+
+def _cuda() -> Any:
+    # Only report when the request already uses CUDA; never import torch here
+    torch = sys.modules.get("torch")
+    if torch is None or not torch.cuda.is_initialized():
+        return None
+    return torch.cuda
+
+
+def _fold_peaks() -> tuple[float, float | None]:
+    """Fold the process peaks into every running stage; returns current usage."""
+    rss, rss_peak = _rss_mb()
+    cuda = _cuda()
+    cuda_now = cuda_peak = None
+    if cuda is not None:
+        cuda_now = float(cuda.memory_allocated()) / 2**20
+        cuda_peak = float(cuda.max_memory_allocated()) / 2**20
+    for peaks in _running:
+        peaks.rss = max(peaks.rss, rss_peak)
+        if cuda_peak is not None:
+            peaks.cuda = max(peaks.cuda or 0.0, cuda_peak)
+    return rss, cuda_now
+
+
+def _start_peaks() -> _Peaks:
+    global _can_reset_rss
+    with _peaks_lock:
+        rss, cuda_now = _fold_peaks()
+        if _can_reset_rss:
+            try:
+                # "5" resets VmHWM to the current RSS (Linux 4.0+)
+                Path("/proc/self/clear_refs").write_text("5")
+            except OSError:
+                _can_reset_rss = False
+        cuda = _cuda()
+        if cuda is not None:
+            cuda.reset_peak_memory_stats()
+        peaks = _Peaks(rss, cuda_now)
+        _running.append(peaks)
+        return peaks
+
+
+def _finish_peaks(peaks: _Peaks) -> None:
+    with _peaks_lock:
+        _fold_peaks()
+        _running.remove(peaks)
+
+
+@contextmanager
+def track_timings(
+    timings: list[StageTiming] | None = None,
+) -> Iterator[list[StageTiming]]:
+    """
+    Collect the stages finished in this context into timings while active.
+    Threads started with run_in_threadpool inherit the context; plain executors
+    need contextvars.copy_context().run.
+    """
+    acc = timings if timings is not None else []
+    token = _active_timings.set(acc)
+    try:
+        yield acc
+    finally:
+        _active_timings.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Measure the enclosed block, log it at debug level and record it if tracked.
+
+    The wall time also goes to the vtt_stage_duration_seconds histogram, the
+    block is a span of the request trace when it is sampled, and its thread is
+    sampled when the request is profiled.
+    """
+    peaks = _start_peaks()
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    try:
+        with span(name), profile_thread():
+            yield
+    finally:
+        wall_s = time.perf_counter() - wall0
+        cpu_s = time.process_time() - cpu0
+        _finish_peaks(peaks)
+        STAGE_LATENCY.labels(name).observe(wall_s)
+        timing = StageTiming(
+            name=name,
+            wall_ms=wall_s * 1e3,
+            cpu_ms=cpu_s * 1e3,
+            peak_rss_mb=peaks.rss,
+            rss_delta_mb=peaks.rss - peaks.rss_start if _can_reset_rss else None,
+            cuda_peak_mb=peaks.cuda,
+        )
+        logger.debug(
+            f"Stage {name}: {timing.wall_ms:.1f} ms wall, {timing.cpu_ms:.1f} ms CPU, "
+            f"peak RSS {timing.peak_rss_mb:.0f} MB"
+        )
+        timings = _active_timings.get()
+        if timings is not None:
+            timings.append(timing)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator form of stage()."""
+
+    def decorator(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with stage(name):
+                return fn(*args, **kwargs)
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+def timings_summary(timings: list[StageTiming]) -> dict[str, dict[str, float]]:
+    """Response metadata: one entry per stage name, repeated stages summed."""
+    summary: dict[str, dict[str, float]] = {}
+    for t in timings:
+        entry = summary.setdefault(
+            t.name, {"wall_ms": 0.0, "cpu_ms": 0.0, "peak_rss_mb": 0.0}
+        )
+        entry["wall_ms"] = round(entry["wall_ms"] + t.wall_ms, 1)
+        entry["cpu_ms"] = round(entry["cpu_ms"] + t.cpu_ms, 1)
+        entry["peak_rss_mb"] = round(max(entry["peak_rss_mb"], t.peak_rss_mb), 1)
+        if t.rss_delta_mb is not None:
+            entry["rss_delta_mb"] = round(
+                max(entry.get("rss_delta_mb", 0.0), t.rss_delta_mb), 1
+            )
+        if t.cuda_peak_mb is not None:
+            entry["cuda_peak_mb"] = round(
+                max(entry.get("cuda_peak_mb", 0.0), t.cuda_peak_mb), 1
+            )
+    return summary
+
+
+def server_timing(summary: dict[str, dict[str, float]]) -> str:
+    """Server-Timing header value for a timings summary."""
+    return ", ".join(
+        f'{name};dur={t["wall_ms"]:.1f};desc="cpu {t["cpu_ms"]:.0f}ms, '
+        f'rss {t["peak_rss_mb"]:.0f}MB'
+        + (f' +{t["rss_delta_mb"]:.0f}MB' if "rss_delta_mb" in t else "")
+        + '"'
+        for name, t in summary.items()
+    )
@@ -0,0 +1,182 @@
+"""Request tracing: nested spans exported as Chrome trace-event JSON (Perfetto).
+
+A sampled request (TRACE_SAMPLE_RATE) collects the spans opened below it: every
+stage() plus finer spans such as each Whisper window and embedding batch. At
+the end of the request they are appended to TRACE_DIR/trace-<pid>.json in one
+write, and the file is rotated at TRACE_MAX_MB. Files use the JSON array form
+of the trace-event format, whose closing bracket is optional, so they stay
+loadable (ui.perfetto.dev, chrome://tracing) while they are being written.
+
+Each (request, thread) pair gets its own track, named after the X-Request-ID,
+so concurrent requests never interleave on one track. Unsampled requests pay
+one context-variable lookup per span.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any
+
+from app.core.config import settings
+from app.core.logger import logger
+
+_track_ids = itertools.count(1)
+
+
+class _Trace:
+    """Spans of one sampled request."""
+
+    def __init__(self, request_id: str) -> None:
+        self.request_id = request_id
+        self.events: list[dict[str, Any]] = []
+        self._tracks: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start_us: int, dur_us: float, args: dict) -> None:
+        thread = threading.current_thread()
+        with self._lock:
+            tid = self._tracks.get(thread.ident or 0)
+            if tid is None:
+                tid = self._tracks[thread.ident or 0] = next(_track_ids)
+                self.events.append(
+                    {
+                        "ph": "M",
+                        "name": "thread_name",
+                        "pid": os.getpid(),
+                        "tid": tid,
+                        "args": {"name": f"{self.request_id} {thread.name}"},
+                    }
+                )
+            self.events.append(
+                {
+                    "ph": "X",
+                    "name": name,
+                    "cat": name.split(".")[0],
+                    "ts": start_us,
+                    "dur": round(dur_us, 1),
+                    "pid": os.getpid(),
+                    "tid": tid,
+                    "args": {"request_id": self.request_id, **args},
+                }
+            )
+
+
+class _TraceWriter:
+    """Appends requests to trace-<pid>.json, rotating like RotatingFileHandler."""
+
+    def __init__(self, directory: str | Path, max_bytes: int, backups: int) -> None:
+        self.path = Path(directory) / f"trace-{os.getpid()}.json"
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+
+    def write(self, events: list[dict[str, Any]]) -> None:
+        data = "".join(json.dumps(e, separators=(",", ":")) + ",\n" for e in events)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            size = self.path.stat().st_size if self.path.exists() else 0
+            if size and size + len(data) > self.max_bytes:
+                self._rotate()
+                size = 0
+            with self.path.open("a") as f:
+                if not size:
+                    header = {
+                        "ph": "M",
+                        "name": "process_name",
+                        "pid": os.getpid(),
+                        "args": {"name": f"vtt worker {os.getpid()}"},
+                    }
+                    f.write("[\n" + json.dumps(header) + ",\n")
+                f.write(data)
+
+    def _rotate(self) -> None:
+        """trace-<pid>.json -> .1.json -> ... -> .<backups>.json (oldest dropped)."""
+
+        def numbered(i: int) -> Path:
+            return self.path.with_suffix(f".{i}.json")
+
+        numbered(self.backups).unlink(missing_ok=True)
+        for i in range(self.backups - 1, 0, -1):
+            if numbered(i).exists():
+                numbered(i).replace(numbered(i + 1))
+        if self.backups > 0:
+            self.path.replace(numbered(1))
+        else:
+            self.path.unlink()
+
+
+_active_trace: ContextVar[_Trace | None] = ContextVar("trace", default=None)
+_writer: _TraceWriter | None = None
+
+
+def _get_writer() -> _TraceWriter | None:
+    global _writer
+    if not settings.trace_dir:
+        return None
+    if _writer is None:
+        _writer = _TraceWriter(
+            settings.trace_dir,
+            settings.trace_max_mb * 1024 * 1024,
+            settings.trace_backup_count,
+        )
+    return _writer
+
+
+@contextmanager
+def trace_request(request_id: str, name: str = "request") -> Iterator[bool]:
+    """
+    Trace the enclosed request if TRACE_DIR is set and it is sampled; yields
+    whether it is. The request's spans are written when it ends.
+    """
+    writer = _get_writer()
+    if writer is None or random.random() >= settings.trace_sample_rate:  # nosec B311
+        yield False
+        return
+    trace = _Trace(request_id)
+    token = _active_trace.set(trace)
+    try:
+        with span(name):
+            yield True
+    finally:
+        _active_trace.reset(token)
+        try:
+            writer.write(trace.events)
+        except OSError as e:
+            logger.warning(f"Could not write trace to {writer.path}: {e}")
+
+
+@contextmanager
+def span(name: str, **args: Any) -> Iterator[None]:
+    """Record the enclosed block as a span of the current trace, if any."""
+    trace = _active_trace.get()
+    if trace is None:
+        yield
+        return
+    start_us = time.time_ns() // 1000
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, start_us, (time.perf_counter() - t0) * 1e6, args)
+
+
+def trace_calls(obj: Any, attr: str, name: str) -> None:
+    """Wrap obj.attr (on the instance) so every call is a span."""
+    fn: Callable[..., Any] = getattr(obj, attr)
+
+    @wraps(fn)
+    def traced(*args: Any, **kwargs: Any) -> Any:
+        with span(name):
+            return fn(*args, **kwargs)
+
+    setattr(obj, attr, traced)
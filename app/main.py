@@ -12,6 +12,7 @@ from app.core.logger import logger
 from app.core.middleware import (
     ErrorHandlingMiddleware,
     LoggingMiddleware,
+    MetricsMiddleware,
     RequestContextMiddleware,
 )
 from app.services.transcriber import lifespan_manager
@@ -56,7 +57,7 @@ AI-powered voice transcription service using OpenAI Whisper model with support f
 - **Multiple Audio Formats**: Support for WAV, MP3, OGG, M4A, FLAC, AAC
 - **Translation**: Convert non-English audio to English
 - **Speaker Diarization**: Identify and label different speakers automatically
-- **Multiple Backends**: OpenAI Whisper or Hugging Face Transformers
+- **Multiple Backends**: OpenAI Whisper, Hugging Face Transformers, or CTranslate2
 - **Fully Local**: All processing happens on your machine - no data sent to cloud
 
 ### 📚 Documentation Viewers
@@ -99,6 +100,8 @@ All audio processing is done locally. Your audio files never leave your server.
 app.add_middleware(RequestContextMiddleware)
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(ErrorHandlingMiddleware)
+if settings.enable_metrics:
+    app.add_middleware(MetricsMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
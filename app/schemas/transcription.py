@@ -9,12 +9,23 @@ class TranscriptionMetadata(BaseModel):
 
     model: str = Field(..., description="Whisper model size used")
     backend: str = Field(
-        ..., description="Whisper backend used (openai or transformers)"
+        ..., description="Whisper backend used (openai, transformers or ctranslate2)"
     )
     device: str = Field(..., description="Device used (cpu or cuda)")
+    preset: str = Field(
+        "balanced", description="Decode preset used (fast, balanced or accurate)"
+    )
     translated: bool = Field(..., description="Whether translation was performed")
     diarized: bool = Field(..., description="Whether speaker diarization was performed")
     audio_file: str = Field(..., description="Path to audio file")
+    timings: dict[str, dict[str, float]] = Field(
+        default_factory=dict,
+        description="Per stage: wall_ms, cpu_ms, peak_rss_mb, rss_delta_mb (Linux) "
+        "and cuda_peak_mb (GPU)",
+    )
+    profile: str | None = Field(
+        default=None, description="Profile file, when the request was profiled"
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -23,6 +34,7 @@ class TranscriptionMetadata(BaseModel):
                     "model": "base",
                     "backend": "openai",
                     "device": "cpu",
+                    "preset": "balanced",
                     "translated": False,
                     "diarized": True,
                     "audio_file": "media/audio/sample.wav",
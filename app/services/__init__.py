@@ -1,23 +1,55 @@
 """Services for Voice-to-Text application."""
 
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from app.services.diarization import (
     assign_speaker_by_overlap,
+    assign_speakers_by_overlap,
     overlap,
     perform_diarization,
 )
-from app.services.pipeline import transcribe
-from app.services.transcriber import (
-    TranscriptionService,
-    lifespan_manager,
-    transcription_service,
-)
+from app.services.online_diarization import OnlineDiarizer
+from app.services.sharding import transcribe_sharded
+from app.services.speaker_index import SpeakerIndex
+
+if TYPE_CHECKING:
+    from app.services.pipeline import transcribe
+    from app.services.transcriber import (
+        TranscriptionService,
+        lifespan_manager,
+        transcription_service,
+    )
+
+# The pipeline and the service import torch at module level; load them on first
+# use so the torch-free services (diarization helpers, sharding) import without it
+_EXPORTS = {
+    "transcribe": ("app.services.pipeline", "transcribe"),
+    "TranscriptionService": ("app.services.transcriber", "TranscriptionService"),
+    "lifespan_manager": ("app.services.transcriber", "lifespan_manager"),
+    "transcription_service": ("app.services.transcriber", "transcription_service"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = _EXPORTS[name]
+    value = getattr(importlib.import_module(module_name), attr)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
+    "OnlineDiarizer",
+    "SpeakerIndex",
     "TranscriptionService",
     "assign_speaker_by_overlap",
+    "assign_speakers_by_overlap",
     "lifespan_manager",
     "overlap",
     "perform_diarization",
     "transcribe",
+    "transcribe_sharded",
     "transcription_service",
 ]
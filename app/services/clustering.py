@@ -0,0 +1,207 @@
+"""Speaker clustering: one average-linkage tree over cosine distances, cut per k.
+
+Equivalent to sklearn's AgglomerativeClustering(metric="cosine",
+linkage="average"), which builds the same scipy linkage and cuts it with the
+same heap walk, but the tree is built once and reused for every candidate
+speaker count instead of refitting per k.
+
+Above max_exact embeddings the O(n^2) distance matrix is avoided by clustering
+in two stages: mini-batch k-means over-clusters the embeddings into a few
+hundred centroids, and the tree is built over the centroids only.
+"""
+
+from heapq import heappush, heappushpop
+from typing import Literal
+
+import numpy as np
+
+SpeakerCountMethod = Literal["silhouette", "eigengap"]
+SPEAKER_COUNT_METHODS: tuple[str, ...] = ("silhouette", "eigengap")
+
+
+def cosine_linkage(embeddings: np.ndarray) -> np.ndarray:
+    """Average-linkage tree (scipy linkage matrix) over pairwise cosine distances."""
+    from scipy.cluster.hierarchy import linkage
+    from scipy.spatial.distance import pdist
+
+    tree: np.ndarray = linkage(pdist(embeddings, metric="cosine"), method="average")
+    return tree
+
+
+def _leaves(node: int, children: np.ndarray, n_leaves: int) -> list[int]:
+    stack, leaves = [node], []
+    while stack:
+        x = stack.pop()
+        if x < n_leaves:
+            leaves.append(x)
+        else:
+            stack.extend(children[x - n_leaves])
+    return leaves
+
+
+def cut_linkage(tree: np.ndarray, n_clusters: int) -> np.ndarray:
+    """Labels for n_clusters clusters, numbered as AgglomerativeClustering numbers them."""
+    n_leaves = len(tree) + 1
+    children = tree[:, :2].astype(int)
+    # Split the most recent merge until n_clusters subtrees remain (max-heap
+    # of node ids via negation); labels follow heap order, as in sklearn.
+    nodes = [-(int(max(children[-1])) + 1)]
+    for _ in range(n_clusters - 1):
+        these_children = children[-nodes[0] - n_leaves]
+        heappush(nodes, -int(these_children[0]))
+        heappushpop(nodes, -int(these_children[1]))
+    labels = np.zeros(n_leaves, dtype=np.intp)
+    for i, node in enumerate(nodes):
+        labels[_leaves(-node, children, n_leaves)] = i
+    return labels
+
+
+def estimate_speakers_silhouette(
+    embeddings: np.ndarray, tree: np.ndarray, max_k: int = 10
+) -> tuple[int, dict[int, float]]:
+    """Speaker count with the best cosine silhouette over k = 2..max_k.
+
+    The distance matrix is computed once (with sklearn's cosine_distances, so
+    scores equal silhouette_score(embeddings, labels, metric="cosine")).
+    """
+    from sklearn.metrics import silhouette_score
+    from sklearn.metrics.pairwise import cosine_distances
+
+    distances = cosine_distances(embeddings)
+    best_k, best_score = 2, -1.0
+    scores: dict[int, float] = {}
+    for k in range(2, min(max_k + 1, len(embeddings))):
+        labels = cut_linkage(tree, k)
+        if len(set(labels)) < k:
+            continue
+        scores[k] = float(silhouette_score(distances, labels, metric="precomputed"))
+        if scores[k] > best_score:
+            best_score = scores[k]
+            best_k = k
+    return best_k, scores
+
+
+def estimate_speakers_eigengap(
+    embeddings: np.ndarray, max_k: int = 10, p_ratio: float = 0.2
+) -> tuple[int, np.ndarray]:
+    """Speaker count from the largest eigengap of the normalized affinity Laplacian.
+
+    Cosine similarities are pruned to each chunk's top p_ratio neighbours
+    (binarized and symmetrized) to suppress cross-speaker noise. Only the
+    smallest max_k + 1 eigenvalues are computed, with a sparse solver on large
+    inputs. Returns k in 1..max_k and the eigenvalues.
+    """
+    n = len(embeddings)
+    if n < 3:
+        return 1, np.zeros(n)
+    unit = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    sim = unit @ unit.T
+    np.fill_diagonal(sim, -np.inf)
+    p = max(1, min(n - 1, round(p_ratio * n)))
+    neighbours = np.argpartition(-sim, p - 1, axis=1)[:, :p]
+    affinity = np.zeros((n, n))
+    np.put_along_axis(affinity, neighbours, 1.0, axis=1)
+    affinity = (affinity + affinity.T) / 2
+
+    inv_sqrt = 1.0 / np.sqrt(affinity.sum(axis=1))
+    normalized = inv_sqrt[:, None] * affinity * inv_sqrt[None, :]
+    n_eig = min(max_k + 1, n)
+    if n > 4 * n_eig:
+        from scipy.sparse.linalg import eigsh
+
+        top = eigsh(normalized, k=n_eig, which="LA", return_eigenvectors=False)
+    else:
+        top = np.linalg.eigvalsh(normalized)[-n_eig:]
+    # Laplacian eigenvalues are 1 - affinity eigenvalues, ascending
+    eigenvalues = np.sort(1.0 - top)
+    gaps = np.diff(eigenvalues)
+    return int(np.argmax(gaps[:max_k])) + 1, eigenvalues
+
+
+def overcluster(
+    embeddings: np.ndarray, n_centroids: int, seed: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """Mini-batch k-means on unit-normalized embeddings (approximately spherical).
+
+    Memory stays linear in the number of embeddings. Returns the centroids that
+    received at least one embedding and each embedding's centroid index.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+
+    unit = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    # Over-clustering only needs a fine partition, not a good k-means optimum:
+    # random init with one run is several times faster than k-means++.
+    kmeans = MiniBatchKMeans(
+        n_clusters=min(n_centroids, len(unit)),
+        init="random",
+        n_init=1,
+        batch_size=2048,
+        random_state=seed,
+    )
+    assignment = kmeans.fit_predict(unit)
+    used, assignment = np.unique(assignment, return_inverse=True)
+    return kmeans.cluster_centers_[used], assignment
+
+
+def cluster_speakers(
+    embeddings: np.ndarray,
+    distance_threshold: float = 0.35,
+    max_speakers: int | None = None,
+    estimate_count: bool = False,
+    method: str = "silhouette",
+    max_k: int = 10,
+    max_exact: int | None = None,
+    n_centroids: int = 500,
+    speaker_cap: int | None = None,
+) -> np.ndarray:
+    """Cluster chunk embeddings into speakers.
+
+    A fixed max_speakers wins; otherwise estimate_count picks k with the given
+    method (silhouette needs at least 4 embeddings); otherwise the tree is cut
+    at distance_threshold. An estimated or threshold k is then capped at
+    speaker_cap. With more than max_exact embeddings, the same is done over
+    n_centroids k-means centroids and mapped back to the embeddings.
+    """
+    n = len(embeddings)
+    if n < 2:
+        return np.zeros(n, dtype=np.intp)
+    if max_exact is not None and n > max_exact:
+        centroids, assignment = overcluster(embeddings, n_centroids)
+        print(f"[*] Two-stage clustering: {n} embeddings -> {len(centroids)} centroids")
+        centroid_labels = cluster_speakers(
+            centroids,
+            distance_threshold,
+            max_speakers,
+            estimate_count,
+            method,
+            max_k,
+            speaker_cap=speaker_cap,
+        )
+        _, labels = np.unique(centroid_labels[assignment], return_inverse=True)
+        return labels.astype(np.intp)
+    tree = cosine_linkage(embeddings)
+
+    if max_speakers is not None and max_speakers >= 1:
+        k = min(max_speakers, n)
+    elif estimate_count and method == "eigengap":
+        k, eigenvalues = estimate_speakers_eigengap(embeddings, max_k)
+        print(
+            f"[*] Eigengap speaker count: {k} "
+            f"(eigenvalues {', '.join(f'{v:.3f}' for v in eigenvalues)})"
+        )
+    elif estimate_count and n >= 4:
+        if method != "silhouette":
+            raise ValueError(
+                f"Unknown speaker count method: {method}. "
+                f"Available: {', '.join(SPEAKER_COUNT_METHODS)}"
+            )
+        k, scores = estimate_speakers_silhouette(embeddings, tree, max_k)
+        print(
+            f"[*] Silhouette speaker count: {k} "
+            f"({', '.join(f'k={c}: {s:.3f}' for c, s in scores.items())})"
+        )
+    else:
+        k = int(np.count_nonzero(tree[:, 2] >= distance_threshold)) + 1
+    if max_speakers is None and speaker_cap is not None and speaker_cap >= 1:
+        k = min(k, speaker_cap)
+    return cut_linkage(tree, k)
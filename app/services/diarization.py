@@ -1,12 +1,35 @@
 """Speaker diarization: SpeechBrain embeddings, sliding-window sub-segments, temporal smoothing."""
 
-import os
+import time
 from collections import Counter
+from pathlib import Path
 from typing import Any
 
 import numpy as np
 
 from app.core.config import settings
+from app.core.logger import logger
+from app.core.timing import stage, timed
+from app.core.tracing import span
+from app.services.clustering import cluster_speakers
+from app.services.embedding_runtime import load_embedding_runtime
+from app.services.smoothing import smooth_labels
+from app.services.speaker_index import SpeakerIndex, cluster_centroids
+from app.utils.audio_utils import load_audio, speech_regions
+
+# An exported runtime only runs on shared features; say so once per process
+_warned_runtime_without_shared_features = False
+
+
+def load_speaker_classifier(device: str) -> Any:
+    """Load the SpeechBrain ECAPA speaker classifier, cached in MODEL_CACHE_DIR/speechbrain."""
+    from speechbrain.inference.speaker import EncoderClassifier
+
+    return EncoderClassifier.from_hparams(
+        source="speechbrain/spkrec-ecapa-voxceleb",
+        run_opts={"device": device},
+        savedir=str(Path(settings.model_cache_dir) / "speechbrain"),
+    )
 
 
 def overlap(s1: float, e1: float, s2: float, e2: float) -> float:
@@ -31,10 +54,76 @@ def assign_speaker_by_overlap(
     return max(speaker_overlap.items(), key=lambda x: x[1])[0]
 
 
+def assign_speakers_by_overlap(
+    spans: list[tuple[float, float]],
+    diarized_segments: list[dict[str, Any]],
+    default: str = "SPEAKER_00",
+) -> list[str]:
+    """assign_speaker_by_overlap for many segments at once, with identical results.
+
+    Diarized segments are sorted by start; for each span only those starting
+    within one maximum segment duration before it can overlap, which a
+    searchsorted pair finds. Candidates are then accumulated in their original
+    order, so per-speaker sums and tie-breaks match the per-segment scan.
+    """
+    if not diarized_segments:
+        return [default] * len(spans)
+
+    starts = np.array([d["start"] for d in diarized_segments], dtype=np.float64)
+    ends = np.array([d["end"] for d in diarized_segments], dtype=np.float64)
+    order = np.argsort(starts, kind="stable")
+    sorted_starts = starts[order]
+    # Slack keeps rounding in s - max_len from excluding a true candidate;
+    # the exact overlap test below filters any extras.
+    max_len = float(np.max(ends - starts, initial=0.0)) + 1e-6
+
+    q = np.array(spans, dtype=np.float64).reshape(-1, 2)
+    lo = np.searchsorted(sorted_starts, q[:, 0] - max_len, side="right")
+    hi = np.searchsorted(sorted_starts, q[:, 1], side="left")
+
+    speakers = []
+    for (s, e), a, b in zip(q, lo, hi, strict=True):
+        cand = np.sort(order[a:b])
+        ov = np.minimum(e, ends[cand]) - np.maximum(s, starts[cand])
+        speaker_overlap: dict[str, float] = {}
+        for j, o in zip(cand[ov > 0], ov[ov > 0], strict=True):
+            sp = diarized_segments[j]["speaker"]
+            speaker_overlap[sp] = speaker_overlap.get(sp, 0) + float(o)
+        speakers.append(
+            max(speaker_overlap.items(), key=lambda x: x[1])[0]
+            if speaker_overlap
+            else default
+        )
+    return speakers
+
+
+def nearest_chunk_labels(
+    centers: np.ndarray, chunk_centers: np.ndarray, chunk_labels: np.ndarray
+) -> np.ndarray:
+    """Label of the chunk whose center is nearest each query center.
+
+    Ties go to the earliest chunk, as in a linear scan with a strict comparison:
+    equal chunk centers collapse to their first occurrence, and a query midway
+    between two centers takes the one with the lower chunk index.
+    """
+    uniq, first = np.unique(chunk_centers, return_index=True)
+    pos = np.searchsorted(uniq, centers)
+    left = np.clip(pos - 1, 0, len(uniq) - 1)
+    right = np.clip(pos, 0, len(uniq) - 1)
+    d_left = np.abs(centers - uniq[left])
+    d_right = np.abs(centers - uniq[right])
+    take_right = (d_right < d_left) | (
+        (d_right == d_left) & (first[right] < first[left])
+    )
+    return np.asarray(chunk_labels)[np.where(take_right, first[right], first[left])]
+
+
 def _build_diarization_chunks(
     segments: list[dict[str, Any]],
+    stride_s: float | None = None,
 ) -> list[tuple[float, float, int]]:
     """Build (start_s, end_s, segment_idx) for embedding extraction. Long segments use sliding windows."""
+    stride_s = stride_s or settings.SUBSEGMENT_STRIDE_S
     chunks = []
     for i, seg in enumerate(segments):
         start_s, end_s = seg["start"], seg["end"]
@@ -43,7 +132,7 @@ def _build_diarization_chunks(
             t = start_s
             while t + settings.SUBSEGMENT_WINDOW_S <= end_s:
                 chunks.append((t, t + settings.SUBSEGMENT_WINDOW_S, i))
-                t += settings.SUBSEGMENT_STRIDE_S
+                t += stride_s
             if t < end_s and (end_s - t) * 1000 >= settings.MIN_CHUNK_MS:
                 chunks.append((max(t, end_s - settings.SUBSEGMENT_WINDOW_S), end_s, i))
         else:
@@ -52,36 +141,264 @@ def _build_diarization_chunks(
     return chunks
 
 
-def _temporal_smooth_labels(
+def _frame_hop(classifier: Any) -> int | None:
+    """Samples per frame of the classifier's fbank front-end; None if it has none."""
+    try:
+        return int(classifier.mods.compute_features.compute_STFT.hop_length)
+    except AttributeError:
+        return None
+
+
+def _chunk_features(
+    classifier: Any,
+    kept: list[tuple[tuple[float, float, int], np.ndarray]],
+    audio: np.ndarray,
+    sr: int,
+    hop: int,
+    device: str,
+) -> list[Any]:
+    """Fbank frames per chunk, sliced from one front-end pass per diarized segment.
+
+    Overlapping sliding windows of a segment share frames, so the filterbank runs
+    once per segment instead of once per window. Windows start on the stride grid
+    (a whole number of frames); only a segment's final window may be shifted by
+    up to half a frame. Edge frames see neighbouring audio instead of zero
+    padding, so embeddings match per-window extraction closely but not bitwise.
+    """
+    import torch
+
+    by_seg: dict[int, list[int]] = {}
+    for i, ((_, _, seg_idx), _) in enumerate(kept):
+        by_seg.setdefault(seg_idx, []).append(i)
+
+    feats: list[Any] = [None] * len(kept)
+    for idxs in by_seg.values():
+        span_start = min(int(kept[i][0][0] * sr) for i in idxs)
+        span_end = max(int(kept[i][0][1] * sr) for i in idxs)
+        wav = torch.from_numpy(audio[span_start:span_end]).to(device).unsqueeze(0)
+        with torch.no_grad():
+            span_feats = classifier.mods.compute_features(wav)[0]
+        for i in idxs:
+            first = round((int(kept[i][0][0] * sr) - span_start) / hop)
+            feats[i] = span_feats[first : first + len(kept[i][1]) // hop + 1]
+    return feats
+
+
+def extract_embeddings(
+    classifier: Any,
+    audio: np.ndarray,
+    sr: int,
+    chunks: list[tuple[float, float, int]],
+    device: str,
+    batch_size: int,
+    verbose: bool = True,
+) -> tuple[np.ndarray, list[tuple[float, float, int]]]:
+    """Embed chunks in padded batches; returns embeddings and metadata in chunk order.
+
+    Chunks are bucketed by length (sorted, then cut into batches) so most batches
+    hold equal-length sliding windows and need no padding. Each batch passes
+    relative lengths (wav_lens) so padding is masked out of feature normalization
+    and pooling. With DIARIZE_SHARED_FEATURES, fbank frames are computed once per
+    segment and fed to the normalization and encoder directly; classifiers
+    without an fbank front-end fall back to encode_batch on waveforms.
+    """
+    import torch
+    from torch.nn.utils.rnn import pad_sequence
+
+    min_samples = settings.MIN_CHUNK_MS * sr // 1000
+    kept = []
+    for start_s, end_s, seg_idx in chunks:
+        seg_audio = audio[int(start_s * sr) : int(end_s * sr)]
+        if len(seg_audio) >= min_samples:
+            kept.append(((start_s, end_s, seg_idx), seg_audio))
+    if not kept:
+        return np.empty((0, 0), dtype=np.float32), []
+
+    t0 = time.perf_counter()
+    hop = _frame_hop(classifier) if settings.diarize_shared_features else None
+    runtime = None
+    if hop is not None:
+        inputs = _chunk_features(classifier, kept, audio, sr, hop, device)
+        if device == "cpu":
+            runtime = load_embedding_runtime(
+                settings.diarize_runtime,
+                settings.model_cache_dir,
+                settings.diarize_runtime_int8,
+                settings.DIARIZE_RUNTIME_MIN_COSINE,
+            )
+
+        def embed(batch: Any, wav_lens: Any) -> Any:
+            feats = classifier.mods.mean_var_norm(batch, wav_lens)
+            if runtime is not None:
+                return runtime(feats, wav_lens)
+            return classifier.mods.embedding_model(feats, wav_lens)
+
+    else:
+        global _warned_runtime_without_shared_features
+        if (
+            settings.diarize_runtime != "eager"
+            and not _warned_runtime_without_shared_features
+        ):
+            _warned_runtime_without_shared_features = True
+            logger.warning(
+                f"DIARIZE_RUNTIME={settings.diarize_runtime} needs "
+                "DIARIZE_SHARED_FEATURES=true; using eager"
+            )
+        inputs = [torch.from_numpy(seg_audio).to(device) for _, seg_audio in kept]
+        embed = classifier.encode_batch
+
+    order = sorted(range(len(kept)), key=lambda i: inputs[i].shape[0])
+    embeddings: dict[int, np.ndarray] = {}
+    batch_size = max(1, batch_size)
+    for b in range(0, len(order), batch_size):
+        idx = order[b : b + batch_size]
+        lengths = [inputs[i].shape[0] for i in idx]
+        max_len = max(lengths)
+        batch = pad_sequence([inputs[i] for i in idx], batch_first=True)
+        wav_lens = torch.tensor([n / max_len for n in lengths], device=device)
+        with span("diarize.embedding_batch", size=len(idx)), torch.no_grad():
+            emb = embed(batch, wav_lens)
+        emb_np = emb.reshape(len(idx), -1).cpu().numpy()
+        for row, i in enumerate(idx):
+            embeddings[i] = emb_np[row]
+    elapsed = time.perf_counter() - t0
+
+    if verbose:
+        print(
+            f"[*] Embedded {len(kept)} chunks in {elapsed:.2f}s "
+            f"({len(kept) / max(elapsed, 1e-9):.1f} chunks/s, batch size {batch_size}, "
+            f"{'shared' if hop is not None else 'per-window'} features"
+            f"{f', {settings.diarize_runtime}' if runtime is not None else ''})"
+        )
+    return (
+        np.stack([embeddings[i] for i in range(len(kept))]),
+        [meta for meta, _ in kept],
+    )
+
+
+def _adaptive_embeddings(
+    classifier: Any,
+    audio: np.ndarray,
+    sr: int,
+    segments: list[dict[str, Any]],
+    device: str,
+) -> tuple[np.ndarray, list[tuple[float, float, int]]]:
+    """Coarse-to-dense chunking: dense windows only around likely speaker changes.
+
+    Long segments are first embedded with windows at ADAPTIVE_COARSE_STRIDE_S.
+    Where two consecutive coarse windows of a segment differ by more than
+    ADAPTIVE_CHANGE_THRESHOLD (cosine distance), the dense windows spanning
+    them are embedded too. Single-speaker stretches keep only coarse windows.
+    """
+    dense = _build_diarization_chunks(segments)
+    coarse = _build_diarization_chunks(segments, settings.ADAPTIVE_COARSE_STRIDE_S)
+    emb, meta = extract_embeddings(
+        classifier, audio, sr, coarse, device, settings.diarize_batch_size
+    )
+    if not meta:
+        return emb, meta
+
+    unit = emb / np.linalg.norm(emb, axis=1, keepdims=True)
+    change = (1.0 - (unit[:-1] * unit[1:]).sum(axis=1)) > (
+        settings.ADAPTIVE_CHANGE_THRESHOLD
+    )
+    spans: dict[int, list[tuple[float, float]]] = {}
+    for j in np.flatnonzero(change):
+        if meta[j][2] == meta[j + 1][2]:
+            spans.setdefault(meta[j][2], []).append((meta[j][0], meta[j + 1][1]))
+
+    # Coarse and dense window starts are accumulated separately: compare in ms.
+    have = {(round(st, 3), round(en, 3), i) for st, en, i in meta}
+    refine = [
+        c
+        for c in dense
+        if (round(c[0], 3), round(c[1], 3), c[2]) not in have
+        and any(
+            lo - 1e-3 <= c[0] and c[1] <= hi + 1e-3 for lo, hi in spans.get(c[2], ())
+        )
+    ]
+    if refine:
+        ref_emb, ref_meta = extract_embeddings(
+            classifier, audio, sr, refine, device, settings.diarize_batch_size
+        )
+        if ref_meta:
+            emb = np.concatenate([emb, ref_emb])
+            meta = meta + ref_meta
+            order = sorted(range(len(meta)), key=lambda i: (meta[i][2], meta[i][0]))
+            emb, meta = emb[order], [meta[i] for i in order]
+
+    print(
+        f"[*] Adaptive segmentation: {len(meta)} embeddings instead of {len(dense)} "
+        f"(saved {len(dense) - len(meta)}, {sum(map(len, spans.values()))} "
+        "change point(s) refined)"
+    )
+    return emb, meta
+
+
+def _embed_segments(
+    classifier: Any,
+    audio: np.ndarray,
+    sr: int,
     segments: list[dict[str, Any]],
-    seg_label: dict[int, int],
-    max_duration_s: float = settings.SMOOTHING_MAX_DURATION_S,
-) -> dict[int, int]:
-    """Flip short segments that differ from both neighbors to reduce flickering."""
-    n = len(segments)
-    changed = True
-    while changed:
-        changed = False
-        for i in range(n):
-            if i not in seg_label:
-                continue
-            dur = segments[i]["end"] - segments[i]["start"]
-            if dur > max_duration_s:
-                continue
-            prev_l = seg_label.get(i - 1) if i > 0 else None
-            next_l = seg_label.get(i + 1) if i < n - 1 else None
-            cur_l = seg_label[i]
-            if (
-                prev_l is not None
-                and next_l is not None
-                and prev_l == next_l
-                and cur_l != prev_l
-            ):
-                seg_label[i] = prev_l
-                changed = True
-    return seg_label
+    device: str,
+) -> tuple[np.ndarray, list[tuple[float, float, int]]]:
+    """Embeddings and (start_s, end_s, segment_idx) of the diarization chunks."""
+    if settings.diarize_adaptive:
+        return _adaptive_embeddings(classifier, audio, sr, segments, device)
+    chunks = _build_diarization_chunks(segments)
+    return extract_embeddings(
+        classifier, audio, sr, chunks, device, settings.diarize_batch_size
+    )
+
+
+def _cluster_and_identify(
+    embeddings: np.ndarray,
+    distance_threshold: float,
+    max_speakers: int | None,
+    use_silhouette: bool,
+) -> tuple[np.ndarray, dict[int, str]]:
+    """Cluster chunk embeddings; with SPEAKER_IDENTIFY, name clusters after enrolled speakers.
+
+    Without an explicit speaker count, SPEAKER_ROSTER caps the number of
+    clusters found by the threshold or estimate; it does not force that many.
+    """
+    index = None
+    roster = list(settings.speaker_roster) or None
+    speaker_cap = None
+    if settings.speaker_identify:
+        index = SpeakerIndex()
+        if not len(index):
+            print(f"[!] Speaker identification: no speakers enrolled in {index.path}")
+            index = None
+        elif roster and max_speakers is None:
+            speaker_cap = len(roster)
+            print(f"[*] At most {speaker_cap} speaker(s), from SPEAKER_ROSTER")
+
+    labels = cluster_speakers(
+        embeddings,
+        distance_threshold=distance_threshold,
+        max_speakers=max_speakers,
+        estimate_count=use_silhouette,
+        method=settings.speaker_count_method,
+        max_exact=settings.clustering_max_exact,
+        n_centroids=settings.clustering_centroids,
+        speaker_cap=speaker_cap,
+    )
+    if index is None:
+        return labels, {}
+    names = index.match(
+        cluster_centroids(embeddings, labels),
+        threshold=settings.speaker_match_threshold,
+        roster=roster,
+    )
+    print(
+        f"[*] Identified {len(names)} of {int(labels.max()) + 1} speaker(s)"
+        + (f": {', '.join(sorted(names.values()))}" if names else "")
+    )
+    return labels, names
 
 
+@timed("diarize")
 def perform_diarization(
     audio_path: str,
     segments: list[dict[str, Any]],
@@ -98,92 +415,34 @@ def perform_diarization(
     print("[*] Extracting speaker embeddings for diarization...")
     try:
         import librosa
-        import torch
-        from sklearn.cluster import AgglomerativeClustering
-        from speechbrain.inference.speaker import EncoderClassifier
+        import speechbrain  # noqa: F401
     except Exception as e:
         print(f"[!] Error loading diarization dependencies: {e}")
         return None
 
     if classifier is None:
-        classifier = EncoderClassifier.from_hparams(
-            source="speechbrain/spkrec-ecapa-voxceleb",
-            run_opts={"device": device},
-            savedir=os.path.join(os.path.expanduser("~"), ".cache", "speechbrain"),
-        )
+        classifier = load_speaker_classifier(device)
 
     # Load audio with librosa (Python 3.13+ compatible)
-    audio, sr = librosa.load(
-        audio_path,
-        sr=settings.DIARIZE_SAMPLE_RATE,
-        mono=True,
-    )
-
-    chunks = _build_diarization_chunks(segments)
-    embeddings_list = []
-    chunk_meta = []
-
-    for start_s, end_s, seg_idx in chunks:
-        # Convert seconds to sample indices
-        start_sample = int(start_s * sr)
-        end_sample = int(end_s * sr)
-
-        # Extract audio segment
-        seg_audio = audio[start_sample:end_sample]
-
-        # Check minimum duration in samples
-        if len(seg_audio) < (settings.MIN_CHUNK_MS * sr // 1000):
-            continue
-
-        # Convert to tensor (librosa already returns float32 normalized to [-1, 1])
-        signal = torch.from_numpy(seg_audio).to(device)
-        with torch.no_grad():
-            emb = classifier.encode_batch(signal.unsqueeze(0))
-            embeddings_list.append(emb.squeeze().cpu().numpy())
-            chunk_meta.append((start_s, end_s, seg_idx))
-
-    if not embeddings_list:
-        return None
-
-    embeddings = np.array(embeddings_list)
-    n_emb = len(embeddings)
-
-    if max_speakers is not None and max_speakers >= 1:
-        n_clusters = min(max_speakers, n_emb)
-        clustering = AgglomerativeClustering(
-            n_clusters=n_clusters,
-            metric="cosine",
-            linkage="average",
+    with stage("diarize.decode"):
+        audio, sr = librosa.load(
+            audio_path,
+            sr=settings.DIARIZE_SAMPLE_RATE,
+            mono=True,
         )
-    elif use_silhouette and n_emb >= 4:
-        from sklearn.metrics import silhouette_score
 
-        best_k, best_score = 2, -1.0
-        for k in range(2, min(11, n_emb)):
-            c = AgglomerativeClustering(
-                n_clusters=k, metric="cosine", linkage="average"
-            )
-            labels = c.fit_predict(embeddings)
-            if len(set(labels)) < k:
-                continue
-            sc = silhouette_score(embeddings, labels, metric="cosine")
-            if sc > best_score:
-                best_score = sc
-                best_k = k
-        clustering = AgglomerativeClustering(
-            n_clusters=best_k,
-            metric="cosine",
-            linkage="average",
-        )
-    else:
-        clustering = AgglomerativeClustering(
-            n_clusters=None,
-            distance_threshold=distance_threshold,
-            metric="cosine",
-            linkage="average",
+    # librosa already returns float32 normalized to [-1, 1]
+    with stage("diarize.embeddings"):
+        embeddings, chunk_meta = _embed_segments(
+            classifier, audio, int(sr), segments, device
         )
+    if not chunk_meta:
+        return None
 
-    chunk_labels = clustering.fit_predict(embeddings)
+    with stage("diarize.clustering"):
+        chunk_labels, names = _cluster_and_identify(
+            embeddings, distance_threshold, max_speakers, use_silhouette
+        )
 
     seg_label: dict[int, int] = {}
     votes_by_seg: dict[int, list[int]] = {}
@@ -195,38 +454,166 @@ def perform_diarization(
         votes = votes_by_seg[seg_idx]
         seg_label[seg_idx] = Counter(votes).most_common(1)[0][0]
 
-    chunk_centers = [
-        ((s + e) / 2, seg_idx, lab)
-        for (s, e, seg_idx), lab in zip(chunk_meta, chunk_labels, strict=False)
-    ]
-    for i in range(len(segments)):
-        if i in seg_label:
-            continue
-        seg = segments[i]
-        center_i = (seg["start"] + seg["end"]) / 2
-        best_label = 0
-        best_dist = float("inf")
-        for center_j, _, label in chunk_centers:
-            d = abs(center_i - center_j)
-            if d < best_dist:
-                best_dist = d
-                best_label = label
-        seg_label[i] = best_label
-
-    seg_label = _temporal_smooth_labels(segments, seg_label)
-
-    num_speakers = max(seg_label.values()) + 1
+    # Segments without an embedding take the label of the nearest chunk
+    unlabeled = [i for i in range(len(segments)) if i not in seg_label]
+    if unlabeled:
+        chunk_centers = np.array([(s + e) / 2 for s, e, _ in chunk_meta])
+        centers = np.array(
+            [(segments[i]["start"] + segments[i]["end"]) / 2 for i in unlabeled]
+        )
+        nearest = nearest_chunk_labels(centers, chunk_centers, chunk_labels)
+        for i, label in zip(unlabeled, nearest, strict=True):
+            seg_label[i] = int(label)
+
+    return _speaker_map(
+        segments,
+        np.array([seg_label.get(i, -1) for i in range(len(segments))]),
+        names,
+    )
+
+
+def _speaker_map(
+    segments: list[dict[str, Any]],
+    labels: np.ndarray,
+    names: dict[int, str] | None = None,
+) -> list[dict[str, Any]]:
+    """Smooth per-segment labels and build the diarized segment list.
+
+    Labels found in names are output under that name, others as SPEAKER_NN.
+    """
+    if not segments:
+        return []
+    names = names or {}
+    smoothed = smooth_labels(
+        labels,
+        np.array([seg["end"] - seg["start"] for seg in segments]),
+        policy=settings.diarize_smoothing,
+        max_duration_s=settings.SMOOTHING_MAX_DURATION_S,
+        window=settings.diarize_smoothing_window,
+        min_run_s=settings.diarize_min_run_s,
+    )
+
+    num_speakers = int(smoothed.max()) + 1
     diarization_map = []
     for i, seg in enumerate(segments):
-        label = seg_label.get(i, 0)
+        label = max(int(smoothed[i]), 0)
         diarization_map.append(
             {
                 "start": seg["start"],
                 "end": seg["end"],
-                "speaker": f"SPEAKER_{label:02d}",
+                "speaker": names.get(label, f"SPEAKER_{label:02d}"),
                 "text": seg["text"].strip(),
             }
         )
 
     print(f"[*] Diarization: {num_speakers} speaker(s) across {len(segments)} segments")
     return diarization_map
+
+
+@timed("diarize")
+def diarize_speech(
+    audio: np.ndarray,
+    device: str,
+    classifier: Any = None,
+    distance_threshold: float = 0.35,
+    max_speakers: int | None = None,
+    use_silhouette: bool = False,
+) -> list[dict[str, Any]] | None:
+    """
+    Segment-independent diarization of 16 kHz audio: speaker turns over energy-VAD
+    speech regions, so it can run while Whisper is still transcribing.
+    Returns one {"start", "end", "speaker"} turn per embedded window.
+    """
+    print("[*] Diarizing speech regions (independent of transcription)...")
+    try:
+        import speechbrain  # noqa: F401
+    except Exception as e:
+        print(f"[!] Error loading diarization dependencies: {e}")
+        return None
+
+    if classifier is None:
+        classifier = load_speaker_classifier(device)
+
+    sr = settings.DIARIZE_SAMPLE_RATE
+    with stage("diarize.vad"):
+        regions = speech_regions(
+            audio,
+            sr,
+            threshold_db=settings.VAD_THRESHOLD_DB,
+            min_silence_s=settings.VAD_MIN_SILENCE_S,
+        )
+    with stage("diarize.embeddings"):
+        embeddings, chunk_meta = _embed_segments(
+            classifier, audio, sr, [{"start": s, "end": e} for s, e in regions], device
+        )
+    if not chunk_meta:
+        return None
+
+    with stage("diarize.clustering"):
+        chunk_labels, names = _cluster_and_identify(
+            embeddings, distance_threshold, max_speakers, use_silhouette
+        )
+    print(f"[*] Speaker turns: {len(chunk_meta)} windows over {len(regions)} regions")
+    return [
+        {
+            "start": start_s,
+            "end": end_s,
+            "speaker": names.get(int(label), f"SPEAKER_{int(label):02d}"),
+        }
+        for (start_s, end_s, _), label in zip(chunk_meta, chunk_labels, strict=True)
+    ]
+
+
+def enrollment_embeddings(
+    audio_path: str, device: str, classifier: Any = None
+) -> np.ndarray | None:
+    """Window embeddings over the speech of a single-speaker recording (for enrollment)."""
+    try:
+        import speechbrain  # noqa: F401
+    except Exception as e:
+        print(f"[!] Error loading diarization dependencies: {e}")
+        return None
+
+    if classifier is None:
+        classifier = load_speaker_classifier(device)
+
+    sr = settings.DIARIZE_SAMPLE_RATE
+    audio = load_audio(audio_path, sr=sr)
+    regions = speech_regions(
+        audio,
+        sr,
+        threshold_db=settings.VAD_THRESHOLD_DB,
+        min_silence_s=settings.VAD_MIN_SILENCE_S,
+    )
+    chunks = _build_diarization_chunks([{"start": s, "end": e} for s, e in regions])
+    embeddings, meta = extract_embeddings(
+        classifier, audio, sr, chunks, device, settings.diarize_batch_size
+    )
+    return embeddings if meta else None
+
+
+def apply_speaker_turns(
+    segments: list[dict[str, Any]], turns: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """
+    Label Whisper segments with speaker turns from diarize_speech: the speaker with
+    the most overlap, else the nearest turn; then the usual smoothing.
+    """
+    if not segments:
+        return []
+    # Turn speakers are SPEAKER_NN or enrolled names: number them in sorted order
+    speaker_ids = {sp: i for i, sp in enumerate(sorted({t["speaker"] for t in turns}))}
+    speakers = assign_speakers_by_overlap(
+        [(seg["start"], seg["end"]) for seg in segments], turns, default=""
+    )
+    labels = np.array([speaker_ids[sp] if sp else -1 for sp in speakers])
+    missing = np.flatnonzero(labels < 0)
+    if len(missing) and turns:
+        labels[missing] = nearest_chunk_labels(
+            np.array(
+                [(segments[i]["start"] + segments[i]["end"]) / 2 for i in missing]
+            ),
+            np.array([(t["start"] + t["end"]) / 2 for t in turns]),
+            np.array([speaker_ids[t["speaker"]] for t in turns]),
+        )
+    return _speaker_map(segments, labels, {i: sp for sp, i in speaker_ids.items()})
@@ -0,0 +1,303 @@
+"""Exported CPU runtimes for the ECAPA speaker-embedding model (TorchScript, ONNX).
+
+Only the ECAPA-TDNN encoder is exported: the fbank front end (shared across
+windows, see diarization._chunk_features) and the per-utterance mean-variance
+normalization stay in SpeechBrain. The encoder builds its padding mask with
+len(), which tracing records as a constant, so the graph is traced at a fixed
+batch of EXPORT_BATCH with a dynamic frame axis and every batch is padded and
+split to that size. Exports are optionally int8 (dynamic weight quantization:
+Conv and MatMul for ONNX, but only the few Linear layers for TorchScript, which
+leaves the Conv1d-heavy encoder nearly unchanged) and are stored under
+model_cache_dir/speechbrain.
+
+Every export is checked against the eager encoder on a batch of another size
+and other lengths than the trace used. It is only written if the minimum
+embedding cosine similarity reaches min_cosine, and the measured value is
+stored next to it and checked again at load time.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Literal
+
+import numpy as np
+
+from app.core.logger import logger
+
+EmbeddingRuntime = Literal["eager", "torchscript", "onnx"]
+EMBEDDING_RUNTIMES: tuple[str, ...] = ("eager", "torchscript", "onnx")
+EXPORT_BATCH = 8
+
+_INSTALL_HINT = "Install the optional runtime: pip install 'voice-to-text[onnx]'"
+
+# Clip lengths (s) for tracing, and other lengths (and batch size) for verification
+_TRACE_LENGTHS_S = (1.5, 1.5, 0.9, 1.5, 2.0, 1.5, 1.2, 1.5)
+_VERIFY_LENGTHS_S = (3.0, 1.5, 0.6, 2.2, 1.5, 1.5, 1.1, 0.8, 1.5, 2.7, 1.5)
+
+
+def runtime_path(cache_dir: str | Path, runtime: str, int8: bool = False) -> Path:
+    """File holding the exported embedding model for a runtime."""
+    suffix = ".onnx" if runtime == "onnx" else ".pt"
+    name = f"ecapa-{runtime}{'-int8' if int8 else ''}{suffix}"
+    return Path(cache_dir) / "speechbrain" / name
+
+
+def _meta_path(path: Path) -> Path:
+    return path.with_suffix(path.suffix + ".json")
+
+
+def _sample_features(
+    classifier: Any, lengths_s: tuple[float, ...], audio: np.ndarray | None, seed: int
+) -> tuple[Any, Any]:
+    """Normalized fbank batch (and relative lengths) from clips of audio or noise."""
+    import torch
+    from torch.nn.utils.rnn import pad_sequence
+
+    from app.core.config import settings
+
+    sr = settings.DIARIZE_SAMPLE_RATE
+    rng = np.random.default_rng(seed)
+    feats = []
+    for length_s in lengths_s:
+        n = int(length_s * sr)
+        if audio is not None and len(audio) > n:
+            start = int(rng.integers(0, len(audio) - n))
+            clip = audio[start : start + n]
+        else:
+            clip = rng.normal(scale=0.1, size=n)
+        wav = torch.from_numpy(np.asarray(clip, dtype=np.float32)).unsqueeze(0)
+        with torch.no_grad():
+            feats.append(classifier.mods.compute_features(wav)[0])
+    max_len = max(f.shape[0] for f in feats)
+    wav_lens = torch.tensor([f.shape[0] / max_len for f in feats])
+    batch = pad_sequence(feats, batch_first=True)
+    with torch.no_grad():
+        return classifier.mods.mean_var_norm(batch, wav_lens), wav_lens
+
+
+def _fixed_batches(run: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+    """Run a fixed-batch encoder on any batch: pad with copies of row 0, split, trim."""
+    import torch
+
+    def embed(feats: Any, wav_lens: Any) -> Any:
+        feats, wav_lens = feats.cpu(), wav_lens.cpu()
+        n = feats.shape[0]
+        pad = -n % EXPORT_BATCH
+        if pad:
+            feats = torch.cat([feats, feats[:1].expand(pad, -1, -1)])
+            wav_lens = torch.cat([wav_lens, wav_lens[:1].expand(pad)])
+        out = [
+            run(feats[i : i + EXPORT_BATCH], wav_lens[i : i + EXPORT_BATCH])
+            for i in range(0, len(feats), EXPORT_BATCH)
+        ]
+        return torch.cat(out)[:n]
+
+    return embed
+
+
+def _load(path: Path, runtime: str) -> Callable[[Any, Any], Any]:
+    """Callable (normalized feats, wav_lens) -> embeddings for an exported file."""
+    import torch
+
+    if runtime == "torchscript":
+        module = torch.jit.load(str(path), map_location="cpu")
+        return _fixed_batches(module)
+    if runtime == "onnx":
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError(f"onnxruntime is not installed. {_INSTALL_HINT}") from e
+        session = ort.InferenceSession(str(path), providers=["CPUExecutionProvider"])
+
+        def run(feats: Any, wav_lens: Any) -> Any:
+            inputs = {
+                "feats": feats.numpy().astype(np.float32),
+                "wav_lens": wav_lens.numpy().astype(np.float32),
+            }
+            return torch.from_numpy(session.run(None, inputs)[0])
+
+        return _fixed_batches(run)
+    raise ValueError(
+        f"Unknown embedding runtime: {runtime}. Available: {', '.join(EMBEDDING_RUNTIMES)}"
+    )
+
+
+def _min_cosine(a: Any, b: Any) -> float:
+    a = a.reshape(a.shape[0], -1).double()
+    b = b.reshape(b.shape[0], -1).double()
+    cos = (a * b).sum(1) / (a.norm(dim=1) * b.norm(dim=1))
+    return float(cos.min())
+
+
+def export_embedding_model(
+    classifier: Any,
+    runtime: str,
+    cache_dir: str | Path,
+    int8: bool = False,
+    force: bool = False,
+    audio: np.ndarray | None = None,
+    min_cosine: float = 0.99,
+) -> tuple[Path, float]:
+    """
+    Export the encoder of a classifier loaded on CPU, under cache_dir.
+    Returns the file and its minimum cosine similarity to the eager encoder;
+    raises ValueError (and writes nothing) if that is below min_cosine.
+    """
+    import torch
+
+    path = runtime_path(cache_dir, runtime, int8)
+    if path.exists() and _meta_path(path).exists() and not force:
+        meta = json.loads(_meta_path(path).read_text())
+        if meta.get("batch") == EXPORT_BATCH:
+            return path, float(meta["min_cosine"])
+    if runtime not in ("torchscript", "onnx"):
+        raise ValueError(f"Cannot export to runtime: {runtime}")
+
+    encoder = classifier.mods.embedding_model.eval()
+    feats, wav_lens = _sample_features(classifier, _TRACE_LENGTHS_S, audio, seed=0)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+
+    if runtime == "torchscript":
+        from app.whisper.precision import quantize_linear_int8
+
+        # Dynamic int8 covers the Linear layers (ECAPA is mostly Conv1d); quantize
+        # a copy, the encoder belongs to the live classifier
+        target = quantize_linear_int8(copy.deepcopy(encoder)) if int8 else encoder
+        with torch.no_grad():
+            traced = torch.jit.trace(target, (feats, wav_lens), check_trace=False)
+        torch.jit.save(torch.jit.freeze(traced.eval()), str(tmp))
+    else:
+        with torch.no_grad():
+            torch.onnx.export(
+                encoder,
+                (feats, wav_lens),
+                str(tmp),
+                input_names=["feats", "wav_lens"],
+                output_names=["embeddings"],
+                dynamic_axes={"feats": {1: "frames"}},
+                opset_version=17,
+                dynamo=False,
+            )
+        if int8:
+            try:
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+            except ImportError as e:
+                tmp.unlink(missing_ok=True)
+                raise ImportError(
+                    f"onnxruntime is not installed. {_INSTALL_HINT}"
+                ) from e
+            quantized = tmp.with_name(tmp.name + ".int8")
+            quantize_dynamic(str(tmp), str(quantized), weight_type=QuantType.QInt8)
+            quantized.replace(tmp)
+
+    verify_feats, verify_lens = _sample_features(
+        classifier, _VERIFY_LENGTHS_S, audio, seed=1
+    )
+    try:
+        with torch.no_grad():
+            expected = encoder(verify_feats, verify_lens)
+            actual = _load(tmp, runtime)(verify_feats, verify_lens)
+        cosine = _min_cosine(expected, actual)
+    except Exception:
+        tmp.unlink(missing_ok=True)
+        raise
+    if cosine < min_cosine:
+        tmp.unlink(missing_ok=True)
+        raise ValueError(
+            f"{runtime}{' int8' if int8 else ''} export diverges from the eager model: "
+            f"min cosine similarity {cosine:.5f} < {min_cosine}"
+        )
+
+    tmp.replace(path)
+    _meta_path(path).write_text(
+        json.dumps(
+            {
+                "runtime": runtime,
+                "int8": int8,
+                "batch": EXPORT_BATCH,
+                "min_cosine": cosine,
+                "torch": torch.__version__,
+            },
+            indent=2,
+        )
+    )
+    return path, cosine
+
+
+# Successfully loaded runtimes; failures are not cached, so an export made
+# later (or a transient load error) is picked up by the next diarization
+_loaded: dict[tuple[str, str, bool, float], Callable[[Any, Any], Any]] = {}
+# Why each key has no usable export. The cache miss is counted once per key
+# (like the load itself) and the reason logged when it changes, rather than on
+# every diarization
+_missed: dict[tuple[str, str, bool, float], str] = {}
+# Export file mtime per key whose load failed: the same file is not loaded again,
+# a new export (vtt export --force) is
+_failed: dict[tuple[str, str, bool, float], int] = {}
+
+
+def load_embedding_runtime(
+    runtime: str, cache_dir: str | Path, int8: bool = False, min_cosine: float = 0.99
+) -> Callable[[Any, Any], Any] | None:
+    """
+    Exported encoder callable (normalized feats, wav_lens) -> embeddings, or None
+    for eager or when no usable export exists (the reason is logged once, and
+    loading is tried again on the next call; an export that failed to load is
+    only tried again once the file changes).
+    """
+    from app.core.metrics import record_cache
+
+    if runtime == "eager":
+        return None
+    key = (runtime, str(cache_dir), int8, min_cosine)
+    if key in _loaded:
+        return _loaded[key]
+    path = runtime_path(cache_dir, runtime, int8)
+    hint = f"vtt export --runtime {runtime}{' --int8' if int8 else ''}"
+    if not path.exists() or not _meta_path(path).exists():
+        _record_miss(
+            key,
+            f"No exported {runtime} embedding model at {path} (run: {hint}); using eager",
+        )
+        return None
+    meta = json.loads(_meta_path(path).read_text())
+    if meta.get("batch") != EXPORT_BATCH or float(meta["min_cosine"]) < min_cosine:
+        _record_miss(
+            key,
+            f"{path.name} is stale or was verified below cosine {min_cosine} "
+            f"(run: {hint} --force); using eager",
+        )
+        return None
+    mtime = path.stat().st_mtime_ns
+    if _failed.get(key) == mtime:
+        return None
+    try:
+        embed = _load(path, runtime)
+    except Exception as e:
+        _failed[key] = mtime
+        _record_miss(key, f"Could not load {path}: {e}; using eager")
+        return None
+    print(
+        f"[*] Speaker embeddings: {runtime}{' int8' if int8 else ''} runtime ({path.name})"
+    )
+    record_cache("embedding_runtime", hit=True)
+    _loaded[key] = embed
+    _missed.pop(key, None)
+    _failed.pop(key, None)
+    return embed
+
+
+def _record_miss(key: tuple[str, str, bool, float], reason: str) -> None:
+    from app.core.metrics import record_cache
+
+    if _missed.get(key) == reason:
+        return
+    if key not in _missed:
+        record_cache("embedding_runtime", hit=False)
+    _missed[key] = reason
+    logger.warning(reason)
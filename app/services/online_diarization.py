@@ -0,0 +1,378 @@
+"""Online diarization: speaker turns for audio that arrives in pieces.
+
+Audio is cut into the same sliding windows as batch diarization. Each window is
+embedded as soon as its last sample arrives and assigned to the nearest running
+speaker centroid, or to a new speaker beyond distance_threshold, so a speaker
+label is known within one window of the audio. Every recluster_every windows,
+the recent embeddings (at most max_history) are re-clustered in a background
+thread with the batch clustering. Speaker ids are kept stable across reclusters,
+and earlier turns are relabeled to fix early mistakes.
+
+Only the last max_history turns stay editable. Older turns are finalized: no
+recluster or merge relabels them again, and a long stream hands them over with
+pop_finalized() so memory and the relabel passes stay bounded.
+"""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import TracebackType
+from typing import Any, Self
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.clustering import cluster_speakers
+from app.services.diarization import apply_speaker_turns, extract_embeddings
+
+
+class OnlineDiarizer:
+    """Incremental diarizer over a growing 16 kHz mono stream.
+
+    Feed samples with push() (or precomputed window embeddings with
+    add_embedding()), call finish() at the end of the stream, then
+    speaker_map() labels transcript segments like perform_diarization.
+    A long-running stream should take finalized turns with pop_finalized()
+    as it goes. A stream that may end without finish() (a dropped
+    connection) must be closed, or used as a context manager, to stop the
+    recluster thread.
+    """
+
+    def __init__(
+        self,
+        classifier: Any,
+        device: str = "cpu",
+        distance_threshold: float | None = None,
+        max_speakers: int | None = None,
+        window_s: float | None = None,
+        stride_s: float | None = None,
+        max_history: int = 2000,
+        recluster_every: int = 50,
+    ) -> None:
+        self.classifier = classifier
+        self.device = device
+        self.sr = settings.DIARIZE_SAMPLE_RATE
+        self.distance_threshold = (
+            settings.diarize_threshold
+            if distance_threshold is None
+            else distance_threshold
+        )
+        self.max_speakers = max_speakers
+        self.window = int((window_s or settings.SUBSEGMENT_WINDOW_S) * self.sr)
+        self.stride = int((stride_s or settings.SUBSEGMENT_STRIDE_S) * self.sr)
+        self.recluster_every = recluster_every
+        self.max_history = max_history
+
+        # Editable turns with their speaker ids and unit embeddings (for
+        # reclustering); _first_turn is the stream-wide index of _turns[0]
+        self._turns: deque[dict[str, Any]] = deque()
+        self._labels: deque[int] = deque()
+        self._history: deque[np.ndarray] = deque()
+        self._first_turn = 0
+        # Turns that left the editable window, until pop_finalized() takes them
+        self._finalized: list[dict[str, Any]] = []
+        self._finalized_labels: list[int] = []
+        self._popped = False
+        # Speakers folded into another by a merge, for labels of finalized turns
+        self._merged: dict[int, int] = {}
+        # Running sum of unit embeddings and window count per speaker
+        self._sums: dict[int, np.ndarray] = {}
+        self._counts: dict[int, int] = {}
+        self._next_speaker = 0
+
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_start = 0  # absolute sample index of _buffer[0]
+        self._next_window = 0  # absolute sample index of the next window start
+        self._peak_rms = 0.0
+
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recluster")
+        self._pending: Future | None = None
+        self._pending_first = 0
+        self._pending_units = np.zeros((0, 0), dtype=np.float32)
+        self._since_recluster = 0
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the recluster thread, dropping a recluster still queued. Idempotent."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pending = None
+
+    @property
+    def num_speakers(self) -> int:
+        """Distinct speakers so far."""
+        return len(self._sums)
+
+    @property
+    def turns(self) -> list[dict[str, Any]]:
+        """Turns not yet taken by pop_finalized(), oldest first."""
+        return self._finalized + list(self._turns)
+
+    @property
+    def speaker_centroids(self) -> dict[str, np.ndarray]:
+        """Unit-norm centroid of each current speaker."""
+        return {
+            f"SPEAKER_{k:02d}": v / max(float(np.linalg.norm(v)), 1e-12)
+            for k, v in self._sums.items()
+        }
+
+    def pop_finalized(self) -> list[dict[str, Any]]:
+        """Take the turns that no recluster will relabel any more.
+
+        Their speaker ids stay as they are: once a turn has been popped,
+        finish() no longer renumbers speakers by first appearance.
+        """
+        turns = self._finalized
+        self._popped = self._popped or bool(turns)
+        self._finalized, self._finalized_labels = [], []
+        return turns
+
+    def push(self, samples: np.ndarray) -> list[dict[str, Any]]:
+        """Append audio; embed and assign every window it completes.
+
+        Returns the new turns (earlier turns may be relabeled by a recluster).
+        """
+        self._buffer = np.concatenate(
+            [self._buffer, np.asarray(samples, dtype=np.float32)]
+        )
+        end = self._buffer_start + len(self._buffer)
+        starts = []
+        while self._next_window + self.window <= end:
+            starts.append(self._next_window)
+            self._next_window += self.stride
+        new_turns = self._embed_windows(
+            [
+                (s, s + self.window)
+                for s in starts
+                if self._is_speech(s, s + self.window)
+            ]
+        )
+
+        # Keep only the audio the next window still needs
+        drop = self._next_window - self._buffer_start
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._buffer_start = self._next_window
+        self._apply_recluster(wait=False)
+        return new_turns
+
+    def add_embedding(
+        self, start_s: float, end_s: float, embedding: np.ndarray
+    ) -> dict[str, Any]:
+        """Assign one window embedding to a speaker and record its turn."""
+        unit = np.asarray(embedding, dtype=np.float32).ravel()
+        unit = unit / max(float(np.linalg.norm(unit)), 1e-12)
+        label = self._nearest_speaker(unit)
+        if label is None:
+            label = self._next_speaker
+            self._next_speaker += 1
+        self._add_to_speaker(label, unit)
+
+        turn = {"start": start_s, "end": end_s, "speaker": f"SPEAKER_{label:02d}"}
+        self._turns.append(turn)
+        self._labels.append(label)
+        self._history.append(unit)
+        if len(self._turns) > self.max_history:
+            self._finalized.append(self._turns.popleft())
+            self._finalized_labels.append(self._labels.popleft())
+            self._history.popleft()
+            self._first_turn += 1
+
+        self._since_recluster += 1
+        if self._since_recluster >= self.recluster_every and self._pending is None:
+            self._start_recluster()
+        return turn
+
+    def finish(self) -> list[dict[str, Any]]:
+        """Embed the trailing partial window, recluster once more and return the
+        turns not yet popped."""
+        end = self._buffer_start + len(self._buffer)
+        tail = (self._next_window, end)
+        min_samples = settings.MIN_CHUNK_MS * self.sr // 1000
+        if end - self._next_window >= min_samples and self._is_speech(*tail):
+            self._embed_windows([tail])
+            self._next_window = end
+        self._apply_recluster(wait=True)
+        if self._history:
+            self._start_recluster()
+            self._apply_recluster(wait=True)
+        self.close()
+
+        if self._popped:
+            return self.turns
+        # Number the speakers by first appearance, as batch diarization does
+        labels = [self._resolve(label) for label in self._finalized_labels]
+        labels += self._labels
+        order = {label: n for n, label in enumerate(dict.fromkeys(labels))}
+        turns = self.turns
+        for turn, label in zip(turns, labels, strict=True):
+            turn["speaker"] = f"SPEAKER_{order[label]:02d}"
+        self._finalized_labels = [
+            order[label] for label in labels[: len(self._finalized)]
+        ]
+        self._labels = deque(order[label] for label in self._labels)
+        self._sums = {order[k]: v for k, v in self._sums.items()}
+        self._counts = {order[k]: v for k, v in self._counts.items()}
+        self._merged = {}
+        return turns
+
+    def speaker_map(self, segments: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Label transcript segments with the current turns ({start, end, speaker, text})."""
+        return apply_speaker_turns(segments, self.turns)
+
+    def _resolve(self, label: int) -> int:
+        while label in self._merged:
+            label = self._merged[label]
+        return label
+
+    def _is_speech(self, start: int, end: int) -> bool:
+        """Window energy within VAD_THRESHOLD_DB of the loudest window so far."""
+        window = self._buffer[start - self._buffer_start : end - self._buffer_start]
+        rms = (
+            float(np.sqrt(np.mean(window.astype(np.float64) ** 2)))
+            if len(window)
+            else 0.0
+        )
+        self._peak_rms = max(self._peak_rms, rms)
+        return rms > 0 and rms >= self._peak_rms * 10 ** (
+            settings.VAD_THRESHOLD_DB / 20
+        )
+
+    def _embed_windows(self, spans: list[tuple[int, int]]) -> list[dict[str, Any]]:
+        if not spans:
+            return []
+        # Buffer-relative seconds; every window shares the buffer's feature pass
+        chunks = [
+            ((s - self._buffer_start) / self.sr, (e - self._buffer_start) / self.sr, 0)
+            for s, e in spans
+        ]
+        embeddings, meta = extract_embeddings(
+            self.classifier,
+            self._buffer,
+            self.sr,
+            chunks,
+            self.device,
+            settings.diarize_batch_size,
+            verbose=False,
+        )
+        offset = self._buffer_start / self.sr
+        return [
+            self.add_embedding(start + offset, end + offset, emb)
+            for (start, end, _), emb in zip(meta, embeddings, strict=True)
+        ]
+
+    def _nearest_speaker(self, unit: np.ndarray) -> int | None:
+        if not self._sums:
+            return None
+        labels = list(self._sums)
+        centroids = np.stack([self._sums[k] for k in labels])
+        sims = (centroids @ unit) / np.maximum(np.linalg.norm(centroids, axis=1), 1e-12)
+        best = int(np.argmax(sims))
+        at_limit = self.max_speakers is not None and len(labels) >= self.max_speakers
+        if at_limit or 1.0 - sims[best] <= self.distance_threshold:
+            return labels[best]
+        return None
+
+    def _add_to_speaker(self, label: int, unit: np.ndarray, sign: int = 1) -> None:
+        """Add (or with sign=-1 remove) one window embedding to a speaker's centroid."""
+        if label not in self._sums:
+            self._sums[label] = np.zeros_like(unit)
+            self._counts[label] = 0
+        self._sums[label] = self._sums[label] + sign * unit
+        self._counts[label] += sign
+        if self._counts[label] == 0:
+            del self._sums[label], self._counts[label]
+
+    def _start_recluster(self) -> None:
+        self._since_recluster = 0
+        self._pending_first = self._first_turn
+        self._pending_units = np.stack(self._history)
+        self._pending = self._pool.submit(
+            cluster_speakers,
+            self._pending_units,
+            distance_threshold=self.distance_threshold,
+            max_speakers=self.max_speakers,
+            max_exact=settings.clustering_max_exact,
+            n_centroids=settings.clustering_centroids,
+        )
+
+    def _apply_recluster(self, wait: bool) -> None:
+        """Adopt a finished recluster, keeping speaker ids stable across it."""
+        if self._pending is None or not (wait or self._pending.done()):
+            return
+        from scipy.optimize import linear_sum_assignment
+
+        new_labels = self._pending.result()
+        self._pending = None
+        # Turns finalized while the recluster ran keep their speaker
+        skip = self._first_turn - self._pending_first
+        units, new_labels = self._pending_units[skip:], new_labels[skip:]
+        if not len(new_labels):
+            self._merge_speakers()
+            return
+        old = np.array(list(self._labels)[: len(new_labels)])
+        old_ids, old_idx = np.unique(old, return_inverse=True)
+        counts = np.zeros((int(new_labels.max()) + 1, len(old_ids)))
+        np.add.at(counts, (new_labels, old_idx), 1)
+        rows, cols = linear_sum_assignment(-counts)
+        mapping = {int(r): int(old_ids[c]) for r, c in zip(rows, cols, strict=True)}
+        for r in range(len(counts)):
+            if r not in mapping:
+                mapping[r] = self._next_speaker
+                self._next_speaker += 1
+
+        # Move each relabeled window between speakers so centroids stay exact
+        for i, (unit, label) in enumerate(zip(units, new_labels, strict=True)):
+            new = mapping[int(label)]
+            if new != self._labels[i]:
+                self._add_to_speaker(self._labels[i], unit, -1)
+                self._add_to_speaker(new, unit)
+                self._labels[i] = new
+                self._turns[i]["speaker"] = f"SPEAKER_{new:02d}"
+        self._merge_speakers()
+
+    def _merge_speakers(self) -> None:
+        """Fold small speakers into the nearest larger one within distance_threshold.
+
+        Speakers created by early mistakes may only have finalized turns left;
+        their centroids are still compared here, and those turns keep their
+        id (finish() maps it to the merged speaker). Beyond max_speakers, the
+        smallest speakers are folded in regardless of distance.
+        """
+        rename: dict[int, int] = {}
+        while len(self._sums) > 1:
+            labels = sorted(self._sums, key=lambda k: self._counts[k])
+            centroids = np.stack([self._sums[k] for k in labels])
+            centroids /= np.maximum(
+                np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12
+            )
+            over_limit = (
+                self.max_speakers is not None and len(labels) > self.max_speakers
+            )
+            for j, small in enumerate(labels[:-1]):
+                sims = centroids[j + 1 :] @ centroids[j]
+                best = int(np.argmax(sims))
+                if over_limit or 1.0 - sims[best] <= self.distance_threshold:
+                    into = labels[j + 1 + best]
+                    self._sums[into] = self._sums[into] + self._sums.pop(small)
+                    self._counts[into] += self._counts.pop(small)
+                    rename[small] = into
+                    break
+            else:
+                break
+
+        if rename:
+            self._merged.update(rename)
+            for i, label in enumerate(self._labels):
+                label = self._resolve(label)
+                if label != self._labels[i]:
+                    self._labels[i] = label
+                    self._turns[i]["speaker"] = f"SPEAKER_{label:02d}"
@@ -1,29 +1,75 @@
-"""Main transcription pipeline: Whisper (openai or HF) + diarization and translation."""
+"""Main transcription pipeline: Whisper (any registered backend) + diarization and translation."""
 
+import contextvars
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from typing import Any
 
+import numpy as np
 import torch
 
 from app.core.config import settings
-from app.services.diarization import assign_speaker_by_overlap, perform_diarization
-from app.whisper import (
-    load_openai_whisper,
-    load_transformers_whisper,
-    transcribe_openai,
-    transcribe_transformers,
+from app.core.timing import stage
+from app.services.diarization import (
+    apply_speaker_turns,
+    assign_speakers_by_overlap,
+    diarize_speech,
+    perform_diarization,
 )
+from app.services.sharding import transcribe_sharded
+from app.utils.audio_utils import SAMPLE_RATE, load_audio
+from app.whisper import WhisperBackend, get_backend, inference_slots_for
+
+
+def _can_shard(backend: WhisperBackend) -> bool:
+    """Whether long files go through the sharded path for this backend.
+
+    Sharding needs decoded PCM to cut. A batching backend already keeps the
+    cores busy with one batched forward pass over the whole file; shards would
+    only shrink its batches, so it gets the file in one call instead.
+    """
+    caps = backend.capabilities_for(settings)
+    return (
+        settings.enable_sharding
+        and caps.pcm_input
+        and not caps.batching
+        and inference_slots_for(backend, settings.inference_slots) == 1
+    )
 
 
 def _run_whisper(
     model_or_pipeline: Any,
-    audio_path: str,
+    audio: str | np.ndarray,
     task: str,
-    whisper_backend: str,
+    backend: WhisperBackend,
+    device: str = "cpu",
+    stats: dict[str, Any] | None = None,
+    preset: str | None = None,
+    allow_sharding: bool = True,
 ) -> list[dict[str, Any]]:
-    """Return segments from the chosen Whisper backend."""
-    if whisper_backend == "transformers":
-        return transcribe_transformers(model_or_pipeline, audio_path, task)
-    return transcribe_openai(model_or_pipeline, audio_path, task)
+    """Return segments from the given Whisper backend, sharding long files if enabled.
+
+    Sharding forks worker processes, and forking while another thread runs
+    torch ops copies the locks it holds (allocator, OpenMP pool) into the
+    children already taken, which can deadlock them. So it only runs when no
+    other thread can be in torch: not alongside concurrent diarization (the
+    caller passes allow_sharding=False) and not with several inference slots,
+    where other requests run in the same process.
+    """
+    if allow_sharding and _can_shard(backend):
+        segments = transcribe_sharded(
+            model_or_pipeline,
+            audio,
+            task,
+            partial(backend.transcribe, cfg=settings, preset=preset),
+            device=device,
+        )
+        if segments is not None:
+            return segments
+    return backend.transcribe(
+        model_or_pipeline, audio, task, cfg=settings, stats=stats, preset=preset
+    )
 
 
 def transcribe(
@@ -37,10 +83,14 @@ def transcribe(
     max_speakers: int | None = None,
     whisper_backend: str | None = None,
     use_silhouette: bool = False,
+    stats: dict[str, Any] | None = None,
+    preset: str | None = None,
 ) -> str:
     """
     Transcribe audio to text. Supports translation to English and speaker diarization.
-    All models run locally.
+    All models run locally. preset picks decode options (fast, balanced, accurate;
+    default from settings). Backend decoding statistics (e.g. speculative decoding
+    acceptance) are collected into stats when given.
     """
     if device is None:
         device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -48,6 +98,8 @@ def transcribe(
 
     if whisper_backend is None:
         whisper_backend = settings.WHISPER_BACKEND_DEFAULT
+    backend = get_backend(whisper_backend)
+    preset = preset or settings.decode_preset
 
     if isinstance(model, str):
         model_size = model
@@ -55,34 +107,94 @@ def transcribe(
             f"[*] Loading Whisper model '{model_size}' (backend: {whisper_backend})..."
         )
         try:
-            if whisper_backend == "transformers":
-                model = load_transformers_whisper(model_size, device)
-            else:
-                model = load_openai_whisper(model_size, device)
+            with stage("load_model"):
+                model = backend.load(model_size, device, settings)
         except Exception as e:
             print(f"Error loading model: {e}")
             raise
 
+    caps = backend.capabilities_for(settings)
+    concurrent_diarize = diarize and settings.diarize_mode == "concurrent"
+    audio: str | np.ndarray = audio_path
+    pcm = None
+    if concurrent_diarize or (caps.pcm_input and (translate or _can_shard(backend))):
+        # Both passes, the shard splitter and the diarizer read the same samples:
+        # decode once.
+        with stage("decode"):
+            pcm = load_audio(audio_path)
+        if caps.pcm_input:
+            audio = pcm
+
     combined_output = ""
     diarized_orig = None
+    if stats is not None and pcm is not None:
+        stats["audio_duration_s"] = len(pcm) / SAMPLE_RATE
 
-    print(f"[*] Running transcription (original) on '{audio_path}'...")
-    try:
-        orig_segments = _run_whisper(model, audio_path, "transcribe", whisper_backend)
-    except Exception as e:
-        print(f"Error during transcription: {e}")
-        raise
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="diarize") as pool:
+        turns: Future | None = None
+        if concurrent_diarize and pcm is not None:
+            # Speaker turns come from the audio alone, so they are computed while
+            # Whisper runs and matched to its segments by overlap afterwards. The
+            # thread gets this context so its stages land in the request's timings.
+            turns = pool.submit(
+                contextvars.copy_context().run,
+                diarize_speech,
+                pcm,
+                device,
+                classifier=classifier,
+                distance_threshold=diarize_threshold,
+                max_speakers=max_speakers,
+                use_silhouette=use_silhouette,
+            )
+
+        print(f"[*] Running transcription (original) on '{audio_path}'...")
+        t0 = time.perf_counter()
+        try:
+            # No sharding (fork) while the diarize thread runs torch
+            with stage("whisper"):
+                orig_segments = _run_whisper(
+                    model,
+                    audio,
+                    "transcribe",
+                    backend,
+                    device,
+                    stats,
+                    preset,
+                    allow_sharding=turns is None,
+                )
+        except Exception as e:
+            print(f"Error during transcription: {e}")
+            raise
+        if stats is not None and "audio_duration_s" not in stats and orig_segments:
+            # Not decoded here: the last segment end is the closest to the duration
+            stats["audio_duration_s"] = max(s["end"] for s in orig_segments)
+
+        if turns is not None:
+            transcribe_s = time.perf_counter() - t0
+            try:
+                speaker_turns = turns.result()
+            except Exception as e:
+                # Same as segments mode: keep the transcript without speakers
+                print(f"[!] Diarization failed: {e}")
+                speaker_turns = None
+            print(
+                f"[*] Transcription took {transcribe_s:.1f}s; diarization done "
+                f"{time.perf_counter() - t0 - transcribe_s:.1f}s after it"
+            )
+            if speaker_turns and orig_segments:
+                diarized_orig = apply_speaker_turns(orig_segments, speaker_turns)
+        elif diarize:
+            diarized_orig = perform_diarization(
+                audio_path,
+                orig_segments,
+                device,
+                classifier=classifier,
+                distance_threshold=diarize_threshold,
+                max_speakers=max_speakers,
+                use_silhouette=use_silhouette,
+            )
 
     if diarize:
-        diarized_orig = perform_diarization(
-            audio_path,
-            orig_segments,
-            device,
-            classifier=classifier,
-            distance_threshold=diarize_threshold,
-            max_speakers=max_speakers,
-            use_silhouette=use_silhouette,
-        )
         if diarized_orig:
             orig_text = "\n".join(
                 [f"{s['speaker']}: {s['text']}" for s in diarized_orig]
@@ -97,17 +209,19 @@ def transcribe(
     if translate:
         print("[*] Running translation to English...")
         try:
-            trans_segments = _run_whisper(
-                model, audio_path, "translate", whisper_backend
-            )
+            with stage("translate"):
+                trans_segments = _run_whisper(
+                    model, audio, "translate", backend, device, stats, preset
+                )
             if diarize and diarized_orig:
-                trans_lines = []
-                for seg in trans_segments:
-                    speaker = assign_speaker_by_overlap(
-                        seg["start"], seg["end"], diarized_orig
-                    )
-                    trans_lines.append(f"{speaker}: {seg['text'].strip()}")
-                trans_text = "\n".join(trans_lines)
+                speakers = assign_speakers_by_overlap(
+                    [(seg["start"], seg["end"]) for seg in trans_segments],
+                    diarized_orig,
+                )
+                trans_text = "\n".join(
+                    f"{speaker}: {seg['text'].strip()}"
+                    for speaker, seg in zip(speakers, trans_segments, strict=True)
+                )
             else:
                 trans_text = "\n".join([s["text"].strip() for s in trans_segments])
             combined_output += "\n--- ENGLISH TRANSLATION ---\n" + trans_text + "\n"
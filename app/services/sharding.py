@@ -0,0 +1,130 @@
+"""Sharded long-audio transcription: split at silences, transcribe shards in a process pool."""
+
+import multiprocessing as mp
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.cpu import effective_cpu_count
+from app.utils.audio_utils import (
+    SAMPLE_RATE,
+    get_duration,
+    load_audio,
+    split_on_silence,
+)
+
+TranscribeFn = Callable[[Any, str | np.ndarray, str], list[dict[str, Any]]]
+
+# Filled in the parent right before the pool forks, so workers inherit the loaded
+# model and the decoded audio copy-on-write instead of reloading or pickling them.
+_shard_state: dict[str, Any] = {}
+
+
+def _resolve_shard_count(duration_s: float) -> int:
+    """Number of shards for a file: configured count, or half the cores (2 threads each)."""
+    n = settings.shard_count or max(2, effective_cpu_count() // 2)
+    # Keep every shard at least one Whisper window long.
+    return max(1, min(n, int(duration_s // settings.SHARD_MIN_LENGTH_S)))
+
+
+def _init_shard_worker(num_threads: int) -> None:
+    """Pin intra-op threads so shards do not oversubscribe the CPU."""
+    import torch
+
+    torch.set_num_threads(num_threads)
+
+
+def _transcribe_shard(start: int, end: int, task: str) -> list[dict[str, Any]]:
+    """Transcribe audio[start:end] and shift timestamps to file time."""
+    transcribe_fn: TranscribeFn = _shard_state["transcribe_fn"]
+    audio = _shard_state["audio"][start:end]
+    offset = start / SAMPLE_RATE
+    shard_len = (end - start) / SAMPLE_RATE
+    segments = transcribe_fn(_shard_state["model"], audio, task)
+    return [
+        {
+            "start": offset + min(max(s["start"], 0.0), shard_len),
+            "end": offset + min(max(s["end"], 0.0), shard_len),
+            "text": s["text"],
+        }
+        for s in segments
+    ]
+
+
+def stitch_shard_segments(
+    shard_segments: list[list[dict[str, Any]]],
+) -> list[dict[str, Any]]:
+    """
+    Concatenate per-shard segments (already in file time) in shard order.
+    Shards tile the audio without overlap and every cut sits in a pause, so no
+    audio is transcribed twice and nothing is deduplicated: a line that repeats
+    across a cut was spoken twice. Empty segments are skipped.
+    """
+    return [
+        seg for segments in shard_segments for seg in segments if seg["text"].strip()
+    ]
+
+
+def transcribe_sharded(
+    model: Any,
+    audio: str | np.ndarray,
+    task: str,
+    transcribe_fn: TranscribeFn,
+    device: str = "cpu",
+) -> list[dict[str, Any]] | None:
+    """
+    Transcribe a long file (path or decoded 16 kHz array) as silence-split shards
+    in parallel processes. Returns None when sharding does not apply (short file, GPU, or no fork support),
+    in which case the caller should transcribe the whole file as usual.
+    """
+    if device != "cpu" or "fork" not in mp.get_all_start_methods():
+        return None
+
+    if isinstance(audio, str):
+        duration_s = get_duration(audio)
+    else:
+        duration_s = len(audio) / SAMPLE_RATE
+    if duration_s < settings.shard_min_duration_s:
+        return None
+
+    num_shards = _resolve_shard_count(duration_s)
+    if num_shards < 2:
+        return None
+
+    if isinstance(audio, str):
+        audio = load_audio(audio)
+    bounds = split_on_silence(
+        audio,
+        num_shards,
+        settings.SHARD_SILENCE_SEARCH_S,
+        silence_db=settings.SHARD_SILENCE_DB,
+    )
+    if len(bounds) < 2:
+        # No pause near any split point: cutting would split words
+        return None
+    threads = max(1, effective_cpu_count() // len(bounds))
+    print(
+        f"[*] Sharding {duration_s:.0f}s of audio into {len(bounds)} shard(s), "
+        f"{threads} thread(s) each..."
+    )
+
+    _shard_state.update(model=model, audio=audio, transcribe_fn=transcribe_fn)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=len(bounds),
+            mp_context=mp.get_context("fork"),
+            initializer=_init_shard_worker,
+            initargs=(threads,),
+        ) as pool:
+            futures = [
+                pool.submit(_transcribe_shard, start, end, task)
+                for start, end in bounds
+            ]
+            shard_segments = [f.result() for f in futures]
+    finally:
+        _shard_state.clear()
+
+    return stitch_shard_segments(shard_segments)
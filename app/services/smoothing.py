@@ -0,0 +1,125 @@
+"""Temporal smoothing of per-segment speaker labels (vectorized, single pass).
+
+Labels are an int array with -1 for segments that have no label. Policies:
+
+- sandwich: a short segment whose two neighbours agree on another label takes
+  their label (the repeated-pass rule the diarizer always used, same fixed point);
+- median: a short segment takes the majority label of a centred window of
+  segments (a median filter for categorical labels; ties keep the label);
+- min_run: a run of same-label segments shorter than min_run_s in total takes
+  the label of the longer adjacent run.
+"""
+
+from typing import Literal
+
+import numpy as np
+
+SmoothingPolicy = Literal["sandwich", "median", "min_run", "none"]
+SMOOTHING_POLICIES: tuple[str, ...] = ("sandwich", "median", "min_run", "none")
+
+
+def _sandwich(labels: np.ndarray, short: np.ndarray) -> np.ndarray:
+    """One-pass equivalent of flipping A-B-A to A-A-A until nothing changes.
+
+    Flipping segment i to its neighbours' label never makes i-1 or i+1
+    flippable, and a flip at i-1 (which makes i equal its new left neighbour)
+    is the only way i stops being flippable. In a run of consecutive candidates
+    (an alternating A-B-A-B stretch), the in-order passes therefore flip the
+    1st, 3rd, 5th, ... candidate and nothing else.
+    """
+    n = len(labels)
+    out = labels.copy()
+    if n < 3:
+        return out
+    prev, cur, nxt = labels[:-2], labels[1:-1], labels[2:]
+    cand = np.zeros(n, dtype=bool)
+    cand[1:-1] = short[1:-1] & (cur >= 0) & (prev >= 0) & (prev == nxt) & (cur != prev)
+    idx = np.arange(n)
+    run_start = cand & ~np.concatenate(([False], cand[:-1]))
+    first = np.maximum.accumulate(np.where(run_start, idx, 0))
+    flip = cand & ((idx - first) % 2 == 0)
+    out[flip] = labels[np.flatnonzero(flip) - 1]
+    return out
+
+
+def _median(labels: np.ndarray, short: np.ndarray, window: int) -> np.ndarray:
+    """Majority label in a centred window of `window` segments, for short segments."""
+    out = labels.copy()
+    valid = labels >= 0
+    if not valid.any() or window < 2:
+        return out
+    half = window // 2
+    k = int(labels.max()) + 1
+    onehot = np.zeros((len(labels) + 1, k), dtype=np.int32)
+    onehot[1:][valid, labels[valid]] = 1
+    counts = np.cumsum(onehot, axis=0)
+    idx = np.arange(len(labels))
+    lo = np.clip(idx - half, 0, len(labels))
+    hi = np.clip(idx + half + 1, 0, len(labels))
+    window_counts = counts[hi] - counts[lo]
+    best = window_counts.argmax(axis=1)
+    own = window_counts[idx, np.where(valid, labels, 0)]
+    change = short & valid & (window_counts[idx, best] > own)
+    out[change] = best[change]
+    return out
+
+
+def _min_run(labels: np.ndarray, durations: np.ndarray, min_run_s: float) -> np.ndarray:
+    """Relabel runs shorter than min_run_s with the longer neighbouring run's label."""
+    n = len(labels)
+    if n == 0:
+        return labels.copy()
+    starts = np.flatnonzero(np.concatenate(([True], labels[1:] != labels[:-1])))
+    run_labels = labels[starts]
+    run_dur = np.add.reduceat(durations, starts)
+    n_runs = len(starts)
+    if n_runs < 2:
+        return labels.copy()
+
+    left_dur = np.concatenate(([-1.0], run_dur[:-1]))
+    right_dur = np.concatenate((run_dur[1:], [-1.0]))
+    left_lab = np.concatenate(([-1], run_labels[:-1]))
+    right_lab = np.concatenate((run_labels[1:], [-1]))
+    # Unlabeled runs are neither relabeled nor used as a source
+    left_dur[left_lab < 0] = -1.0
+    right_dur[right_lab < 0] = -1.0
+    target = np.where(right_dur > left_dur, right_lab, left_lab)
+    change = (run_dur < min_run_s) & (run_labels >= 0) & (target >= 0)
+    new_run_labels = np.where(change, target, run_labels)
+    return np.repeat(new_run_labels, np.diff(np.append(starts, n)))
+
+
+def smooth_labels(
+    labels: np.ndarray,
+    durations: np.ndarray,
+    policy: str = "sandwich",
+    max_duration_s: float = 2.0,
+    window: int = 5,
+    min_run_s: float = 1.0,
+) -> np.ndarray:
+    """Smooth speaker labels of consecutive segments.
+
+    Args:
+        labels: Label per segment (-1 = unlabeled)
+        durations: Duration per segment in seconds
+        policy: sandwich, median, min_run or none
+        max_duration_s: Only segments at most this long are relabeled (sandwich, median)
+        window: Window size in segments (median)
+        min_run_s: Minimum total duration of a same-label run (min_run)
+
+    Returns:
+        Smoothed labels (a new array)
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+    durations = np.asarray(durations, dtype=np.float64)
+    if policy == "none":
+        return labels.copy()
+    if policy == "sandwich":
+        return _sandwich(labels, durations <= max_duration_s)
+    if policy == "median":
+        return _median(labels, durations <= max_duration_s, window)
+    if policy == "min_run":
+        return _min_run(labels, durations, min_run_s)
+    raise ValueError(
+        f"Unknown smoothing policy: {policy}. Available: {', '.join(SMOOTHING_POLICIES)}"
+    )
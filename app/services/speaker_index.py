@@ -0,0 +1,187 @@
+"""Known-speaker index: enrolled reference embeddings for naming diarized speakers.
+
+Each enrolled speaker is one unit-normalized ECAPA embedding (the normalized
+mean of their enrollment chunks). The references are stored as a contiguous
+float32 matrix in embeddings.npy and memory-mapped read-only, so loading is
+cheap and searching is a single matrix multiply over cosine similarities.
+
+Next to the matrix, sums.npy keeps the unnormalized sum of each speaker's unit
+embeddings, so enrolling more chunks normalizes the exact new sum instead of
+re-weighting a normalized mean. speakers.json holds names and enrollment counts.
+
+Every save writes these files into a new version directory and then replaces
+the CURRENT pointer file, so a reader sees either the old index or the new one,
+never a matrix from one save with names from another.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from app.core.config import settings
+
+POINTER_FILE = "CURRENT"
+MATRIX_FILE = "embeddings.npy"
+SUMS_FILE = "sums.npy"
+META_FILE = "speakers.json"
+# Earlier layouts, still read: a single npz, or matrix and metadata in the index root
+LEGACY_NPZ_FILE = "speakers.npz"
+
+
+def default_index_dir() -> Path:
+    """SPEAKER_INDEX_DIR, else a speakers/ directory in the model cache."""
+    return Path(
+        settings.speaker_index_dir or Path(settings.model_cache_dir) / "speakers"
+    )
+
+
+def _unit(x: np.ndarray) -> np.ndarray:
+    x = np.atleast_2d(np.asarray(x, dtype=np.float32))
+    unit: np.ndarray = x / np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)
+    return unit
+
+
+def cluster_centroids(embeddings: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """Unit-normalized mean embedding of each label 0..max(labels)."""
+    unit = _unit(embeddings)
+    n_labels = int(np.max(labels)) + 1
+    sums = np.zeros((n_labels, unit.shape[1]), dtype=np.float32)
+    np.add.at(sums, labels, unit)
+    return _unit(sums)
+
+
+class SpeakerIndex:
+    """On-disk index of enrolled speakers with top-k cosine search."""
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = Path(path) if path is not None else default_index_dir()
+        self.names: list[str] = []
+        self.counts: list[int] = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.sums = self.matrix
+        if (self.path / POINTER_FILE).exists():
+            try:
+                self._load_version()
+            except FileNotFoundError:
+                # A save replaced the pointer and removed the version just read
+                self._load_version()
+        elif (self.path / LEGACY_NPZ_FILE).exists():
+            with np.load(self.path / LEGACY_NPZ_FILE) as data:
+                self.names = [str(name) for name in data["names"]]
+                self.counts = [int(count) for count in data["counts"]]
+                self.sums = data["sums"]
+            self.matrix = _unit(self.sums) if len(self.names) else self.sums
+        elif (self.path / META_FILE).exists():
+            # Only normalized means were stored: approximate the sums by count
+            meta = json.loads((self.path / META_FILE).read_text())
+            self.names, self.counts = meta["names"], meta["counts"]
+            self.matrix = np.load(self.path / MATRIX_FILE, mmap_mode="r")
+            self.sums = self.matrix * np.array(self.counts, dtype=np.float32)[:, None]
+
+    def _load_version(self) -> None:
+        version = self.path / (self.path / POINTER_FILE).read_text().strip()
+        meta = json.loads((version / META_FILE).read_text())
+        self.names, self.counts = meta["names"], meta["counts"]
+        self.matrix = np.load(version / MATRIX_FILE, mmap_mode="r")
+        self.sums = np.load(version / SUMS_FILE, mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def save(self) -> None:
+        """Write a new version of the index and switch the pointer to it."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        version = Path(tempfile.mkdtemp(prefix="v-", dir=self.path))
+        np.save(version / MATRIX_FILE, np.ascontiguousarray(self.matrix, np.float32))
+        np.save(version / SUMS_FILE, np.ascontiguousarray(self.sums, np.float32))
+        (version / META_FILE).write_text(
+            json.dumps({"names": self.names, "counts": self.counts}, indent=2)
+        )
+        pointer_tmp = version / f"{POINTER_FILE}.tmp"
+        pointer_tmp.write_text(version.name)
+        os.replace(pointer_tmp, self.path / POINTER_FILE)
+
+        for entry in self.path.iterdir():
+            if entry.is_dir() and entry.name.startswith("v-") and entry != version:
+                # Readers that already mapped the old files keep them until closed
+                shutil.rmtree(entry, ignore_errors=True)
+        for legacy in (LEGACY_NPZ_FILE, META_FILE, MATRIX_FILE):
+            (self.path / legacy).unlink(missing_ok=True)
+        self.matrix = np.load(version / MATRIX_FILE, mmap_mode="r")
+        self.sums = np.load(version / SUMS_FILE, mmap_mode="r")
+
+    def enroll(self, name: str, embeddings: np.ndarray) -> None:
+        """Add a speaker, or fold more embeddings into an enrolled speaker's reference."""
+        unit = _unit(embeddings)
+        if len(self) and unit.shape[1] != self.matrix.shape[1]:
+            raise ValueError(
+                f"Embedding size {unit.shape[1]} does not match the index "
+                f"({self.matrix.shape[1]})"
+            )
+        sums = np.array(self.sums, dtype=np.float32).reshape(len(self), unit.shape[1])
+        if name in self.names:
+            i = self.names.index(name)
+            sums[i] += unit.sum(axis=0)
+            self.counts[i] += len(unit)
+        else:
+            sums = np.vstack([sums, unit.sum(axis=0)])
+            self.names.append(name)
+            self.counts.append(len(unit))
+        self.sums = sums
+        self.matrix = _unit(sums)
+        self.save()
+
+    def remove(self, name: str) -> bool:
+        """Remove an enrolled speaker. Returns False if the name is not enrolled."""
+        if name not in self.names:
+            return False
+        i = self.names.index(name)
+        self.sums = np.delete(self.sums, i, axis=0)
+        self.matrix = np.delete(self.matrix, i, axis=0)
+        del self.names[i], self.counts[i]
+        self.save()
+        return True
+
+    def search(self, queries: np.ndarray, k: int = 1) -> list[list[tuple[str, float]]]:
+        """Top-k enrolled speakers (name, cosine similarity) for each query embedding."""
+        if not len(self):
+            return [[] for _ in range(len(np.atleast_2d(queries)))]
+        scores = _unit(queries) @ self.matrix.T
+        k = min(k, len(self))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, cols in zip(scores, top, strict=True):
+            cols = cols[np.argsort(-row[cols], kind="stable")]
+            results.append([(self.names[j], float(row[j])) for j in cols])
+        return results
+
+    def match(
+        self,
+        centroids: np.ndarray,
+        threshold: float = 0.5,
+        roster: list[str] | None = None,
+    ) -> dict[int, str]:
+        """Name clusters after enrolled speakers, one cluster per speaker at most.
+
+        Cluster centroids are scored against the enrolled speakers (restricted to
+        roster when given) in one matrix multiply; the pairing maximizes total
+        similarity, and pairs below threshold stay unnamed.
+        """
+        from scipy.optimize import linear_sum_assignment
+
+        cols = [
+            j for j, name in enumerate(self.names) if roster is None or name in roster
+        ]
+        if not cols or not len(centroids):
+            return {}
+        scores = _unit(centroids) @ np.asarray(self.matrix)[cols].T
+        rows, picked = linear_sum_assignment(-scores)
+        return {
+            int(r): self.names[cols[c]]
+            for r, c in zip(rows, picked, strict=True)
+            if scores[r, c] >= threshold
+        }
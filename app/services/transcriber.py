@@ -1,21 +1,37 @@
 """Transcription service for handling audio transcription."""
 
+import asyncio
 import shutil
-from contextlib import asynccontextmanager
+import time
+from contextlib import asynccontextmanager, nullcontext
 from pathlib import Path
 from typing import Any, cast
 
 import torch
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
+from app.core.cpu import configure_cpu
 from app.core.errors import AudioFileError, ModelLoadError, TranscriptionError
 from app.core.logger import logger
+from app.core.metrics import (
+    INFERENCE_SLOTS,
+    INFLIGHT,
+    QUEUE_DEPTH,
+    REAL_TIME_FACTOR,
+    UPLOAD_BYTES,
+    record_cache,
+    record_model,
+)
+from app.core.profiling import profile_request
+from app.core.timing import StageTiming, stage, timings_summary, track_timings
+from app.services.online_diarization import OnlineDiarizer
 
 try:
     from app.services.pipeline import transcribe as legacy_transcribe
     from app.utils import save_transcript
-    from app.whisper import load_openai_whisper, load_transformers_whisper
+    from app.whisper import backend_capabilities, get_backend, inference_slots_for
 
     LEGACY_AVAILABLE = True
 except ImportError as e:
@@ -30,9 +46,15 @@ class TranscriptionService:
         """Initialize transcription service."""
         self.models: dict[str, Any] = {}
         self._initialized = False
+        self._slots = asyncio.Semaphore(max(1, settings.inference_slots))
 
-    def initialize(self) -> None:
-        """Initialize transcription models."""
+    def initialize(self, load_classifier: bool | None = None) -> None:
+        """Initialize transcription models.
+
+        Args:
+            load_classifier: Preload the diarization classifier (default: when
+                diarization is enabled in settings)
+        """
         if self._initialized:
             logger.debug("Transcription service already initialized")
             return
@@ -40,40 +62,82 @@ class TranscriptionService:
         try:
             logger.info("Initializing transcription service...")
 
+            if not LEGACY_AVAILABLE:
+                raise ModelLoadError(
+                    f"{settings.whisper_backend} backend not available"
+                )
+            backend = get_backend(settings.whisper_backend)
+
+            slots = inference_slots_for(backend, settings.inference_slots)
+            if slots < settings.inference_slots:
+                logger.warning(
+                    f"{backend.name} backend cannot share a model between threads; "
+                    "using 1 inference slot"
+                )
+            self._slots = asyncio.Semaphore(slots)
+            INFERENCE_SLOTS.set(slots)
+
+            # Size thread pools to this worker's CPU share before loading models
+            if settings.cpu_auto_tune:
+                self.models["cpu_layout"] = configure_cpu(inference_slots=slots)
+
             # Determine device
             device = "cuda" if torch.cuda.is_available() else "cpu"
             logger.info(f"Using device: {device}")
 
             # Load Whisper model
-            if settings.whisper_backend == "transformers":
-                if not LEGACY_AVAILABLE:
-                    raise ModelLoadError("Transformers backend not available")
-                logger.info(
-                    f"Loading Transformers Whisper ({settings.whisper_model})..."
-                )
-                self.models["whisper"] = load_transformers_whisper(
-                    settings.whisper_model, device
+            logger.info(
+                f"Loading Whisper ({settings.whisper_model}, backend: {backend.name}, "
+                f"precision: {settings.whisper_precision})..."
+            )
+            # Torch backends keep their int8 conversion in the model cache
+            if settings.whisper_precision == "int8" and backend.name in (
+                "openai",
+                "transformers",
+            ):
+                from app.whisper.precision import quantized_cache_path
+
+                record_cache(
+                    "int8_weights",
+                    quantized_cache_path(
+                        settings.model_cache_dir, backend.name, settings.whisper_model
+                    ).exists(),
                 )
-            else:
-                if not LEGACY_AVAILABLE:
-                    raise ModelLoadError("OpenAI Whisper backend not available")
-                logger.info(f"Loading OpenAI Whisper ({settings.whisper_model})...")
-                self.models["whisper"] = load_openai_whisper(
-                    settings.whisper_model, device
+            t0 = time.perf_counter()
+            self.models["whisper"] = backend.load(
+                settings.whisper_model, device, settings
+            )
+            record_model(
+                "whisper", self.models["whisper"], device, time.perf_counter() - t0
+            )
+
+            # A draft model for speculative decoding stays resident next to the main one.
+            assistant = getattr(self.models["whisper"], "assistant_model", None)
+            if assistant is not None:
+                logger.info(
+                    "Speculative decoding enabled "
+                    f"(draft: {settings.transformers_assistant_model})"
                 )
+                self.models["assistant"] = assistant
+                record_model("assistant", assistant, device)
 
             self.models["device"] = device
             self.models["whisper_backend"] = settings.whisper_backend
 
             # Load SpeechBrain classifier for diarization
-            if settings.enable_diarization:
+            if load_classifier is None:
+                load_classifier = settings.enable_diarization
+            if load_classifier:
                 logger.info("Loading SpeechBrain classifier...")
-                from speechbrain.inference.speaker import EncoderClassifier
-
-                self.models["classifier"] = EncoderClassifier.from_hparams(
-                    source="speechbrain/spkrec-ecapa-voxceleb",
-                    run_opts={"device": device},
-                    savedir=str(Path(settings.model_cache_dir) / "speechbrain"),
+                from app.services.diarization import load_speaker_classifier
+
+                t0 = time.perf_counter()
+                self.models["classifier"] = load_speaker_classifier(device)
+                record_model(
+                    "classifier",
+                    self.models["classifier"],
+                    device,
+                    time.perf_counter() - t0,
                 )
 
             self._initialized = True
@@ -96,12 +160,43 @@ class TranscriptionService:
                 "whisper_backend", settings.whisper_backend
             ),
             "model_size": settings.whisper_model,
+            "precision": settings.whisper_precision,
+            "capabilities": (
+                backend_capabilities(
+                    self.models.get("whisper_backend", settings.whisper_backend),
+                    settings,
+                )
+                if LEGACY_AVAILABLE
+                else {}
+            ),
+            "assistant_model": (
+                settings.transformers_assistant_model
+                if "assistant" in self.models
+                else None
+            ),
             "features": {
                 "translation": settings.enable_translation,
                 "diarization": settings.enable_diarization,
             },
         }
 
+    def online_diarizer(self, **kwargs: Any) -> OnlineDiarizer:
+        """Create an OnlineDiarizer on the loaded speaker classifier.
+
+        Args:
+            **kwargs: OnlineDiarizer options (distance_threshold, max_speakers, ...)
+
+        Returns:
+            OnlineDiarizer for one stream
+        """
+        if "classifier" not in self.models:
+            raise ModelLoadError(
+                "Diarization classifier not loaded (initialize with load_classifier=True)"
+            )
+        return OnlineDiarizer(
+            self.models["classifier"], self.models["device"], **kwargs
+        )
+
     async def transcribe_file(
         self,
         audio_file: Path | UploadFile,
@@ -111,6 +206,8 @@ class TranscriptionService:
         max_speakers: int | None = None,
         use_silhouette: bool = False,
         base_url: str | None = None,
+        preset: str | None = None,
+        profile: bool = False,
     ) -> dict[str, Any]:
         """Transcribe an audio file.
 
@@ -122,6 +219,8 @@ class TranscriptionService:
             max_speakers: Maximum number of speakers
             use_silhouette: Use silhouette analysis
             base_url: Base URL for constructing full URLs (e.g., http://localhost:8000)
+            preset: Decode preset (fast, balanced, accurate; default from settings)
+            profile: Profile the inference into settings.profile_dir
 
         Returns:
             Transcription result with text and metadata
@@ -135,6 +234,7 @@ class TranscriptionService:
 
         uploaded_file_path: Path | None = None
         is_uploaded_file = False
+        timings: list[StageTiming] = []
 
         try:
             # Handle UploadFile (check for file attribute which is unique to UploadFile)
@@ -165,8 +265,13 @@ class TranscriptionService:
                 filename = f"{original_name}_{timestamp}.{file_ext}"
                 uploaded_file_path = Path(settings.uploads_dir) / filename
 
-                with uploaded_file_path.open("wb") as buffer:
+                with (
+                    track_timings(timings),
+                    stage("upload"),
+                    uploaded_file_path.open("wb") as buffer,
+                ):
                     shutil.copyfileobj(upload.file, buffer)
+                UPLOAD_BYTES.inc(uploaded_file_path.stat().st_size)
 
                 audio_path = uploaded_file_path
                 is_uploaded_file = True
@@ -191,28 +296,58 @@ class TranscriptionService:
                 raise AudioFileError(f"Audio file not found: {audio_path}")
 
             # Transcribe
+            preset = preset or settings.decode_preset
+            run_stats: dict[str, Any] = {}
             if LEGACY_AVAILABLE:
-                transcript_text = legacy_transcribe(
-                    str(audio_path),
-                    model=self.models["whisper"],
-                    translate=translate or settings.enable_translation,
-                    diarize=diarize or settings.enable_diarization,
-                    device=self.models["device"],
-                    classifier=self.models.get("classifier"),
-                    diarize_threshold=diarize_threshold,
-                    max_speakers=max_speakers or settings.max_speakers,
-                    whisper_backend=self.models.get(
-                        "whisper_backend", settings.whisper_backend
-                    ),
-                    use_silhouette=use_silhouette or settings.use_silhouette,
-                )
+                # Inference runs off the event loop, at most inference_slots at a
+                # time; the worker thread inherits the context, so pipeline stages
+                # are recorded into timings
+                with track_timings(timings):
+                    with stage("queue"), QUEUE_DEPTH.track_inprogress():
+                        await self._slots.acquire()
+                    t0 = time.perf_counter()
+                    try:
+                        INFLIGHT.inc()
+                        with (
+                            profile_request(audio_path.stem)
+                            if profile
+                            else nullcontext()
+                        ) as profile_path:
+                            transcript_text = await run_in_threadpool(
+                                legacy_transcribe,
+                                str(audio_path),
+                                model=self.models["whisper"],
+                                translate=translate or settings.enable_translation,
+                                diarize=diarize or settings.enable_diarization,
+                                device=self.models["device"],
+                                classifier=self.models.get("classifier"),
+                                diarize_threshold=diarize_threshold,
+                                max_speakers=max_speakers or settings.max_speakers,
+                                whisper_backend=self.models.get(
+                                    "whisper_backend", settings.whisper_backend
+                                ),
+                                use_silhouette=use_silhouette
+                                or settings.use_silhouette,
+                                stats=run_stats,
+                                preset=preset,
+                            )
+                    finally:
+                        INFLIGHT.dec()
+                        self._slots.release()
+                audio_s = run_stats.get("audio_duration_s")
+                if audio_s:
+                    REAL_TIME_FACTOR.labels(
+                        settings.whisper_model,
+                        self.models.get("whisper_backend", settings.whisper_backend),
+                    ).observe((time.perf_counter() - t0) / audio_s)
             else:
                 raise TranscriptionError("Legacy transcription not available")
 
             from app.utils import get_unique_filename
 
             output_filename = get_unique_filename(audio_path.name)
-            saved_path = save_transcript(transcript_text, output_filename)
+            with track_timings(timings), stage("save_transcript"):
+                saved_path = save_transcript(transcript_text, output_filename)
 
             logger.info(f"Transcription saved to: {saved_path}")
 
@@ -221,9 +356,18 @@ class TranscriptionService:
                 "model": settings.whisper_model,
                 "backend": self.models.get("whisper_backend", settings.whisper_backend),
                 "device": self.models.get("device", "unknown"),
+                "precision": settings.whisper_precision,
+                "preset": preset,
                 "translated": translate or settings.enable_translation,
                 "diarized": diarize or settings.enable_diarization,
             }
+            if "speculative" in run_stats:
+                speculative = run_stats["speculative"].as_dict()
+                logger.info(f"Speculative decoding: {speculative}")
+                response_metadata["speculative"] = speculative
+            response_metadata["timings"] = timings_summary(timings)
+            if profile_path is not None and profile_path.exists():
+                response_metadata["profile"] = str(profile_path)
 
             # Determine base URL (use provided or fall back to settings)
             if base_url is None:
@@ -1,5 +1,12 @@
 """Utility functions and helpers."""
 
+from app.utils.audio_utils import load_audio, split_on_silence
 from app.utils.io_utils import check_file, get_unique_filename, save_transcript
 
-__all__ = ["check_file", "get_unique_filename", "save_transcript"]
+__all__ = [
+    "check_file",
+    "get_unique_filename",
+    "load_audio",
+    "save_transcript",
+    "split_on_silence",
+]
@@ -0,0 +1,237 @@
+"""Audio decoding, growing-file reading and silence-based splitting helpers."""
+
+import struct
+import time
+from collections.abc import Iterator
+from itertools import pairwise
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+
+# Whisper and ECAPA both operate on 16 kHz mono audio.
+SAMPLE_RATE = 16000
+
+# Energy frames used to locate pauses (20 ms frames, ~200 ms smoothing).
+_FRAME_S = 0.02
+_SMOOTH_FRAMES = 10
+
+
+def load_audio(audio_path: str, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode an audio file to a mono float32 array at the given sample rate."""
+    import librosa
+
+    audio, _ = librosa.load(audio_path, sr=sr, mono=True)
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def get_duration(audio_path: str) -> float:
+    """Audio duration in seconds without decoding the whole file."""
+    import librosa
+
+    return float(librosa.get_duration(path=audio_path))
+
+
+def _pcm_data_offset(f: BinaryIO, sr: int) -> int:
+    """Byte offset of the samples in a 16-bit mono WAV file at sample rate sr.
+
+    The chunk sizes in the header are not used, since a file that is still
+    being written often has placeholder sizes there.
+    """
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        raise ValueError("Not a WAV file")
+    fmt = None
+    while len(chunk := f.read(8)) == 8:
+        chunk_id, size = chunk[:4], int.from_bytes(chunk[4:], "little")
+        if chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            return f.tell()
+        body = f.read(size + (size & 1))
+        if chunk_id == b"fmt ":
+            tag, channels, rate = struct.unpack("<HHI", body[:8])
+            bits = struct.unpack("<H", body[14:16])[0]
+            fmt = (tag, channels, rate, bits)
+            # 0xFFFE is WAVE_FORMAT_EXTENSIBLE, which ffmpeg also writes for PCM
+            if tag not in (1, 0xFFFE) or channels != 1 or rate != sr or bits != 16:
+                raise ValueError(
+                    f"Expected 16-bit mono PCM at {sr} Hz, got format {tag}, "
+                    f"{channels} channel(s), {rate} Hz, {bits}-bit "
+                    f"(convert with: ffmpeg -i IN -ac 1 -ar {sr} -c:a pcm_s16le OUT.wav)"
+                )
+    raise ValueError("WAV file has no data chunk")
+
+
+def follow_pcm(
+    path: str | Path,
+    sr: int = SAMPLE_RATE,
+    chunk_s: float = 1.0,
+    idle_timeout_s: float = 5.0,
+    poll_s: float = 0.25,
+) -> Iterator[np.ndarray]:
+    """
+    Yield float32 chunks of about chunk_s from a 16-bit mono PCM file while it
+    grows (a WAV file, or headerless s16le for .raw and .pcm). Stops once no new
+    samples arrived for idle_timeout_s; with 0 it reads to the current end only.
+    """
+    chunk_bytes = int(chunk_s * sr) * 2
+    with open(path, "rb") as f:
+        if Path(path).suffix.lower() not in (".raw", ".pcm"):
+            f.seek(_pcm_data_offset(f, sr))
+        pending = b""
+        last_data = time.monotonic()
+        while True:
+            data = f.read(chunk_bytes - len(pending))
+            if data:
+                pending += data
+                last_data = time.monotonic()
+                if len(pending) == chunk_bytes:
+                    yield np.frombuffer(pending, dtype="<i2").astype(np.float32) / 32768
+                    pending = b""
+                continue
+            if time.monotonic() - last_data >= idle_timeout_s:
+                break
+            time.sleep(poll_s)
+        usable = len(pending) - len(pending) % 2
+        if usable:
+            yield np.frombuffer(pending[:usable], dtype="<i2").astype(
+                np.float32
+            ) / 32768
+
+
+def frame_energy(audio: np.ndarray, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Smoothed per-frame RMS energy (one value per 20 ms frame)."""
+    frame = int(_FRAME_S * sr)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[: n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+    kernel = np.ones(_SMOOTH_FRAMES, dtype=np.float32) / _SMOOTH_FRAMES
+    return np.convolve(rms, kernel, mode="same")
+
+
+def speech_regions(
+    audio: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    threshold_db: float = -35.0,
+    min_silence_s: float = 0.3,
+    min_speech_s: float = 0.2,
+) -> list[tuple[float, float]]:
+    """
+    Energy-based voice activity: (start_s, end_s) of speech regions.
+    Frames within threshold_db of loud speech (95th percentile frame energy) are
+    speech; pauses shorter than min_silence_s are bridged and regions shorter
+    than min_speech_s dropped.
+    """
+    energy = frame_energy(audio, sr)
+    if len(energy) == 0:
+        return []
+    reference = float(np.percentile(energy, 95))
+    if reference <= 0:
+        return []
+    active = (energy > reference * 10 ** (threshold_db / 20)).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], active, [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return []
+    keep_gap = (starts[1:] - ends[:-1]) * _FRAME_S >= min_silence_s
+    starts = starts[np.concatenate(([True], keep_gap))]
+    ends = ends[np.concatenate((keep_gap, [True]))]
+    return [
+        (float(s * _FRAME_S), float(e * _FRAME_S))
+        for s, e in zip(starts, ends, strict=True)
+        if (e - s) * _FRAME_S >= min_speech_s
+    ]
+
+
+def _quietest_sample(
+    energy: np.ndarray,
+    lo_s: float,
+    hi_s: float,
+    sr: int,
+    max_energy: float | None = None,
+) -> int | None:
+    """Sample index at the centre of the quietest frame in [lo_s, hi_s).
+
+    With max_energy, None unless that frame is quieter than it.
+    """
+    lo = max(0, int(lo_s / _FRAME_S))
+    hi = min(len(energy), int(hi_s / _FRAME_S))
+    if hi <= lo:
+        return None
+    window = energy[lo:hi]
+    best = int(np.argmin(window))
+    if max_energy is not None and window[best] >= max_energy:
+        return None
+    # Land in the middle of a flat pause rather than on its leading edge.
+    quiet = window <= window[best] + 1e-6
+    end = best
+    while end + 1 < len(window) and quiet[end + 1]:
+        end += 1
+    mid = lo + (best + end) // 2
+    return int((mid + 0.5) * _FRAME_S * sr)
+
+
+def split_on_silence(
+    audio: np.ndarray,
+    num_parts: int,
+    search_s: float,
+    sr: int = SAMPLE_RATE,
+    silence_db: float | None = None,
+) -> list[tuple[int, int]]:
+    """
+    Split audio into about num_parts contiguous (start, end) sample ranges.
+    Each cut is placed at the quietest point within search_s of the even split,
+    so ranges tile the audio exactly with no gaps or overlap. With silence_db,
+    that point must be at least silence_db below loud speech (95th percentile
+    frame energy); where no frame is that quiet, no cut is made and the
+    neighbouring ranges stay joined, so fewer ranges may come back.
+    """
+    total = len(audio)
+    if num_parts <= 1 or total == 0:
+        return [(0, total)]
+    energy = frame_energy(audio, sr)
+    max_energy = None
+    if silence_db is not None and len(energy):
+        max_energy = float(np.percentile(energy, 95)) * 10 ** (silence_db / 20)
+    duration = total / sr
+    part_s = duration / num_parts
+    radius = min(search_s, part_s / 2)
+    cuts: list[int] = []
+    for k in range(1, num_parts):
+        target = k * part_s
+        cut = _quietest_sample(energy, target - radius, target + radius, sr, max_energy)
+        if cut is not None and 0 < cut < total and (not cuts or cut > cuts[-1]):
+            cuts.append(cut)
+    bounds = [0, *cuts, total]
+    return list(pairwise(bounds))
+
+
+def split_max_length(
+    audio: np.ndarray,
+    max_len_s: float,
+    search_s: float,
+    sr: int = SAMPLE_RATE,
+) -> list[tuple[int, int]]:
+    """
+    Split audio into contiguous (start, end) sample ranges of at most max_len_s.
+    Each cut is placed at the quietest point in the last search_s of the range.
+    """
+    total = len(audio)
+    max_len = int(max_len_s * sr)
+    if total <= max_len:
+        return [(0, total)]
+    energy = frame_energy(audio, sr)
+    bounds = [0]
+    while total - bounds[-1] > max_len:
+        start_s = bounds[-1] / sr
+        cut = _quietest_sample(
+            energy, start_s + max_len_s - search_s, start_s + max_len_s, sr
+        )
+        if cut is None or cut <= bounds[-1]:
+            cut = bounds[-1] + max_len
+        bounds.append(min(cut, bounds[-1] + max_len))
+    bounds.append(total)
+    return list(pairwise(bounds))
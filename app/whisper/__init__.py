@@ -1,17 +1,46 @@
-"""Whisper implementations: openai-whisper and Hugging Face Transformers. Both run locally."""
+"""Whisper implementations: openai-whisper, Hugging Face Transformers and CTranslate2. All run locally."""
 
+from app.whisper.ctranslate2_whisper import (
+    convert_ctranslate2_whisper,
+    load_ctranslate2_whisper,
+    transcribe_ctranslate2,
+)
+from app.whisper.openai_batched import transcribe_openai_batched
 from app.whisper.openai_whisper import (
     load_openai_whisper,
     transcribe_openai,
 )
+from app.whisper.presets import DECODE_PRESETS, decode_options
+from app.whisper.registry import (
+    Capabilities,
+    WhisperBackend,
+    available_backends,
+    backend_capabilities,
+    get_backend,
+    inference_slots_for,
+    register_backend,
+)
 from app.whisper.transformers_whisper import (
     load_transformers_whisper,
     transcribe_transformers,
 )
 
 __all__ = [
+    "DECODE_PRESETS",
+    "Capabilities",
+    "WhisperBackend",
+    "available_backends",
+    "backend_capabilities",
+    "convert_ctranslate2_whisper",
+    "decode_options",
+    "get_backend",
+    "inference_slots_for",
+    "load_ctranslate2_whisper",
     "load_openai_whisper",
     "load_transformers_whisper",
+    "register_backend",
+    "transcribe_ctranslate2",
     "transcribe_openai",
+    "transcribe_openai_batched",
     "transcribe_transformers",
 ]
@@ -0,0 +1,93 @@
+"""CTranslate2 Whisper backend (faster-whisper runtime). Runs 100% locally after conversion."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.whisper.transformers_whisper import HF_WHISPER_MODELS
+
+# Files faster-whisper needs next to model.bin to run without the Hub.
+_RUNTIME_FILES = ["tokenizer.json", "preprocessor_config.json"]
+
+_INSTALL_HINT = "Install the optional runtime: pip install 'voice-to-text[ctranslate2]'"
+
+
+def ctranslate2_model_dir(
+    cache_dir: str | Path, model_size: str, compute_type: str
+) -> Path:
+    """Directory holding converted weights for a model size and weight type."""
+    return Path(cache_dir) / "ctranslate2" / f"whisper-{model_size}-{compute_type}"
+
+
+def convert_ctranslate2_whisper(
+    model_size: str,
+    cache_dir: str | Path,
+    compute_type: str = "int8",
+    force: bool = False,
+) -> Path:
+    """
+    Convert the Hugging Face Whisper checkpoint to CTranslate2 format under cache_dir.
+    Needs network access (or a warm HF cache) once; loading afterwards is offline.
+    """
+    try:
+        from ctranslate2.converters import TransformersConverter
+    except ImportError as e:
+        raise ImportError(f"ctranslate2 is not installed. {_INSTALL_HINT}") from e
+
+    output_dir = ctranslate2_model_dir(cache_dir, model_size, compute_type)
+    if (output_dir / "model.bin").exists() and not force:
+        return output_dir
+
+    model_id = HF_WHISPER_MODELS.get(model_size, f"openai/whisper-{model_size}")
+    output_dir.parent.mkdir(parents=True, exist_ok=True)
+    converter = TransformersConverter(model_id, copy_files=_RUNTIME_FILES)
+    converter.convert(str(output_dir), quantization=compute_type, force=True)
+    return output_dir
+
+
+def load_ctranslate2_whisper(
+    model_size: str,
+    device: str,
+    cache_dir: str | Path,
+    compute_type: str = "int8",
+    cpu_threads: int = 0,
+) -> Any:
+    """Load converted weights from cache_dir; never touches the network."""
+    try:
+        from faster_whisper import WhisperModel
+    except ImportError as e:
+        raise ImportError(f"faster-whisper is not installed. {_INSTALL_HINT}") from e
+
+    model_dir = ctranslate2_model_dir(cache_dir, model_size, compute_type)
+    if not (model_dir / "model.bin").exists():
+        raise FileNotFoundError(
+            f"No converted CTranslate2 model at {model_dir}. "
+            f"Run: vtt convert --model {model_size} --compute-type {compute_type}"
+        )
+    return WhisperModel(
+        str(model_dir),
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+        local_files_only=True,
+    )
+
+
+def transcribe_ctranslate2(
+    model: Any,
+    audio: str | np.ndarray,
+    task: str,
+    decode_options: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Run transcription on a path or 16 kHz mono array. task: 'transcribe' | 'translate'.
+    decode_options (beam_size, best_of, temperature, ...) go to WhisperModel.transcribe.
+    """
+    segments, _info = model.transcribe(audio, task=task, **(decode_options or {}))
+    return [
+        {"start": float(s.start), "end": float(s.end), "text": (s.text or "").strip()}
+        for s in segments
+    ]
@@ -0,0 +1,140 @@
+"""Batched window decoding for openai-whisper models. Runs 100% locally."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from app.core.tracing import span
+from app.utils.audio_utils import SAMPLE_RATE, load_audio, split_max_length
+from app.whisper.precision import autocast_for
+
+# Mirrors whisper.transcribe's silence rule: skip a window when both hold.
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+WINDOW_S = 30.0
+# Window ends are moved back to the quietest point in the last few seconds.
+WINDOW_SEARCH_S = 5.0
+
+
+def _tokens_to_segments(
+    tokens: list[int],
+    tokenizer: Any,
+    offset_s: float,
+    window_s: float,
+) -> list[dict[str, Any]]:
+    """Turn <|t0|> text <|t1|> token runs into segments shifted to file time."""
+    ts_begin = tokenizer.timestamp_begin
+    segments = []
+    start: float | None = None
+    text_tokens: list[int] = []
+
+    def emit(end: float) -> None:
+        text = tokenizer.decode(text_tokens).strip()
+        if text:
+            seg_start = min(start or 0.0, window_s)
+            segments.append(
+                {
+                    "start": offset_s + seg_start,
+                    "end": offset_s + min(max(end, seg_start), window_s),
+                    "text": text,
+                }
+            )
+
+    for tok in tokens:
+        if tok >= ts_begin:
+            t = (tok - ts_begin) * 0.02
+            if start is None:
+                start = t
+            else:
+                emit(t)
+                text_tokens = []
+                start = None
+        else:
+            text_tokens.append(tok)
+    if text_tokens:
+        # Decoding stopped before the closing timestamp: run to the window end.
+        emit(window_s)
+    return segments
+
+
+def transcribe_openai_batched(
+    model: Any,
+    audio: str | np.ndarray,
+    task: str,
+    batch_size: int = 8,
+    beam_size: int | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Decode an openai-whisper model over all windows in batches.
+    The log-mel spectrogram is computed once for the whole file, windows (<= 30 s,
+    cut at pauses) are encoded and decoded batch_size at a time, greedy or with
+    beam search, and without conditioning on the previous window's text.
+    """
+    import torch
+    import whisper
+    from whisper.audio import HOP_LENGTH, N_FRAMES, N_SAMPLES, pad_or_trim
+    from whisper.tokenizer import get_tokenizer
+
+    if isinstance(audio, str):
+        audio = load_audio(audio)
+    if len(audio) == 0:
+        return []
+
+    windows = split_max_length(audio, WINDOW_S, WINDOW_SEARCH_S)
+    mel = whisper.log_mel_spectrogram(
+        audio, model.dims.n_mels, padding=N_SAMPLES, device=model.device
+    )
+    mels = torch.stack(
+        [
+            pad_or_trim(mel[:, start // HOP_LENGTH : end // HOP_LENGTH], N_FRAMES)
+            for start, end in windows
+        ]
+    )
+
+    fp16 = model.device.type == "cuda"
+    dtype = torch.float16 if fp16 else torch.float32
+    language = "en"
+    if model.is_multilingual:
+        with autocast_for(model):
+            _, probs = model.detect_language(mels[0].to(dtype))
+        language = max(probs, key=probs.get)
+
+    options = whisper.DecodingOptions(
+        task=task,
+        language=language,
+        beam_size=beam_size,
+        without_timestamps=False,
+        fp16=fp16,
+    )
+    tokenizer = get_tokenizer(
+        model.is_multilingual,
+        num_languages=model.num_languages,
+        language=language,
+        task=task,
+    )
+
+    segments: list[dict[str, Any]] = []
+    for i in range(0, len(windows), batch_size):
+        batch = mels[i : i + batch_size].to(dtype)
+        with span("whisper.window", windows=len(batch)), autocast_for(model):
+            results = whisper.decode(model, batch, options)
+        for (start, end), result in zip(
+            windows[i : i + batch_size], results, strict=False
+        ):
+            if (
+                result.no_speech_prob > NO_SPEECH_THRESHOLD
+                and result.avg_logprob < LOGPROB_THRESHOLD
+            ):
+                continue
+            segments.extend(
+                _tokens_to_segments(
+                    result.tokens,
+                    tokenizer,
+                    start / SAMPLE_RATE,
+                    (end - start) / SAMPLE_RATE,
+                )
+            )
+    return segments
@@ -2,23 +2,68 @@
 
 from __future__ import annotations
 
+from pathlib import Path
 from typing import Any
 
+import numpy as np
 
-def load_openai_whisper(model_size: str, device: str) -> Any:
-    """Load OpenAI Whisper model."""
+from app.whisper.precision import (
+    autocast_for,
+    check_precision,
+    load_cached_quantized,
+    quantize_linear_int8,
+    quantized_cache_path,
+    save_cached_quantized,
+)
+
+
+def load_openai_whisper(
+    model_size: str,
+    device: str,
+    precision: str = "fp32",
+    cache_dir: str | Path | None = None,
+) -> Any:
+    """
+    Load OpenAI Whisper model at the given precision (fp32, bf16 or int8).
+    int8 weights are cached under cache_dir so later loads skip quantization.
+    """
+    import torch
     import whisper
 
-    return whisper.load_model(model_size, device=device)
+    check_precision(precision, device)
+    cache_path = None
+    if precision == "int8" and cache_dir is not None:
+        cache_path = quantized_cache_path(cache_dir, "openai", model_size)
+        cached = load_cached_quantized(cache_path)
+        if cached is not None:
+            return cached
+
+    model = whisper.load_model(model_size, device=device)
+    if precision == "bf16":
+        model = model.to(torch.bfloat16)
+        # Decoding checks the encoder output is fp32; bf16 compute comes from autocast.
+        model.encoder.register_forward_hook(lambda _m, _i, out: out.float())
+    elif precision == "int8":
+        model = quantize_linear_int8(model)
+        if cache_path is not None:
+            save_cached_quantized(model, cache_path)
+    return model
 
 
 def transcribe_openai(
     model: Any,
-    audio_path: str,
+    audio: str | np.ndarray,
     task: str,
+    decode_options: dict[str, Any] | None = None,
 ) -> list[dict[str, Any]]:
-    """Run transcription. task: 'transcribe' | 'translate'."""
-    result = model.transcribe(audio_path, task=task, verbose=False)
+    """
+    Run transcription on a path or 16 kHz mono array. task: 'transcribe' | 'translate'.
+    decode_options (beam_size, best_of, temperature, ...) go to model.transcribe.
+    """
+    with autocast_for(model):
+        result = model.transcribe(
+            audio, task=task, verbose=False, **(decode_options or {})
+        )
     segments = result.get("segments", [])
     return [
         {"start": s["start"], "end": s["end"], "text": (s.get("text") or "").strip()}
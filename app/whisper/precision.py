@@ -0,0 +1,76 @@
+"""Post-load precision conversion for Whisper models (fp32, bf16, dynamic int8)."""
+
+from __future__ import annotations
+
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Literal
+
+Precision = Literal["fp32", "bf16", "int8"]
+
+
+def check_precision(precision: str, device: str) -> None:
+    """Reject precision/device combinations that cannot run."""
+    if precision not in ("fp32", "bf16", "int8"):
+        raise ValueError(f"Unknown precision: {precision}")
+    if precision == "int8" and device != "cpu":
+        raise ValueError("Dynamic int8 quantization is only supported on CPU")
+
+
+def quantized_cache_path(cache_dir: str | Path, backend: str, model_size: str) -> Path:
+    """Cache file for int8 weights. Keyed by torch version: packed weights are not portable."""
+    import torch
+
+    version = torch.__version__.split("+")[0]
+    return (
+        Path(cache_dir) / "whisper" / f"{backend}-{model_size}-int8-torch{version}.pt"
+    )
+
+
+def load_cached_quantized(path: Path) -> Any | None:
+    """Load a previously quantized module, or None if there is no usable cache."""
+    import torch
+
+    if not path.exists():
+        return None
+    try:
+        # Written by save_cached_quantized from our own model cache directory.
+        return torch.load(path, map_location="cpu", weights_only=False)  # nosec B614
+    except Exception as e:
+        print(f"[!] Ignoring unreadable quantized cache {path}: {e}")
+        return None
+
+
+def save_cached_quantized(module: Any, path: Path) -> None:
+    """Persist a quantized module so later startups skip the conversion."""
+    import torch
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    torch.save(module, tmp)
+    tmp.replace(path)
+
+
+def quantize_linear_int8(module: Any) -> Any:
+    """Dynamically quantize every Linear layer to int8 weights, in place."""
+    import torch
+    from torch import nn
+
+    # Subclasses of nn.Linear (openai-whisper ships its own) are not matched by
+    # the quantization mappings; their forward is nn.Linear's for fp32 inputs.
+    for child in module.modules():
+        if isinstance(child, nn.Linear) and type(child) is not nn.Linear:
+            child.__class__ = nn.Linear
+    return torch.ao.quantization.quantize_dynamic(
+        module, {nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+
+
+def autocast_for(module: Any) -> Any:
+    """Autocast context for bf16 models so every op runs in bf16; no-op otherwise."""
+    import torch
+
+    param = next(module.parameters(), None)
+    if param is not None and param.dtype == torch.bfloat16:
+        return torch.autocast(device_type=param.device.type, dtype=torch.bfloat16)
+    return nullcontext()
@@ -0,0 +1,83 @@
+"""Named speed/accuracy decode presets, mapped to each backend's decode options."""
+
+from __future__ import annotations
+
+from typing import Any, Literal
+
+DecodePreset = Literal["fast", "balanced", "accurate"]
+DECODE_PRESETS: tuple[str, ...] = ("fast", "balanced", "accurate")
+
+# Temperature fallback schedule used by openai-whisper and faster-whisper.
+_FALLBACK = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+# fast drops beam search, temperature fallback and conditioning on the previous
+# window; balanced is greedy with the temperature fallback (each backend's own
+# default for openai and ctranslate2, so empty options there); accurate adds
+# beam search and best-of sampling on top of the fallback.
+_OPTIONS: dict[str, dict[str, dict[str, Any]]] = {
+    "openai": {
+        # Options for model.transcribe / DecodingOptions.
+        "fast": {
+            "temperature": 0.0,
+            "beam_size": None,
+            "best_of": None,
+            "condition_on_previous_text": False,
+        },
+        "balanced": {},
+        "accurate": {
+            "temperature": _FALLBACK,
+            "beam_size": 5,
+            "best_of": 5,
+            "condition_on_previous_text": True,
+        },
+    },
+    "transformers": {
+        # generate_kwargs for WhisperForConditionalGeneration.generate. Its
+        # defaults are already the fast pass, so balanced spells out the
+        # fallback the other backends apply by default. The compression ratio
+        # is computed on token ids here, hence 1.35 rather than 2.4.
+        "fast": {"num_beams": 1, "condition_on_prev_tokens": False},
+        "balanced": {
+            "num_beams": 1,
+            "temperature": _FALLBACK,
+            "logprob_threshold": -1.0,
+            "compression_ratio_threshold": 1.35,
+            "condition_on_prev_tokens": True,
+        },
+        "accurate": {
+            "num_beams": 5,
+            "temperature": _FALLBACK,
+            "logprob_threshold": -1.0,
+            "compression_ratio_threshold": 1.35,
+            "condition_on_prev_tokens": True,
+        },
+    },
+    "ctranslate2": {
+        # Options for faster_whisper.WhisperModel.transcribe (defaults: beam 5, best_of 5).
+        "fast": {
+            "beam_size": 1,
+            "best_of": 1,
+            "temperature": 0.0,
+            "condition_on_previous_text": False,
+        },
+        "balanced": {},
+        "accurate": {
+            "beam_size": 5,
+            "best_of": 5,
+            "patience": 2.0,
+            "temperature": _FALLBACK,
+            "condition_on_previous_text": True,
+        },
+    },
+}
+
+
+def decode_options(preset: str | None, backend: str) -> dict[str, Any]:
+    """Decode options for a preset on a backend; None means the backend defaults."""
+    if preset is None:
+        return {}
+    if preset not in DECODE_PRESETS:
+        raise ValueError(
+            f"Unknown decode preset: {preset}. Available: {', '.join(DECODE_PRESETS)}"
+        )
+    return dict(_OPTIONS.get(backend, {}).get(preset, {}))
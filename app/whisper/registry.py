@@ -0,0 +1,242 @@
+"""Whisper backend registry: each backend declares how to load/run it and what it supports."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any
+
+import numpy as np
+
+from app.core.tracing import trace_calls
+from app.whisper.ctranslate2_whisper import (
+    load_ctranslate2_whisper,
+    transcribe_ctranslate2,
+)
+from app.whisper.openai_batched import transcribe_openai_batched
+from app.whisper.openai_whisper import load_openai_whisper, transcribe_openai
+from app.whisper.presets import decode_options
+from app.whisper.transformers_whisper import (
+    load_transformers_whisper,
+    transcribe_transformers,
+)
+
+# load(model_size, device, cfg) -> model
+LoadFn = Callable[[str, str, Any], Any]
+# transcribe(model, audio, task, cfg, stats=None, preset=None) -> segments
+BackendTranscribeFn = Callable[..., list[dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class Capabilities:
+    """What a backend can do; the pipeline picks its path from these, not from names."""
+
+    batching: bool = False  # decodes several 30 s windows per forward pass
+    pcm_input: bool = False  # accepts a 16 kHz float32 array instead of a path
+    concurrent: bool = False  # one loaded model can serve several threads at once
+
+
+@dataclass(frozen=True)
+class WhisperBackend:
+    """
+    A Whisper engine. load and transcribe receive the application settings as cfg,
+    so backend options live next to the backend instead of in every caller.
+    transcribe also takes a decode preset name (see app.whisper.presets).
+    configure adjusts capabilities that depend on backend options (cfg).
+    """
+
+    name: str
+    load: LoadFn
+    transcribe: BackendTranscribeFn
+    capabilities: Capabilities = field(default_factory=Capabilities)
+    configure: Callable[[Capabilities, Any], Capabilities] | None = None
+
+    def capabilities_for(self, cfg: Any) -> Capabilities:
+        """Capabilities under the given settings."""
+        if self.configure is None:
+            return self.capabilities
+        return self.configure(self.capabilities, cfg)
+
+
+_BACKENDS: dict[str, WhisperBackend] = {}
+
+
+def register_backend(backend: WhisperBackend) -> WhisperBackend:
+    """Add (or replace) a backend under its name."""
+    _BACKENDS[backend.name] = backend
+    return backend
+
+
+def get_backend(name: str) -> WhisperBackend:
+    """Look up a registered backend by name."""
+    try:
+        return _BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown Whisper backend: {name}. Available: {', '.join(_BACKENDS)}"
+        ) from None
+
+
+def available_backends() -> list[str]:
+    """Names of all registered backends, in registration order."""
+    return list(_BACKENDS)
+
+
+def inference_slots_for(backend: WhisperBackend, requested: int) -> int:
+    """Concurrent transcriptions one process can run on a single loaded model."""
+    return max(1, requested) if backend.capabilities.concurrent else 1
+
+
+def backend_capabilities(name: str, cfg: Any = None) -> dict[str, bool]:
+    """Capability flags of a backend as a plain dict (for health/info output).
+
+    With cfg, flags that depend on backend options reflect those settings.
+    """
+    backend = get_backend(name)
+    return asdict(
+        backend.capabilities if cfg is None else backend.capabilities_for(cfg)
+    )
+
+
+def _load_openai(model_size: str, device: str, cfg: Any) -> Any:
+    model = load_openai_whisper(
+        model_size,
+        device,
+        precision=cfg.whisper_precision,
+        cache_dir=cfg.model_cache_dir,
+    )
+    # whisper.transcribe decodes each 30 s window (and fallback retry) through
+    # model.decode. Wrapped after loading, so the int8 cache pickles the plain model
+    trace_calls(model, "decode", "whisper.window")
+    return model
+
+
+# Decoding the batched openai engine always does, in preset option terms
+_BATCHED_DECODING: dict[str, Any] = {
+    "temperature": 0.0,
+    "best_of": None,
+    "condition_on_previous_text": False,
+}
+
+
+def _transcribe_openai(
+    model: Any,
+    audio: str | np.ndarray,
+    task: str,
+    cfg: Any,
+    stats: dict[str, Any] | None = None,
+    preset: str | None = None,
+) -> list[dict[str, Any]]:
+    options = decode_options(preset, "openai")
+    if cfg.openai_decode_engine == "batched":
+        # The batched engine decodes every window once at temperature 0; only
+        # the beam width carries over from the preset.
+        ignored = {
+            k: v
+            for k, v in options.items()
+            if k != "beam_size" and v != _BATCHED_DECODING.get(k)
+        }
+        if ignored:
+            print(
+                "[!] OPENAI_DECODE_ENGINE=batched ignores "
+                + ", ".join(f"{k}={v}" for k, v in ignored.items())
+                + f" from the {preset} preset"
+            )
+        return transcribe_openai_batched(
+            model,
+            audio,
+            task,
+            batch_size=cfg.openai_batch_size,
+            beam_size=options.get("beam_size", cfg.openai_beam_size),
+        )
+    return transcribe_openai(model, audio, task, decode_options=options)
+
+
+def _load_transformers(model_size: str, device: str, cfg: Any) -> Any:
+    asr = load_transformers_whisper(
+        model_size,
+        device,
+        chunk_length_s=cfg.transformers_chunk_length_s,
+        stride_length_s=cfg.transformers_stride_length_s,
+        batch_size=cfg.transformers_batch_size,
+        precision=cfg.whisper_precision,
+        cache_dir=cfg.model_cache_dir,
+        assistant_model=cfg.transformers_assistant_model,
+    )
+    # The pipeline calls generate once per batch of chunks
+    trace_calls(asr.model, "generate", "whisper.window")
+    return asr
+
+
+def _transcribe_transformers(
+    model: Any,
+    audio: str | np.ndarray,
+    task: str,
+    cfg: Any,
+    stats: dict[str, Any] | None = None,
+    preset: str | None = None,
+) -> list[dict[str, Any]]:
+    return transcribe_transformers(
+        model,
+        audio,
+        task,
+        stats=stats,
+        generate_options=decode_options(preset, "transformers"),
+    )
+
+
+def _load_ctranslate2(model_size: str, device: str, cfg: Any) -> Any:
+    model = load_ctranslate2_whisper(
+        model_size,
+        device,
+        cache_dir=cfg.model_cache_dir,
+        compute_type=cfg.ctranslate2_compute_type,
+    )
+    # faster-whisper decodes each 30 s window through generate_with_fallback
+    trace_calls(model, "generate_with_fallback", "whisper.window")
+    return model
+
+
+def _transcribe_ctranslate2(
+    model: Any,
+    audio: str | np.ndarray,
+    task: str,
+    cfg: Any,
+    stats: dict[str, Any] | None = None,
+    preset: str | None = None,
+) -> list[dict[str, Any]]:
+    return transcribe_ctranslate2(
+        model, audio, task, decode_options=decode_options(preset, "ctranslate2")
+    )
+
+
+register_backend(
+    WhisperBackend(
+        name="openai",
+        load=_load_openai,
+        transcribe=_transcribe_openai,
+        # Not concurrent: decoding installs kv-cache hooks on the shared model.
+        capabilities=Capabilities(pcm_input=True),
+        # model.transcribe decodes one window at a time; the batched engine does not
+        configure=lambda caps, cfg: replace(
+            caps, batching=cfg.openai_decode_engine == "batched"
+        ),
+    )
+)
+register_backend(
+    WhisperBackend(
+        name="transformers",
+        load=_load_transformers,
+        transcribe=_transcribe_transformers,
+        capabilities=Capabilities(batching=True, pcm_input=True, concurrent=True),
+    )
+)
+register_backend(
+    WhisperBackend(
+        name="ctranslate2",
+        load=_load_ctranslate2,
+        transcribe=_transcribe_ctranslate2,
+        # Decodes one window at a time; segments are collected before returning.
+        capabilities=Capabilities(pcm_input=True, concurrent=True),
+    )
+)
@@ -0,0 +1,161 @@
+"""Assisted (speculative) decoding for the transformers backend: draft model loading and stats."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class AssistedDecodingStats:
+    """Counters collected while a draft model assists the main model."""
+
+    generated_tokens: int = 0
+    target_steps: int = 0
+    draft_steps: int = 0
+    target_time_s: float = 0.0
+    draft_time_s: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        Summary for response metadata. Every target step emits its accepted draft
+        tokens plus one token of its own, so accepted = generated - target_steps.
+        The speedup compares decoder time against plain greedy decoding, which
+        would take one target step (at the measured cost) per generated token.
+        """
+        accepted = max(0, self.generated_tokens - self.target_steps)
+        step_cost = self.target_time_s / self.target_steps if self.target_steps else 0
+        decoder_time = self.target_time_s + self.draft_time_s
+        return {
+            "generated_tokens": self.generated_tokens,
+            "target_steps": self.target_steps,
+            "draft_steps": self.draft_steps,
+            "acceptance_rate": (
+                round(accepted / self.draft_steps, 3) if self.draft_steps else 0.0
+            ),
+            "tokens_per_target_step": (
+                round(self.generated_tokens / self.target_steps, 2)
+                if self.target_steps
+                else 0.0
+            ),
+            "estimated_speedup": (
+                round(self.generated_tokens * step_cost / decoder_time, 2)
+                if decoder_time
+                else 0.0
+            ),
+        }
+
+
+def load_transformers_assistant(model_id: str, device: str, precision: str) -> Any:
+    """Load a small Whisper checkpoint to draft tokens for the main model."""
+    import torch
+    from transformers import AutoModelForSpeechSeq2Seq
+
+    dtype = torch.bfloat16 if precision == "bf16" else torch.float32
+    # Unpinned like the main model, which pipeline() loads from the same hub:
+    # model_id may be any user-chosen checkpoint, so no revision is known here.
+    assistant = AutoModelForSpeechSeq2Seq.from_pretrained(  # nosec B615
+        model_id, torch_dtype=dtype
+    )
+    return assistant.to(device).eval()
+
+
+# Stats of the request decoding on this thread/task; hooks record into it.
+_active_stats: ContextVar[AssistedDecodingStats | None] = ContextVar(
+    "assisted_decoding_stats", default=None
+)
+
+
+def _time_forward(module: Any, on_done: Any) -> None:
+    """Time every forward call of module; on_done(stats, elapsed_s) runs after each."""
+    local = threading.local()
+
+    def pre_hook(*_args: Any) -> None:
+        local.started = time.perf_counter()
+
+    def post_hook(*_args: Any) -> None:
+        stats = _active_stats.get()
+        if stats is not None:
+            on_done(stats, time.perf_counter() - local.started)
+
+    module.register_forward_pre_hook(pre_hook)
+    module.register_forward_hook(post_hook)
+
+
+def _prompt_token_ids(generation_config: Any) -> set[int]:
+    """Start/language/task tokens Whisper is prompted with; they are not generated."""
+    ids: set[int] = set()
+    for name in ("decoder_start_token_id", "no_timestamps_token_id"):
+        token_id = getattr(generation_config, name, None)
+        if token_id is not None:
+            ids.add(token_id)
+    ids.update((getattr(generation_config, "lang_to_id", None) or {}).values())
+    ids.update((getattr(generation_config, "task_to_id", None) or {}).values())
+    return ids
+
+
+def _padding_token_ids(generation_config: Any) -> set[int]:
+    """Pad and end-of-text tokens that fill finished rows of a padded batch."""
+    ids: set[int] = set()
+    for name in ("pad_token_id", "eos_token_id"):
+        token_id = getattr(generation_config, name, None)
+        if isinstance(token_id, int):
+            ids.add(token_id)
+        elif token_id is not None:
+            ids.update(token_id)
+    return ids
+
+
+def instrument_assisted_decoding(model: Any, assistant: Any) -> None:
+    """
+    Install counters on the main and draft models once, at load time. They only
+    record while track_assisted_decoding is active in the calling thread, so
+    concurrent requests keep separate stats.
+    """
+
+    def on_target(stats: AssistedDecodingStats, elapsed: float) -> None:
+        stats.target_steps += 1
+        stats.target_time_s += elapsed
+
+    def on_draft(stats: AssistedDecodingStats, elapsed: float) -> None:
+        stats.draft_steps += 1
+        stats.draft_time_s += elapsed
+
+    _time_forward(model.get_decoder(), on_target)
+    _time_forward(assistant.get_decoder(), on_draft)
+
+    # Neither prompt nor padding tokens were drafted or verified
+    not_generated = _prompt_token_ids(model.generation_config) | _padding_token_ids(
+        model.generation_config
+    )
+    original_generate = model.generate
+
+    def counting_generate(*args: Any, **kwargs: Any) -> Any:
+        out = original_generate(*args, **kwargs)
+        stats = _active_stats.get()
+        if stats is not None:
+            sequences = out["sequences"] if isinstance(out, dict) else out
+            stats.generated_tokens += sum(
+                1 for tok in sequences.flatten().tolist() if tok not in not_generated
+            )
+        return out
+
+    model.generate = counting_generate
+
+
+@contextmanager
+def track_assisted_decoding(
+    stats: AssistedDecodingStats | None = None,
+) -> Iterator[AssistedDecodingStats]:
+    """Collect counters from instrumented models into stats while active."""
+    acc = stats if stats is not None else AssistedDecodingStats()
+    token = _active_stats.set(acc)
+    try:
+        yield acc
+    finally:
+        _active_stats.reset(token)
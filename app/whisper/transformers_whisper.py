@@ -2,8 +2,26 @@
 
 from __future__ import annotations
 
+import os
+from pathlib import Path
 from typing import Any
 
+import numpy as np
+
+from app.whisper.precision import (
+    check_precision,
+    load_cached_quantized,
+    quantize_linear_int8,
+    quantized_cache_path,
+    save_cached_quantized,
+)
+from app.whisper.speculative import (
+    AssistedDecodingStats,
+    instrument_assisted_decoding,
+    load_transformers_assistant,
+    track_assisted_decoding,
+)
+
 HF_WHISPER_MODELS = {
     "tiny": "openai/whisper-tiny",
     "base": "openai/whisper-base",
@@ -14,37 +32,193 @@ HF_WHISPER_MODELS = {
     "large-v3": "openai/whisper-large-v3",
 }
 
+# Rough working memory per 30 s chunk in a batch (weights excluded), in MB.
+_BATCH_ITEM_MB = {
+    "tiny": 60,
+    "base": 100,
+    "small": 250,
+    "medium": 600,
+    "large": 1000,
+    "large-v2": 1000,
+    "large-v3": 1000,
+}
+MAX_AUTO_BATCH_SIZE = 16
+
+
+def _available_memory_bytes(device: str) -> int:
+    """Free memory for inference: GPU free memory, or host MemAvailable capped by cgroup."""
+    if device == "cuda":
+        import torch
+
+        free, _ = torch.cuda.mem_get_info()
+        return int(free)
+
+    available = 0
+    try:
+        with open("/proc/meminfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    available = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        available = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+
+    # Inside a container the cgroup limit is the real ceiling.
+    limit_file = Path("/sys/fs/cgroup/memory.max")
+    usage_file = Path("/sys/fs/cgroup/memory.current")
+    try:
+        limit = limit_file.read_text().strip()
+        if limit != "max":
+            headroom = int(limit) - int(usage_file.read_text().strip())
+            available = min(available, headroom) if available else headroom
+    except (OSError, ValueError):
+        pass
+    return max(0, available)
+
 
-def load_transformers_whisper(model_size: str, device: str) -> Any:
-    """Load HF automatic-speech-recognition pipeline with Whisper."""
+def auto_batch_size(model_size: str, device: str) -> int:
+    """Pick a chunk batch size that fits in half of the currently free memory."""
+    item_bytes = _BATCH_ITEM_MB.get(model_size, 600) * 1024 * 1024
+    budget = _available_memory_bytes(device) // 2
+    return max(1, min(MAX_AUTO_BATCH_SIZE, budget // item_bytes))
+
+
+def load_transformers_whisper(
+    model_size: str,
+    device: str,
+    chunk_length_s: float = 0.0,
+    stride_length_s: float | None = None,
+    batch_size: int = 0,
+    precision: str = "fp32",
+    cache_dir: str | Path | None = None,
+    assistant_model: str | None = None,
+) -> Any:
+    """
+    Load HF automatic-speech-recognition pipeline with Whisper.
+    chunk_length_s > 0 enables chunked long-form mode: the file is cut into
+    overlapping chunks (stride_length_s on each side, HF default chunk/6) that are
+    decoded batch_size at a time (0 = auto from free memory).
+    precision is fp32, bf16 or int8; int8 weights are cached under cache_dir.
+    assistant_model (a size such as 'tiny' or a HF model id) loads a draft model
+    that stays resident on the pipeline as pipe.assistant_model and drives
+    assisted generation; greedy output is identical to the main model alone.
+    Assisted generation decodes one chunk at a time, so batch_size becomes 1.
+    """
+    import torch
     from transformers import pipeline
 
+    check_precision(precision, device)
     model_id = HF_WHISPER_MODELS.get(model_size, f"openai/whisper-{model_size}")
-    return pipeline(
+    chunk_kwargs: dict[str, Any] = {}
+    if chunk_length_s > 0:
+        chunk_kwargs["chunk_length_s"] = chunk_length_s
+        if stride_length_s is not None:
+            chunk_kwargs["stride_length_s"] = stride_length_s
+        chunk_kwargs["batch_size"] = batch_size or auto_batch_size(model_size, device)
+        if assistant_model:
+            chunk_kwargs["batch_size"] = 1
+
+    model: Any = model_id
+    cache_path = None
+    if precision == "int8" and cache_dir is not None:
+        cache_path = quantized_cache_path(cache_dir, "transformers", model_size)
+        cached = load_cached_quantized(cache_path)
+        if cached is not None:
+            model = cached
+
+    asr = pipeline(
         "automatic-speech-recognition",
-        model=model_id,
+        model=model,
+        tokenizer=model_id,
+        feature_extractor=model_id,
         device=0 if device == "cuda" else -1,
+        torch_dtype=torch.bfloat16 if precision == "bf16" else None,
         return_timestamps="segment",
+        **chunk_kwargs,
     )
+    if precision == "int8" and model is model_id:
+        asr.model = quantize_linear_int8(asr.model)
+        if cache_path is not None:
+            save_cached_quantized(asr.model, cache_path)
+    asr.assistant_model = None
+    if assistant_model:
+        assistant_id = HF_WHISPER_MODELS.get(assistant_model, assistant_model)
+        asr.assistant_model = load_transformers_assistant(
+            assistant_id, device, precision
+        )
+        instrument_assisted_decoding(asr.model, asr.assistant_model)
+    return asr
+
+
+def _duration(audio: str | np.ndarray) -> float:
+    from app.utils.audio_utils import SAMPLE_RATE, get_duration
+
+    if isinstance(audio, str):
+        return get_duration(audio)
+    return len(audio) / SAMPLE_RATE
 
 
 def transcribe_transformers(
     pipeline_or_model: Any,
-    audio_path: str,
+    audio: str | np.ndarray,
     task: str,
+    stats: dict[str, Any] | None = None,
+    generate_options: dict[str, Any] | None = None,
 ) -> list[dict[str, Any]]:
-    """Run transcription. task: 'transcribe' | 'translate'."""
-    out = pipeline_or_model(
-        audio_path,
-        return_timestamps="segment",
-        generate_kwargs={"task": task},
-    )
+    """
+    Run transcription on a path or 16 kHz mono array. task: 'transcribe' | 'translate'.
+    generate_options (num_beams, temperature, ...) are passed to generate().
+    With a draft model on the pipeline, assisted-decoding counters are added up
+    in stats["speculative"] (an AssistedDecodingStats) when stats is given.
+    """
+    inputs: Any = audio
+    if not isinstance(audio, str):
+        inputs = {"raw": audio, "sampling_rate": 16000}
+    generate_kwargs: dict[str, Any] = {**(generate_options or {}), "task": task}
+    assistant = getattr(pipeline_or_model, "assistant_model", None)
+    if assistant is None:
+        out = pipeline_or_model(
+            inputs, return_timestamps="segment", generate_kwargs=generate_kwargs
+        )
+    else:
+        # Assisted generation is greedy-only; keep it explicit so it matches
+        # the main model's own greedy output.
+        ignored = {
+            k: v
+            for k, v in generate_kwargs.items()
+            if (k == "num_beams" and v != 1) or k in ("temperature", "do_sample")
+        }
+        if ignored:
+            print(
+                "[!] Speculative decoding is greedy-only; ignoring "
+                + ", ".join(f"{k}={v}" for k, v in ignored.items())
+                + " from the decode options"
+            )
+        generate_kwargs.pop("temperature", None)
+        generate_kwargs.update(assistant_model=assistant, num_beams=1, do_sample=False)
+        acc = AssistedDecodingStats()
+        if stats is not None:
+            acc = stats.setdefault("speculative", acc)
+        with track_assisted_decoding(acc):
+            out = pipeline_or_model(
+                inputs, return_timestamps="segment", generate_kwargs=generate_kwargs
+            )
     segments = []
     if isinstance(out, dict) and "chunks" in out:
-        for ch in out["chunks"]:
+        chunks = out["chunks"]
+        for i, ch in enumerate(chunks):
             ts = ch.get("timestamp")
             if ts is not None and isinstance(ts, tuple | list) and len(ts) >= 2:
-                s, e = float(ts[0]), float(ts[1])
+                s = float(ts[0]) if ts[0] is not None else 0.0
+                # Chunked mode leaves the end of the final chunk open: end it
+                # where the next one starts, or at the end of the audio
+                nxt = chunks[i + 1].get("timestamp") if i + 1 < len(chunks) else None
+                if ts[1] is not None:
+                    e = float(ts[1])
+                elif nxt and nxt[0] is not None:
+                    e = float(nxt[0])
+                else:
+                    e = max(s, _duration(audio))
             else:
                 s, e = 0.0, 0.0
             text = (ch.get("text") or "").strip()
@@ -0,0 +1 @@
+"""Performance benchmarks. Run as modules, e.g. ``python -m benchmarks.openai_decode``."""
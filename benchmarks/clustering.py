@@ -0,0 +1,138 @@
+"""Speaker-count estimation: per-k refits vs one linkage tree, plus the eigengap estimator.
+
+Synthetic ECAPA-like embeddings (unit vectors scattered around one direction per
+speaker) are clustered three ways:
+
+- refit: the former loop, AgglomerativeClustering + silhouette_score per k;
+- tree: cluster_speakers with one linkage tree and one distance matrix;
+- eigengap: cluster_speakers with the eigengap speaker count.
+
+The tree path is checked to give the same k, scores and labels as the refits.
+
+A second table compares exact and two-stage (k-means, then AHC over centroids)
+clustering at hours-long sizes: wall time, peak traced memory and adjusted Rand
+index against the true speakers. Exact runs are skipped above --exact-limit.
+
+Usage:
+    python -m benchmarks.clustering
+    python -m benchmarks.clustering --sizes 500 2000 --speakers 4
+    python -m benchmarks.clustering --sizes --large-sizes 10000 28000 --exact-limit 10000
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Any
+
+import numpy as np
+
+from app.services.clustering import (
+    cluster_speakers,
+    cosine_linkage,
+    estimate_speakers_silhouette,
+)
+
+
+def refit_silhouette(
+    embeddings: np.ndarray,
+) -> tuple[np.ndarray, int, dict[int, float]]:
+    """The former silhouette path: refit and rescore from scratch for every k."""
+    from sklearn.cluster import AgglomerativeClustering
+    from sklearn.metrics import silhouette_score
+
+    best_k, best_score = 2, -1.0
+    scores = {}
+    for k in range(2, min(11, len(embeddings))):
+        c = AgglomerativeClustering(n_clusters=k, metric="cosine", linkage="average")
+        labels = c.fit_predict(embeddings)
+        if len(set(labels)) < k:
+            continue
+        scores[k] = float(silhouette_score(embeddings, labels, metric="cosine"))
+        if scores[k] > best_score:
+            best_score, best_k = scores[k], k
+    final = AgglomerativeClustering(
+        n_clusters=best_k, metric="cosine", linkage="average"
+    ).fit_predict(embeddings)
+    return final, best_k, scores
+
+
+def synthetic_embeddings(
+    n: int, speakers: int, rng: np.random.Generator, dim: int = 192
+) -> tuple[np.ndarray, np.ndarray]:
+    """Unit embeddings and their true speaker labels."""
+    centers = rng.normal(size=(speakers, dim))
+    truth = rng.integers(speakers, size=n)
+    x = centers[truth] + rng.normal(scale=0.9, size=(n, dim))
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32), truth
+
+
+def measured(fn: Any, *args: Any, **kwargs: Any) -> tuple[Any, float, float]:
+    """Result, wall time in seconds and peak traced memory in MB."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[200, 1000, 3000])
+    parser.add_argument("--large-sizes", type=int, nargs="*", default=[10000, 28000])
+    parser.add_argument("--exact-limit", type=int, default=10000)
+    parser.add_argument("--speakers", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(
+        f"{'chunks':>7} {'refit_s':>8} {'tree_s':>8} {'eigengap_s':>10} "
+        f"{'k_sil':>6} {'k_eig':>6} {'identical':>9}"
+    )
+    for n in args.sizes:
+        emb, _ = synthetic_embeddings(n, args.speakers, rng)
+
+        t0 = time.perf_counter()
+        ref_labels, ref_k, ref_scores = refit_silhouette(emb)
+        t_refit = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        labels = cluster_speakers(emb, estimate_count=True, method="silhouette")
+        t_tree = time.perf_counter() - t0
+        k, scores = estimate_speakers_silhouette(emb, cosine_linkage(emb))
+
+        t0 = time.perf_counter()
+        eig_labels = cluster_speakers(emb, estimate_count=True, method="eigengap")
+        t_eig = time.perf_counter() - t0
+
+        identical = (
+            k == ref_k and scores == ref_scores and np.array_equal(labels, ref_labels)
+        )
+        print(
+            f"{n:>7} {t_refit:>8.2f} {t_tree:>8.2f} {t_eig:>10.2f} "
+            f"{k:>6} {len(set(eig_labels)):>6} {identical!s:>9}"
+        )
+
+    from sklearn.metrics import adjusted_rand_score
+
+    print(
+        f"\n{'chunks':>7} {'mode':<9} {'time_s':>8} {'peak_mb':>8} {'speakers':>8} {'ari':>6}"
+    )
+    for n in args.large_sizes:
+        emb, truth = synthetic_embeddings(n, args.speakers, rng)
+        for mode, max_exact in (("exact", None), ("two-stage", 0)):
+            if max_exact is None and n > args.exact_limit:
+                continue
+            labels, elapsed, peak = measured(
+                cluster_speakers, emb, max_speakers=args.speakers, max_exact=max_exact
+            )
+            print(
+                f"{n:>7} {mode:<9} {elapsed:>8.2f} {peak:>8.0f} "
+                f"{len(set(labels)):>8} {adjusted_rand_score(truth, labels):>6.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Speaker-embedding throughput: batch sizes and shared vs per-window fbank features.
+
+The audio is cut into fixed-length pseudo-segments (no transcription needed) and
+turned into the diarizer's sliding-window chunks. Every configuration is
+compared with the per-window, batch-size-1 reference: throughput in chunks/s and
+the cosine similarity of each chunk's embedding to the reference one.
+
+With --runtimes, shared-feature runs are repeated on exported runtimes (vtt
+export; exported on the fly if missing).
+
+Usage:
+    python -m benchmarks.embeddings media/audio/multi_person.mp3
+    python -m benchmarks.embeddings audio.wav --batch-sizes 1 16 64 --segment-s 20
+    python -m benchmarks.embeddings audio.wav --runtimes torchscript onnx --int8
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.diarization import _build_diarization_chunks, extract_embeddings
+from app.services.embedding_runtime import EmbeddingRuntime, export_embedding_model
+
+
+def run(
+    classifier: object,
+    audio: np.ndarray,
+    chunks: list[tuple[float, float, int]],
+    batch_size: int,
+    shared: bool,
+    runtime: EmbeddingRuntime = "eager",
+) -> tuple[np.ndarray, float]:
+    """Embeddings and wall time for one configuration."""
+    settings.diarize_shared_features = shared
+    settings.diarize_runtime = runtime
+    t0 = time.perf_counter()
+    embeddings, _ = extract_embeddings(
+        classifier, audio, settings.DIARIZE_SAMPLE_RATE, chunks, "cpu", batch_size
+    )
+    return embeddings, time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("audio", help="Audio file")
+    parser.add_argument("--segment-s", type=float, default=10.0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument(
+        "--runtimes", nargs="*", default=[], choices=["torchscript", "onnx"]
+    )
+    parser.add_argument("--int8", action="store_true", help="Use int8 exports")
+    args = parser.parse_args()
+
+    import librosa
+    from speechbrain.inference.speaker import EncoderClassifier
+
+    classifier = EncoderClassifier.from_hparams(
+        source="speechbrain/spkrec-ecapa-voxceleb",
+        run_opts={"device": "cpu"},
+        savedir=str(Path(settings.model_cache_dir) / "speechbrain"),
+    )
+    audio, _ = librosa.load(args.audio, sr=settings.DIARIZE_SAMPLE_RATE, mono=True)
+    duration = len(audio) / settings.DIARIZE_SAMPLE_RATE
+    segments = [
+        {"start": t, "end": min(t + args.segment_s, duration)}
+        for t in np.arange(0.0, duration, args.segment_s)
+    ]
+    chunks = _build_diarization_chunks(segments)
+    print(f"Audio: {args.audio} ({duration:.1f}s), {len(chunks)} chunks")
+
+    reference, _ = run(classifier, audio, chunks, 1, shared=False)
+    ref_unit = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+
+    settings.diarize_runtime_int8 = args.int8
+    for runtime in args.runtimes:
+        export_embedding_model(
+            classifier,
+            runtime,
+            settings.model_cache_dir,
+            int8=args.int8,
+            audio=audio,
+            min_cosine=settings.DIARIZE_RUNTIME_MIN_COSINE,
+        )
+
+    print(
+        f"{'features':<11} {'runtime':<12} {'batch':>6} {'time_s':>8} {'chunks/s':>9} "
+        f"{'min_cos':>8} {'mean_cos':>9}"
+    )
+    configs: list[tuple[bool, EmbeddingRuntime]] = [(False, "eager"), (True, "eager")]
+    configs += [(True, runtime) for runtime in args.runtimes]
+    for shared, runtime in configs:
+        for batch_size in args.batch_sizes:
+            embeddings, elapsed = run(
+                classifier, audio, chunks, batch_size, shared, runtime
+            )
+            unit = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+            cos = (unit * ref_unit).sum(axis=1)
+            name = f"{runtime}{'-int8' if args.int8 and runtime != 'eager' else ''}"
+            print(
+                f"{'shared' if shared else 'per-window':<11} {name:<12} {batch_size:>6} "
+                f"{elapsed:>8.2f} {len(chunks) / elapsed:>9.1f} "
+                f"{cos.min():>8.4f} {cos.mean():>9.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
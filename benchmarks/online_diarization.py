@@ -0,0 +1,97 @@
+"""Online (streaming) diarization: per-chunk latency and agreement with batch diarization.
+
+The file is fed to OnlineDiarizer in chunks of --chunk-s seconds, as a live
+stream would arrive. For every push the wall time is recorded: with a real-time
+stream, a speaker label is available one window (SUBSEGMENT_WINDOW_S) plus this
+processing time after the audio. The final turns (after the background
+reclusters) are compared with batch diarize_speech on the same audio by
+frame-level speaker error under the best speaker mapping.
+
+Usage:
+    python -m benchmarks.online_diarization media/audio/multi_person.mp3
+    python -m benchmarks.online_diarization meeting.wav --chunk-s 0.25 --recluster-every 20
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.diarization import diarize_speech
+from app.services.online_diarization import OnlineDiarizer
+from app.utils.audio_utils import load_audio
+from benchmarks.adaptive_segmentation import frame_speakers, speaker_error
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("audio", help="Audio file")
+    parser.add_argument("--chunk-s", type=float, default=0.5)
+    parser.add_argument("--recluster-every", type=int, default=50)
+    parser.add_argument("--max-history", type=int, default=2000)
+    parser.add_argument("--max-speakers", type=int, default=None)
+    args = parser.parse_args()
+
+    from speechbrain.inference.speaker import EncoderClassifier
+
+    classifier = EncoderClassifier.from_hparams(
+        source="speechbrain/spkrec-ecapa-voxceleb",
+        run_opts={"device": "cpu"},
+        savedir=str(Path(settings.model_cache_dir) / "speechbrain"),
+    )
+    sr = settings.DIARIZE_SAMPLE_RATE
+    audio = load_audio(args.audio, sr=sr)
+    duration = len(audio) / sr
+    print(f"Audio: {args.audio} ({duration:.1f}s), {args.chunk_s}s chunks")
+
+    diarizer = OnlineDiarizer(
+        classifier,
+        "cpu",
+        max_speakers=args.max_speakers,
+        max_history=args.max_history,
+        recluster_every=args.recluster_every,
+    )
+    step = int(args.chunk_s * sr)
+    push_ms = []
+    t0 = time.perf_counter()
+    with diarizer:
+        for start in range(0, len(audio), step):
+            t = time.perf_counter()
+            diarizer.push(audio[start : start + step])
+            push_ms.append((time.perf_counter() - t) * 1e3)
+        online_labels = [turn["speaker"] for turn in diarizer.turns]
+        turns = diarizer.finish()
+    online_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batch = diarize_speech(audio, "cpu", classifier, max_speakers=args.max_speakers)
+    batch_s = time.perf_counter() - t0
+
+    p50, p95 = np.percentile(push_ms, [50, 95])
+    print(
+        f"Push latency: p50 {p50:.1f} ms, p95 {p95:.1f} ms, max {max(push_ms):.1f} ms "
+        f"(label delay = {settings.SUBSEGMENT_WINDOW_S}s window + processing)"
+    )
+    relabeled = speaker_error(
+        online_labels, [turn["speaker"] for turn in turns[: len(online_labels)]]
+    )
+    print(
+        f"Online: {online_s:.2f}s for {len(turns)} windows, {diarizer.num_speakers} "
+        f"speaker(s), {relabeled:.1%} of windows relabeled by reclustering"
+    )
+    if not batch:
+        print("Batch diarization found no speech")
+        return
+    error = speaker_error(
+        frame_speakers(turns, duration), frame_speakers(batch, duration)
+    )
+    print(
+        f"Batch:  {batch_s:.2f}s, {len({t['speaker'] for t in batch})} speaker(s); "
+        f"online vs batch speaker error {error:.2%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Real-time factor of the sequential vs batched openai-whisper decode engines.
+
+Usage:
+    python -m benchmarks.openai_decode media/audio/multi_person.mp3 --model base
+"""
+
+import argparse
+import time
+
+from app.utils.audio_utils import SAMPLE_RATE, load_audio
+from app.whisper import (
+    load_openai_whisper,
+    transcribe_openai,
+    transcribe_openai_batched,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("audio", help="Audio file to transcribe")
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--device", default="cpu", choices=["cpu", "cuda"])
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--beam-size", type=int, default=None)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    audio = load_audio(args.audio)
+    duration = len(audio) / SAMPLE_RATE
+    model = load_openai_whisper(args.model, args.device)
+
+    engines = {
+        "sequential": lambda: transcribe_openai(model, audio, "transcribe"),
+        "batched": lambda: transcribe_openai_batched(
+            model,
+            audio,
+            "transcribe",
+            batch_size=args.batch_size,
+            beam_size=args.beam_size,
+        ),
+    }
+
+    print(f"Audio: {args.audio} ({duration:.1f}s), model: {args.model}")
+    print(f"{'engine':<12} {'best_s':>8} {'rtf':>8} {'segments':>9}")
+    for name, run in engines.items():
+        run()  # warm-up
+        timings = []
+        for _ in range(args.repeats):
+            t0 = time.perf_counter()
+            segments = run()
+            timings.append(time.perf_counter() - t0)
+        best = min(timings)
+        print(f"{name:<12} {best:>8.2f} {best / duration:>8.3f} {len(segments):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Speed and memory of fp32 / bf16 / int8 Whisper inference per model size.
+
+Each (model size, precision) pair runs in a fresh subprocess so peak RSS is
+measured in isolation. Loads go through the app loaders, so int8 runs use (and
+on the first run, fill) the quantized cache in MODEL_CACHE_DIR.
+
+Usage:
+    python -m benchmarks.precision media/audio/multi_person.mp3 --sizes tiny base small
+"""
+
+import argparse
+import json
+import resource
+import subprocess  # nosec B404
+import sys
+import time
+
+PRECISIONS = ["fp32", "bf16", "int8"]
+
+
+def run_single(audio_path: str, backend: str, size: str, precision: str) -> dict:
+    """Load one model at one precision, transcribe once, report timings and peak RSS."""
+    from app.core.config import settings
+    from app.utils.audio_utils import SAMPLE_RATE, load_audio
+    from app.whisper import get_backend, load_openai_whisper, load_transformers_whisper
+
+    audio = load_audio(audio_path)
+    loader = (
+        load_transformers_whisper if backend == "transformers" else load_openai_whisper
+    )
+    t0 = time.perf_counter()
+    model = loader(size, "cpu", precision=precision, cache_dir=settings.model_cache_dir)
+    load_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    get_backend(backend).transcribe(model, audio, "transcribe", cfg=settings)
+    run_s = time.perf_counter() - t0
+    return {
+        "load_s": load_s,
+        "rtf": run_s / (len(audio) / SAMPLE_RATE),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("audio", help="Audio file to transcribe")
+    parser.add_argument(
+        "--backend", default="openai", choices=["openai", "transformers"]
+    )
+    parser.add_argument("--sizes", nargs="+", default=["tiny", "base", "small"])
+    parser.add_argument("--precisions", nargs="+", default=PRECISIONS)
+    parser.add_argument("--single", nargs=2, metavar=("SIZE", "PRECISION"))
+    args = parser.parse_args()
+
+    if args.single:
+        result = run_single(args.audio, args.backend, *args.single)
+        print(json.dumps(result))
+        return
+
+    print(f"Audio: {args.audio}, backend: {args.backend}, device: cpu")
+    print(f"{'size':<8} {'precision':<10} {'load_s':>8} {'rtf':>8} {'peak_rss_mb':>12}")
+    for size in args.sizes:
+        for precision in args.precisions:
+            cmd = [
+                sys.executable,
+                "-m",
+                "benchmarks.precision",
+                args.audio,
+                "--backend",
+                args.backend,
+                "--single",
+                size,
+                precision,
+            ]
+            proc = subprocess.run(cmd, capture_output=True, text=True)  # nosec B603
+            if proc.returncode != 0:
+                print(f"{size:<8} {precision:<10} failed: {proc.stderr.strip()[-200:]}")
+                continue
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(
+                f"{size:<8} {precision:<10} {r['load_s']:>8.2f} "
+                f"{r['rtf']:>8.3f} {r['peak_rss_mb']:>12.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
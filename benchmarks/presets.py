@@ -0,0 +1,86 @@
+"""Real-time factor of the fast / balanced / accurate decode presets per backend.
+
+The model is loaded once per backend and each preset is timed on the same audio
+(best of --repeats after a warm-up run). Agreement is the word-level similarity
+of a preset's transcript to the accurate preset's, as a rough accuracy proxy
+when no reference transcript is available.
+
+Usage:
+    python -m benchmarks.presets media/audio/multi_person.mp3 --model base
+    python -m benchmarks.presets audio.wav --backends openai transformers --repeats 1
+"""
+
+import argparse
+import difflib
+import time
+from typing import Any
+
+from app.core.config import settings
+from app.utils.audio_utils import SAMPLE_RATE, load_audio
+from app.whisper import DECODE_PRESETS, get_backend
+
+
+def _words(segments: list[dict]) -> list[str]:
+    return " ".join(s["text"] for s in segments).lower().split()
+
+
+def time_preset(
+    backend: Any, model: Any, audio: Any, preset: str, repeats: int
+) -> tuple[float, list[str]]:
+    """Best wall time over repeats (after a warm-up run) and the transcript words."""
+
+    def run() -> list[dict]:
+        segments: list[dict] = backend.transcribe(
+            model, audio, "transcribe", cfg=settings, preset=preset
+        )
+        return segments
+
+    words = _words(run())  # warm-up
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - t0)
+    return best, words
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("audio", help="Audio file to transcribe")
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--device", default="cpu", choices=["cpu", "cuda"])
+    parser.add_argument("--backends", nargs="+", default=["openai"])
+    parser.add_argument("--presets", nargs="+", default=list(DECODE_PRESETS))
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    audio = load_audio(args.audio)
+    duration = len(audio) / SAMPLE_RATE
+    print(f"Audio: {args.audio} ({duration:.1f}s), model: {args.model}")
+    print(f"{'backend':<13} {'preset':<9} {'best_s':>8} {'rtf':>8} {'agreement':>10}")
+
+    for name in args.backends:
+        backend = get_backend(name)
+        model = backend.load(args.model, args.device, settings)
+        words: dict[str, list[str]] = {}
+        timings: dict[str, float] = {}
+        for preset in args.presets:
+            timings[preset], words[preset] = time_preset(
+                backend, model, audio, preset, args.repeats
+            )
+
+        reference = words.get("accurate")
+        for preset in args.presets:
+            agreement = (
+                f"{difflib.SequenceMatcher(None, reference, words[preset]).ratio():.3f}"
+                if reference is not None
+                else "-"
+            )
+            print(
+                f"{name:<13} {preset:<9} {timings[preset]:>8.2f} "
+                f"{timings[preset] / duration:>8.3f} {agreement:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Scaling of speaker assignment: per-segment scans vs sorted-interval lookups.
+
+Synthetic recordings with N back-to-back segments (random durations and
+speakers) are used to time the two lookups diarization performs:
+
+- overlap: speaker of each translation segment by overlap with the diarized
+  original segments (assign_speaker_by_overlap per segment vs
+  assign_speakers_by_overlap);
+- nearest: label of the nearest embedded chunk for segments too short to embed
+  (linear scan vs nearest_chunk_labels).
+
+Results of both implementations are checked to be identical.
+
+Usage:
+    python -m benchmarks.speaker_assignment
+    python -m benchmarks.speaker_assignment --sizes 1000 10000 50000 --speakers 4
+"""
+
+import argparse
+import time
+from typing import Any
+
+import numpy as np
+
+from app.services.diarization import (
+    assign_speaker_by_overlap,
+    assign_speakers_by_overlap,
+    nearest_chunk_labels,
+)
+
+
+def synthetic_segments(n: int, speakers: int, rng: np.random.Generator) -> list[dict]:
+    """N consecutive segments of 0.3-8 s with small gaps and random speakers."""
+    durations = rng.uniform(0.3, 8.0, n)
+    gaps = rng.uniform(0.0, 0.5, n)
+    starts = np.cumsum(gaps + durations) - durations
+    return [
+        {
+            "start": float(s),
+            "end": float(s + d),
+            "speaker": f"SPEAKER_{rng.integers(speakers):02d}",
+        }
+        for s, d in zip(starts, durations, strict=True)
+    ]
+
+
+def naive_nearest(
+    centers: list[float], chunk_centers: list[float], chunk_labels: list[int]
+) -> list[int]:
+    """The linear scan formerly used for segments without an embedding."""
+    out = []
+    for center_i in centers:
+        best_label, best_dist = 0, float("inf")
+        for center_j, label in zip(chunk_centers, chunk_labels, strict=True):
+            d = abs(center_i - center_j)
+            if d < best_dist:
+                best_dist, best_label = d, label
+        out.append(best_label)
+    return out
+
+
+def naive_overlap(spans: list[tuple[float, float]], diarized: list[dict]) -> list[str]:
+    """One assign_speaker_by_overlap scan per span."""
+    return [assign_speaker_by_overlap(s, e, diarized) for s, e in spans]
+
+
+def timed(fn: Any, *args: Any) -> tuple[Any, float]:
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--speakers", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(
+        f"{'lookup':<8} {'segments':>9} {'naive_s':>9} {'sorted_s':>9} "
+        f"{'speedup':>8} {'identical':>9}"
+    )
+    for n in args.sizes:
+        diarized = synthetic_segments(n, args.speakers, rng)
+        # Translation segments are cut differently from the original ones
+        spans = [(s["start"], s["end"]) for s in synthetic_segments(n, 1, rng)]
+
+        naive, t_naive = timed(naive_overlap, spans, diarized)
+        fast, t_fast = timed(assign_speakers_by_overlap, spans, diarized)
+        print(
+            f"{'overlap':<8} {n:>9} {t_naive:>9.3f} {t_fast:>9.3f} "
+            f"{t_naive / t_fast:>7.1f}x {naive == fast!s:>9}"
+        )
+
+        chunk_centers = [(d["start"] + d["end"]) / 2 for d in diarized]
+        chunk_labels = rng.integers(args.speakers, size=n).tolist()
+        centers = [(s + e) / 2 for s, e in spans]
+        naive, t_naive = timed(naive_nearest, centers, chunk_centers, chunk_labels)
+        fast, t_fast = timed(
+            nearest_chunk_labels,
+            np.array(centers),
+            np.array(chunk_centers),
+            np.array(chunk_labels),
+        )
+        print(
+            f"{'nearest':<8} {n:>9} {t_naive:>9.3f} {t_fast:>9.3f} "
+            f"{t_naive / t_fast:>7.1f}x {naive == fast.tolist()!s:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
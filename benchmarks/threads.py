@@ -0,0 +1,177 @@
+"""Throughput of worker / inference-slot / thread layouts, with a recommendation.
+
+Every layout starts WORKERS worker processes that go through the same startup
+CPU tuning as the API (cgroup quota, affinity split, torch thread counts). Each
+worker runs SLOTS transcriptions concurrently until it has done --requests of
+them. Throughput is audio seconds transcribed per wall-clock second over all
+workers; model loading is excluded.
+
+Usage:
+    python -m benchmarks.threads media/audio/multi_person.mp3 --model base
+    python -m benchmarks.threads audio.wav --workers 1 2 4 --slots 1 2 --threads 0 2
+"""
+
+import argparse
+import itertools
+import json
+import os
+import subprocess  # nosec B404
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Lock files for worker indices are keyed by port; keep runs apart from a live server.
+_BENCH_PORT = "18731"
+
+
+def run_worker(
+    audio_path: str, model_size: str, backend_name: str, requests: int
+) -> dict:
+    """One worker process: tune CPU, load the model, run requests transcriptions."""
+    from app.core.config import settings
+    from app.core.cpu import configure_cpu
+    from app.utils.audio_utils import SAMPLE_RATE, load_audio
+    from app.whisper import get_backend, inference_slots_for
+
+    backend = get_backend(backend_name)
+    layout = configure_cpu(
+        inference_slots=inference_slots_for(backend, settings.inference_slots)
+    )
+    audio = load_audio(audio_path)
+    model = backend.load(model_size, "cpu", settings)
+
+    def one(_: int) -> float:
+        t0 = time.perf_counter()
+        backend.transcribe(model, audio, "transcribe", cfg=settings)
+        return time.perf_counter() - t0
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=layout.inference_slots) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    return {
+        "start": start,
+        "end": time.time(),
+        "audio_s": requests * len(audio) / SAMPLE_RATE,
+        "latencies": latencies,
+        "cpus": list(layout.cpus),
+        "threads": layout.intra_op_threads,
+    }
+
+
+def run_layout(
+    args: argparse.Namespace, workers: int, slots: int, threads: int
+) -> dict:
+    """Start the worker processes for one layout and aggregate their results."""
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "INFERENCE_SLOTS": str(slots),
+        "TORCH_NUM_THREADS": str(threads),
+        "CPU_AUTO_TUNE": "true",
+        "PORT": _BENCH_PORT,
+    }
+    cmd = [
+        sys.executable,
+        "-m",
+        "benchmarks.threads",
+        args.audio,
+        "--model",
+        args.model,
+        "--backend",
+        args.backend,
+        "--requests",
+        str(args.requests),
+        "--worker",
+    ]
+    procs = [
+        subprocess.Popen(  # nosec B603
+            cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+        for _ in range(workers)
+    ]
+    results = []
+    for proc in procs:
+        out, err = proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError(err.strip()[-300:])
+        results.append(json.loads(out.strip().splitlines()[-1]))
+
+    wall = max(r["end"] for r in results) - min(r["start"] for r in results)
+    latencies = [lat for r in results for lat in r["latencies"]]
+    return {
+        "throughput": sum(r["audio_s"] for r in results) / wall,
+        "mean_latency_s": sum(latencies) / len(latencies),
+        "threads": results[0]["threads"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("audio", help="Audio file to transcribe")
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--backend", default="openai")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--slots", type=int, nargs="+", default=[1, 2])
+    parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=[0],
+        help="Intra-op threads per slot (0 = auto from the layout)",
+    )
+    parser.add_argument(
+        "--requests", type=int, default=4, help="Transcriptions per worker"
+    )
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(args.audio, args.model, args.backend, args.requests)
+        print(json.dumps(result))
+        return
+
+    from app.core.cpu import cgroup_cpu_limit, effective_cpu_count
+    from app.whisper import get_backend
+
+    cores = effective_cpu_count()
+    if not get_backend(args.backend).capabilities.concurrent:
+        # One model per process cannot serve parallel requests on this backend.
+        args.slots = [1]
+    print(
+        f"Audio: {args.audio}, model: {args.model}, backend: {args.backend}, "
+        f"usable cores: {cores} (quota: {cgroup_cpu_limit() or 'none'})"
+    )
+    print(
+        f"{'workers':>7} {'slots':>5} {'threads':>7} "
+        f"{'audio_s/s':>10} {'latency_s':>10}"
+    )
+    best: tuple[float, int, int, int] | None = None
+    for workers, slots, threads in itertools.product(
+        args.workers, args.slots, args.threads
+    ):
+        if workers * slots > cores:
+            continue
+        try:
+            r = run_layout(args, workers, slots, threads)
+        except RuntimeError as e:
+            print(f"{workers:>7} {slots:>5} {threads:>7} failed: {e}")
+            continue
+        print(
+            f"{workers:>7} {slots:>5} {r['threads']:>7} "
+            f"{r['throughput']:>10.2f} {r['mean_latency_s']:>10.2f}"
+        )
+        if best is None or r["throughput"] > best[0]:
+            best = (r["throughput"], workers, slots, threads)
+
+    if best is None:
+        print("No layout fits the available cores.")
+        return
+    _, workers, slots, threads = best
+    print("\nRecommended (highest throughput):")
+    print(f"  WORKERS={workers}")
+    print(f"  INFERENCE_SLOTS={slots}")
+    print(f"  TORCH_NUM_THREADS={threads}")
+
+
+if __name__ == "__main__":
+    main()
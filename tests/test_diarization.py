@@ -0,0 +1,194 @@
+"""Labelling Whisper segments with speaker turns, smoothing and clustering (each
+checked against the code it replaced); speaker embeddings."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.clustering import (
+    cluster_speakers,
+    cosine_linkage,
+    cut_linkage,
+    estimate_speakers_silhouette,
+)
+from app.services.diarization import (
+    apply_speaker_turns,
+    assign_speaker_by_overlap,
+    assign_speakers_by_overlap,
+    extract_embeddings,
+    nearest_chunk_labels,
+)
+from app.services.smoothing import smooth_labels
+
+
+def turn(start: float, end: float, speaker: str) -> dict:
+    return {"start": start, "end": end, "speaker": speaker}
+
+
+def test_no_segments_gives_no_speakers() -> None:
+    # A silent file: diarization found a turn, Whisper no text
+    assert apply_speaker_turns([], [turn(0.0, 1.5, "SPEAKER_00")]) == []
+
+
+def test_segments_take_the_overlapping_or_nearest_speaker() -> None:
+    segments = [
+        {"start": 0.0, "end": 2.0, "text": " Hi."},
+        {"start": 2.0, "end": 4.0, "text": " Hello."},
+        {"start": 9.0, "end": 10.0, "text": " Bye."},
+    ]
+    turns = [turn(0.0, 2.1, "Alice"), turn(2.1, 5.0, "SPEAKER_01")]
+    assert [s["speaker"] for s in apply_speaker_turns(segments, turns)] == [
+        "Alice",
+        "SPEAKER_01",
+        "SPEAKER_01",
+    ]
+
+
+def test_shared_features_match_per_window_embeddings(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Shared fbank frames see neighbouring audio at window edges instead of
+    # padding, so the embeddings are close, not bitwise equal
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("speechbrain")
+    from speechbrain.lobes.features import Fbank
+    from speechbrain.lobes.models.ECAPA_TDNN import ECAPA_TDNN
+    from speechbrain.processing.features import InputNormalization
+
+    # The classifier's modules with random weights: no model download
+    torch.manual_seed(0)
+    mods = SimpleNamespace(
+        compute_features=Fbank(n_mels=80),
+        mean_var_norm=InputNormalization(norm_type="sentence", std_norm=False),
+        embedding_model=ECAPA_TDNN(80, lin_neurons=192).eval(),
+    )
+
+    def encode_batch(wavs, wav_lens):
+        feats = mods.mean_var_norm(mods.compute_features(wavs), wav_lens)
+        return mods.embedding_model(feats, wav_lens)
+
+    classifier = SimpleNamespace(mods=mods, encode_batch=encode_batch)
+    sr = 16000
+    audio = np.random.default_rng(0).normal(0, 0.1, 8 * sr).astype(np.float32)
+    # Sliding windows of one segment, and a final window off the stride grid
+    chunks = [(0.75 * i, 0.75 * i + 1.5, 0) for i in range(8)] + [(6.5, 8.0, 0)]
+
+    monkeypatch.setattr(settings, "diarize_runtime", "eager")
+    embeddings = []
+    for shared in (True, False):
+        monkeypatch.setattr(settings, "diarize_shared_features", shared)
+        emb, meta = extract_embeddings(
+            classifier, audio, sr, chunks, "cpu", 4, verbose=False
+        )
+        assert meta == chunks
+        embeddings.append(emb / np.linalg.norm(emb, axis=1, keepdims=True))
+    shared_emb, window_emb = embeddings
+    assert (shared_emb * window_emb).sum(axis=1).min() > 0.999
+
+
+def test_sorted_overlap_lookup_matches_the_per_segment_scan() -> None:
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        starts = rng.integers(0, 40, size=rng.integers(1, 30)) / 4
+        turns = [
+            turn(float(s), float(s + rng.integers(0, 12) / 4), f"S{rng.integers(3)}")
+            for s in starts
+        ]
+        spans = [
+            (float(s), float(s + rng.integers(0, 16) / 4))
+            for s in rng.integers(-4, 44, size=20) / 4
+        ]
+        assert assign_speakers_by_overlap(spans, turns) == [
+            assign_speaker_by_overlap(s, e, turns) for s, e in spans
+        ]
+
+
+def test_nearest_chunk_lookup_matches_the_linear_scan() -> None:
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        # A coarse grid makes equal centers and midway queries (ties) common
+        chunk_centers = rng.integers(0, 20, size=rng.integers(1, 15)) / 2
+        chunk_labels = rng.integers(0, 4, size=len(chunk_centers))
+        centers = rng.integers(-2, 44, size=25) / 4
+        expected = []
+        for c in centers:
+            best_label, best_dist = 0, float("inf")
+            for center, label in zip(chunk_centers, chunk_labels, strict=True):
+                if abs(c - center) < best_dist:
+                    best_dist, best_label = abs(c - center), label
+            expected.append(best_label)
+        np.testing.assert_array_equal(
+            nearest_chunk_labels(centers, chunk_centers, chunk_labels), expected
+        )
+
+
+def _iterative_sandwich(
+    labels: np.ndarray, durations: np.ndarray, max_duration_s: float
+) -> np.ndarray:
+    """The repeated in-order A-B-A -> A-A-A pass the diarizer used to run."""
+    seg_label = {i: int(lab) for i, lab in enumerate(labels) if lab >= 0}
+    n = len(labels)
+    changed = True
+    while changed:
+        changed = False
+        for i in range(n):
+            if i not in seg_label or durations[i] > max_duration_s:
+                continue
+            prev_l = seg_label.get(i - 1) if i > 0 else None
+            next_l = seg_label.get(i + 1) if i < n - 1 else None
+            if prev_l is not None and prev_l == next_l and seg_label[i] != prev_l:
+                seg_label[i] = prev_l
+                changed = True
+    return np.array([seg_label.get(i, -1) for i in range(n)])
+
+
+def test_vectorized_sandwich_matches_the_iterative_pass() -> None:
+    rng = np.random.default_rng(2)
+    for _ in range(300):
+        n = int(rng.integers(0, 40))
+        labels = rng.integers(-1, 3, size=n)
+        durations = rng.uniform(0.2, 4.0, size=n)
+        np.testing.assert_array_equal(
+            smooth_labels(labels, durations, "sandwich", max_duration_s=2.0),
+            _iterative_sandwich(labels, durations, 2.0),
+        )
+
+
+def test_linkage_cuts_match_agglomerative_clustering() -> None:
+    from sklearn.cluster import AgglomerativeClustering
+    from sklearn.metrics import silhouette_score
+
+    rng = np.random.default_rng(3)
+    for _ in range(30):
+        n_speakers = int(rng.integers(1, 5))
+        centers = rng.normal(size=(n_speakers, 16))
+        embeddings = centers[rng.integers(n_speakers, size=int(rng.integers(4, 40)))]
+        embeddings = embeddings + 0.4 * rng.normal(size=embeddings.shape)
+
+        threshold = AgglomerativeClustering(
+            n_clusters=None, distance_threshold=0.35, metric="cosine", linkage="average"
+        ).fit_predict(embeddings)
+        np.testing.assert_array_equal(
+            cluster_speakers(embeddings, distance_threshold=0.35), threshold
+        )
+
+        # The silhouette search refitted AgglomerativeClustering for every k
+        best_k, best_score = 2, -1.0
+        for k in range(2, min(11, len(embeddings))):
+            labels = AgglomerativeClustering(
+                n_clusters=k, metric="cosine", linkage="average"
+            ).fit_predict(embeddings)
+            np.testing.assert_array_equal(
+                cut_linkage(cosine_linkage(embeddings), k), labels
+            )
+            if len(set(labels)) < k:
+                continue
+            score = silhouette_score(embeddings, labels, metric="cosine")
+            if score > best_score:
+                best_k, best_score = k, score
+        estimated, _ = estimate_speakers_silhouette(
+            embeddings, cosine_linkage(embeddings)
+        )
+        assert estimated == best_k
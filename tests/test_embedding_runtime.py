@@ -0,0 +1,46 @@
+"""Loading exported speaker-embedding runtimes."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from app.core import metrics
+from app.services import embedding_runtime
+from app.services.embedding_runtime import (
+    EXPORT_BATCH,
+    load_embedding_runtime,
+    runtime_path,
+)
+
+
+def test_failed_load_is_remembered_until_the_export_changes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = runtime_path(tmp_path, "torchscript")
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"not a model")
+    path.with_suffix(".pt.json").write_text(
+        json.dumps({"batch": EXPORT_BATCH, "min_cosine": 0.999})
+    )
+    loads, misses = [], []
+
+    def broken_load(path: Path, runtime: str) -> None:
+        loads.append(path)
+        raise RuntimeError("corrupt file")
+
+    monkeypatch.setattr(embedding_runtime, "_load", broken_load)
+    monkeypatch.setattr(
+        metrics, "record_cache", lambda cache, hit: misses.append((cache, hit))
+    )
+    for _ in range(3):
+        assert load_embedding_runtime("torchscript", tmp_path) is None
+    assert len(loads) == 1
+    assert misses == [("embedding_runtime", False)]
+
+    # A new export is tried again
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert load_embedding_runtime("torchscript", tmp_path) is None
+    assert len(loads) == 2
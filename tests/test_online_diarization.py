@@ -0,0 +1,132 @@
+"""OnlineDiarizer on synthetic window embeddings."""
+
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.services.online_diarization import OnlineDiarizer
+from app.utils.audio_utils import follow_pcm
+
+
+def unit(v: np.ndarray) -> np.ndarray:
+    return v / np.linalg.norm(v)
+
+
+def speaker_embeddings(n_speakers: int, per_speaker: int, seed: int = 0):
+    """Interleaved noisy embeddings around n_speakers random directions."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_speakers, 64))
+    return [
+        (k, centers[k] + 0.05 * rng.normal(size=64))
+        for _ in range(per_speaker)
+        for k in range(n_speakers)
+    ]
+
+
+def feed(diarizer: OnlineDiarizer, embeddings) -> list[dict]:
+    return [
+        diarizer.add_embedding(i * 0.5, i * 0.5 + 1.5, emb)
+        for i, (_, emb) in enumerate(embeddings)
+    ]
+
+
+def test_recluster_fixes_an_early_mistake() -> None:
+    a, b = np.eye(8)[0], np.eye(8)[1]
+    # Closer to b, but b has no speaker yet when it arrives
+    mixed = unit(0.6 * a + 0.8 * b)
+    with OnlineDiarizer(None, distance_threshold=0.45, recluster_every=10**6) as d:
+        first = [d.add_embedding(i, i + 1.5, e) for i, e in enumerate([a, mixed])]
+        assert first[0]["speaker"] == first[1]["speaker"] == "SPEAKER_00"
+        for i in range(2, 7):
+            d.add_embedding(i, i + 1.5, b)
+        turns = d.finish()
+
+    assert [t["speaker"] for t in turns] == ["SPEAKER_00"] + ["SPEAKER_01"] * 6
+    assert d.num_speakers == 2
+
+
+def test_finalized_turns_are_bounded_and_keep_their_speaker() -> None:
+    embeddings = speaker_embeddings(2, 30, seed=1)
+    popped = []
+    with OnlineDiarizer(
+        None, distance_threshold=0.3, max_history=6, recluster_every=4
+    ) as d:
+        for i, (_, emb) in enumerate(embeddings):
+            d.add_embedding(i * 0.5, i * 0.5 + 1.5, emb)
+            popped += d.pop_finalized()
+            assert len(d.turns) <= 6
+        # Popped turns are final: later reclusters leave them alone
+        snapshot = [t["speaker"] for t in popped]
+        turns = popped + d.finish()
+
+    assert [t["speaker"] for t in popped] == snapshot
+    assert len(turns) == len(embeddings)
+    by_speaker: dict[int, set[str]] = {}
+    for (k, _), t in zip(embeddings, turns, strict=True):
+        by_speaker.setdefault(k, set()).add(t["speaker"])
+    assert all(len(labels) == 1 for labels in by_speaker.values())
+    assert by_speaker[0] != by_speaker[1]
+
+
+def test_centroids_follow_the_turns() -> None:
+    embeddings = speaker_embeddings(3, 8, seed=2)
+    d = OnlineDiarizer(None, distance_threshold=0.3, recluster_every=5)
+    feed(d, embeddings)
+    turns = d.finish()
+
+    assert [t["speaker"] for t in turns[:3]] == [
+        "SPEAKER_00",
+        "SPEAKER_01",
+        "SPEAKER_02",
+    ]
+    centroids = d.speaker_centroids
+    assert sorted(centroids) == sorted({t["speaker"] for t in turns})
+    for speaker, centroid in centroids.items():
+        members = [
+            unit(emb)
+            for (_, emb), t in zip(embeddings, turns, strict=True)
+            if t["speaker"] == speaker
+        ]
+        np.testing.assert_allclose(centroid, unit(np.sum(members, axis=0)), atol=1e-5)
+    d.close()  # idempotent after finish()
+
+
+def test_speaker_map_labels_segments() -> None:
+    with OnlineDiarizer(None, distance_threshold=0.3) as d:
+        feed(d, speaker_embeddings(1, 4))
+        d.finish()
+        segments = d.speaker_map([{"start": 0.0, "end": 2.0, "text": " Hi."}])
+    assert segments == [
+        {"start": 0.0, "end": 2.0, "speaker": "SPEAKER_00", "text": "Hi."}
+    ]
+
+
+def test_follow_reads_a_wav_with_placeholder_sizes(tmp_path: Path) -> None:
+    samples = (np.arange(40000) % 2000 - 1000).astype("<i2")
+    path = tmp_path / "growing.wav"
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(samples.tobytes())
+    # A recorder that is still writing has not filled in the sizes yet
+    data = bytearray(path.read_bytes())
+    data[4:8] = data[40:44] = b"\xff\xff\xff\xff"
+    path.write_bytes(bytes(data) + b"\x01")  # plus half a sample
+
+    chunks = list(follow_pcm(path, idle_timeout_s=0))
+    assert [len(c) for c in chunks] == [16000, 16000, 8000]
+    np.testing.assert_array_equal(np.concatenate(chunks) * 32768, samples)
+
+
+def test_follow_rejects_other_formats(tmp_path: Path) -> None:
+    path = tmp_path / "stereo.wav"
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\0" * 64)
+    with pytest.raises(ValueError, match="16-bit mono"):
+        next(follow_pcm(path, idle_timeout_s=0))
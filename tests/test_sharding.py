@@ -0,0 +1,68 @@
+"""Shard offsets and stitching of per-shard segments."""
+
+import numpy as np
+import pytest
+
+from app.services import sharding
+from app.services.sharding import stitch_shard_segments
+from app.utils.audio_utils import SAMPLE_RATE, split_on_silence
+
+
+def seg(start: float, end: float, text: str) -> dict:
+    return {"start": start, "end": end, "text": text}
+
+
+def test_line_repeated_across_a_cut_is_kept() -> None:
+    # Shard 1 covers [0, 30], shard 2 [30, 60]; "Thank you." was said twice
+    shards = [
+        [seg(0.0, 12.0, " Hello there."), seg(12.0, 29.5, " Thank you.")],
+        [seg(30.0, 30.8, " Thank you."), seg(30.8, 41.0, " Bye.")],
+    ]
+    assert [s["text"] for s in stitch_shard_segments(shards)] == [
+        " Hello there.",
+        " Thank you.",
+        " Thank you.",
+        " Bye.",
+    ]
+
+
+def test_empty_segments_are_skipped() -> None:
+    shards = [[seg(0.0, 30.0, " Yes.")], [seg(30.0, 30.0, " "), seg(30.0, 31.0, "No.")]]
+    assert [s["text"] for s in stitch_shard_segments(shards)] == [" Yes.", "No."]
+
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def test_cuts_land_in_silence() -> None:
+    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    audio = np.concatenate([_tone(18.0), silence, _tone(21.0)])
+    bounds = split_on_silence(audio, 2, search_s=5.0, silence_db=-35.0)
+    assert len(bounds) == 2
+    cut = bounds[0][1] / SAMPLE_RATE
+    assert 18.0 < cut < 19.0
+
+
+def test_no_cut_without_silence() -> None:
+    audio = _tone(40.0)
+    assert split_on_silence(audio, 2, search_s=5.0, silence_db=-35.0) == [
+        (0, len(audio))
+    ]
+
+
+def test_shard_segments_are_offset_and_clamped(monkeypatch: pytest.MonkeyPatch) -> None:
+    def transcribe_fn(model, audio, task):
+        assert len(audio) == 10 * SAMPLE_RATE
+        # Whisper can overshoot the end of its input
+        return [seg(0.0, 4.0, " One."), seg(4.0, 12.5, " Two.")]
+
+    audio = np.zeros(40 * SAMPLE_RATE, dtype=np.float32)
+    monkeypatch.setattr(
+        sharding,
+        "_shard_state",
+        {"model": None, "audio": audio, "transcribe_fn": transcribe_fn},
+    )
+    segments = sharding._transcribe_shard(20 * SAMPLE_RATE, 30 * SAMPLE_RATE, "x")
+    assert [(s["start"], s["end"]) for s in segments] == [(20.0, 24.0), (24.0, 30.0)]
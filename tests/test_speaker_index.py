@@ -0,0 +1,78 @@
+"""Enrolled speaker index on disk."""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from app.services.speaker_index import POINTER_FILE, SpeakerIndex
+
+
+def _entries(path: Path) -> list[str]:
+    """Index directory contents, with the version directory name shortened to v-."""
+    return sorted(p.name[:2] if p.is_dir() else p.name for p in path.iterdir())
+
+
+def test_enroll_search_and_remove_round_trip(tmp_path: Path) -> None:
+    alice, bob = np.eye(4)[0], np.eye(4)[1]
+    index = SpeakerIndex(tmp_path)
+    index.enroll("Alice", np.stack([alice, alice]))
+    index.enroll("Bob", bob)
+
+    reloaded = SpeakerIndex(tmp_path)
+    assert reloaded.names == ["Alice", "Bob"]
+    assert reloaded.counts == [2, 1]
+    assert [[name for name, _ in hits] for hits in reloaded.search(bob, k=2)] == [
+        ["Bob", "Alice"]
+    ]
+
+    assert isinstance(reloaded.matrix, np.memmap)
+    assert reloaded.matrix.flags.c_contiguous
+
+    assert reloaded.remove("Alice")
+    assert SpeakerIndex(tmp_path).names == ["Bob"]
+    assert _entries(tmp_path) == [POINTER_FILE, "v-"]
+
+
+def test_reads_and_replaces_the_two_file_layout(tmp_path: Path) -> None:
+    np.save(tmp_path / "embeddings.npy", np.eye(3, dtype=np.float32)[:1])
+    (tmp_path / "speakers.json").write_text(
+        json.dumps({"names": ["Alice"], "counts": [3]})
+    )
+    index = SpeakerIndex(tmp_path)
+    assert index.names == ["Alice"]
+
+    index.enroll("Bob", np.eye(3)[1])
+    assert _entries(tmp_path) == [POINTER_FILE, "v-"]
+    assert SpeakerIndex(tmp_path).names == ["Alice", "Bob"]
+
+
+def test_reads_and_replaces_the_npz_layout(tmp_path: Path) -> None:
+    np.savez(
+        tmp_path / "speakers.npz",
+        sums=np.eye(3, dtype=np.float32)[:1] * 2,
+        names=np.array(["Alice"]),
+        counts=np.array([2]),
+    )
+    index = SpeakerIndex(tmp_path)
+    assert index.counts == [2]
+    np.testing.assert_allclose(index.matrix, np.eye(3)[:1])
+
+    index.enroll("Alice", np.eye(3)[0])
+    assert _entries(tmp_path) == [POINTER_FILE, "v-"]
+    np.testing.assert_allclose(SpeakerIndex(tmp_path).sums, np.eye(3)[:1] * 3)
+
+
+def test_enrolling_in_parts_matches_enrolling_at_once(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    chunks = rng.normal(size=(12, 8)).astype(np.float32)
+    parts = SpeakerIndex(tmp_path / "parts")
+    for part in np.split(chunks, 4):
+        parts.enroll("Alice", part)
+    at_once = SpeakerIndex(tmp_path / "at_once")
+    at_once.enroll("Alice", chunks)
+
+    assert SpeakerIndex(tmp_path / "parts").counts == [12]
+    np.testing.assert_allclose(
+        SpeakerIndex(tmp_path / "parts").matrix, at_once.matrix, atol=1e-6
+    )